@@ -1,9 +1,7 @@
 # api/dashboard.py
 from flask import Blueprint, jsonify
 from services.analytics_service import AnalyticsService
-from repositories.email_repository import EmailRepository
-from repositories.funcionario_repository import FuncionarioRepository
-from services.firestore_client import get_firestore_client
+from services.storage import get_email_repository, get_funcionario_repository
 
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
 
@@ -11,11 +9,9 @@ dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
 def get_stats():
     """Estatísticas do dashboard"""
     try:
-        db = get_firestore_client()
-        
-        # Cria os 2 repositórios necessários
-        email_repo = EmailRepository(db)
-        func_repo = FuncionarioRepository(db)
+        # Cria os 2 repositórios necessários (backend de STORAGE_BACKEND)
+        email_repo = get_email_repository()
+        func_repo = get_funcionario_repository()
         
         # Passa ambos pro service
         service = AnalyticsService(email_repo, func_repo)
@@ -1,35 +1,121 @@
 # api/emails.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from services.email_service import EmailService
 from services.funcionario_service import FuncionarioService
-from repositories.funcionario_repository import FuncionarioRepository
-from repositories.email_repository import EmailRepository
-from services.firestore_client import get_firestore_client
+from repositories.email_repository import ConflictError, EmailNotFoundError
+from services.storage import get_email_repository, get_funcionario_repository
+from utils.pagination import parse_limit
+from utils.email_filters import parse_email_filters
+from utils.email_fields import EXPORT_FIELDS, parse_fields
+from utils.email_export import EXPORT_FORMATS, ndjson_lines, csv_lines
+from config import Config
 from datetime import datetime
 
 emails_bp = Blueprint('emails', __name__, url_prefix='/api/emails')
 
 def get_service():
     """Helper: cria service"""
-    db = get_firestore_client()
-    repo = EmailRepository(db)
-    func_repo = FuncionarioRepository(db)
-    func_service = FuncionarioService(func_repo)
-    return EmailService(repo, func_service)
+    func_service = FuncionarioService(get_funcionario_repository())
+    return EmailService(get_email_repository(), func_service)
+
+def get_page_args():
+    """Helper: lê limit/cursor da query string"""
+    limit = parse_limit(request.args.get('limit'), Config.PAGE_SIZE_DEFAULT, Config.PAGE_SIZE_MAX)
+    cursor = request.args.get('cursor') or None
+    return limit, cursor
 
 @emails_bp.route('/', methods=['GET'])
 def list_emails():
-    """Lista todos emails"""
+    """
+    Lista emails paginados (?limit=&cursor=) com filtros opcionais:
+    estado, municipio, categoria, remetente, status, data_inicio, data_fim.
+    ?fields=assunto,corpo,... escolhe os campos (padrão: todos menos corpo; 'all' inclui o corpo)
+    """
+    try:
+        limit, cursor = get_page_args()
+        filters = parse_email_filters(request.args)
+        fields = parse_fields(request.args.get('fields'))
+        service = get_service()
+        emails, next_cursor = service.get_emails_page(limit, cursor, filters, fields)
+        return jsonify({
+            'success': True,
+            'data': [e.to_dict(fields) for e in emails],
+            'next_cursor': next_cursor
+        }), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@emails_bp.route('/count', methods=['GET'])
+def count_emails():
+    """Conta emails com os mesmos filtros da listagem"""
     try:
+        filters = parse_email_filters(request.args)
         service = get_service()
-        emails = service.get_all_emails()
         return jsonify({
             'success': True,
-            'data': [e.to_dict() for e in emails]
+            'data': {'total': service.count_emails(filters)}
         }), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
     
+@emails_bp.route('/search', methods=['GET'])
+def search_emails():
+    """
+    Busca textual em assunto/corpo (?q=&limit=&cursor=&fields=), sem
+    diferenciar acentos e maiúsculas; resultados mais relevantes primeiro
+    """
+    try:
+        q = (request.args.get('q') or '').strip()
+        if not q:
+            raise ValueError("Parâmetro 'q' é obrigatório")
+        limit, cursor = get_page_args()
+        fields = parse_fields(request.args.get('fields'))
+        
+        service = get_service()
+        hits, next_cursor = service.search_emails(q, limit, cursor, fields)
+        return jsonify({
+            'success': True,
+            'data': [{**email.to_dict(fields), 'score': round(score, 4)} for email, score in hits],
+            'next_cursor': next_cursor
+        }), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@emails_bp.route('/export', methods=['GET'])
+def export_emails():
+    """
+    Exporta todos os emails filtrados em streaming (?format=ndjson|csv),
+    com os mesmos filtros da listagem. ?fields= escolhe as colunas (lista
+    separada por vírgulas ou 'all'); sem ele vão todos os campos exceto os
+    internos (corpo_ref, conteudo_hash, simhash), com o corpo completo. As
+    páginas são lidas do Firestore conforme as linhas são enviadas, então a
+    memória não cresce com o tamanho da coleção.
+    """
+    try:
+        formato = request.args.get('format', 'ndjson')
+        if formato not in EXPORT_FORMATS:
+            raise ValueError("Parâmetro 'format' deve ser 'ndjson' ou 'csv'")
+        filters = parse_email_filters(request.args)
+        fields = parse_fields(request.args.get('fields'), default=EXPORT_FIELDS)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    service = get_service()
+    emails = service.iter_emails(filters, fields)
+    linhas = ndjson_lines(emails, fields) if formato == 'ndjson' else csv_lines(emails, fields)
+    
+    return Response(
+        stream_with_context(linhas),
+        mimetype=EXPORT_FORMATS[formato],
+        headers={'Content-Disposition': f'attachment; filename="emails.{formato}"'}
+    )
+
 @emails_bp.route('/<email_id>', methods=['GET'])
 def email_by_id(email_id):
     """Lista todos emails"""
@@ -43,16 +129,39 @@ def email_by_id(email_id):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@emails_bp.route('/<email_id>/anexos/<int:index>', methods=['GET'])
+def email_attachment(email_id, index):
+    """Download de um anexo (conteúdo vem do BodyStore)"""
+    try:
+        service = get_service()
+        anexo, conteudo = service.get_attachment(email_id, index)
+        nome = (anexo.get('nome') or f'anexo-{index}').replace('"', '')
+        return Response(
+            conteudo,
+            mimetype=anexo.get('tipo') or 'application/octet-stream',
+            headers={'Content-Disposition': f'attachment; filename="{nome}"'}
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @emails_bp.route('/pending', methods=['GET'])
 def list_pending():
-    """Lista pendentes"""
+    """Lista pendentes paginados (?limit=&cursor=&fields=)"""
     try:
+        limit, cursor = get_page_args()
+        filters = parse_email_filters(request.args)
+        fields = parse_fields(request.args.get('fields'))
         service = get_service()
-        emails = service.get_pending_emails()
+        emails, next_cursor = service.get_pending_emails_page(limit, cursor, filters, fields)
         return jsonify({
             'success': True,
-            'data': [e.to_dict() for e in emails]
+            'data': [e.to_dict(fields) for e in emails],
+            'next_cursor': next_cursor
         }), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -82,46 +191,103 @@ def create_email():
         print(e)
         return jsonify({'success': False, 'error': str(e)}), 400
 
+@emails_bp.route('/classify-batch', methods=['PUT'])
+def classify_batch():
+    """
+    Classificar vários emails de uma vez.
+    Body: {"emails": [{"id", "estado", "municipio", "categoria"}, ...]}
+    ou {"ids": [...], "estado", "municipio", "categoria"} (mesma classificação para todos)
+    Grava em lotes: 409 se emails forem alterados durante a escrita, com os
+    lotes anteriores já classificados (reenviar o pedido é seguro).
+    """
+    data = request.get_json(silent=True) or {}
+    if 'ids' in data:
+        if not isinstance(data['ids'], list):
+            return jsonify({'success': False, 'error': "'ids' deve ser uma lista"}), 400
+        itens = [
+            {'id': email_id, 'estado': data.get('estado'), 'municipio': data.get('municipio'),
+             'categoria': data.get('categoria')}
+            for email_id in data['ids']
+        ]
+    elif isinstance(data.get('emails'), list):
+        itens = data['emails']
+    else:
+        return jsonify({'success': False, 'error': "Envie 'emails' ou 'ids'"}), 400
+    
+    if len(itens) > Config.CLASSIFY_BATCH_MAX:
+        return jsonify({'success': False, 'error': f"Máximo de {Config.CLASSIFY_BATCH_MAX} emails por requisição"}), 400
+    
+    try:
+        resultados = get_service().classify_emails(itens)
+    except ConflictError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+    except Exception as e:
+        print(f"❌ Erro na classificação em lote: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    resumo = {}
+    for resultado in resultados:
+        resumo[resultado['status']] = resumo.get(resultado['status'], 0) + 1
+    
+    return jsonify({'success': True, 'data': resultados, 'resumo': resumo}), 200
+
 @emails_bp.route('/<email_id>/classify', methods=['PUT'])
 def classify_email(email_id):
-    """Classificar email"""
+    """
+    Classificar email. `versao` (opcional, de GET /api/emails/<id>) faz a
+    escrita falhar com 409 se outra pessoa alterou o email nesse meio tempo.
+    """
     try:
-        data = request.get_json()
-        print(data)
+        data = request.get_json(silent=True) or {}
         service = get_service()
         
-        email = service.classify_email(
+        classificacao = service.classify_email(
             email_id=email_id,
             estado=data['estado'],
             municipio=data['municipio'], 
-            categoria=data['categoria']
+            categoria=data['categoria'],
+            versao=data.get('versao')
         )
         
         return jsonify({
             'success': True,
-            'data': email.to_dict()
+            'data': classificacao
         }), 200
+    except EmailNotFoundError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+    except ConflictError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+    except KeyError as e:
+        return jsonify({'success': False, 'error': f"Campo obrigatório: {e.args[0]}"}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 400
 
 @emails_bp.route('/<email_id>', methods=['PUT'])
 def update_email(email_id):
-    """Atualizar email"""
+    """Atualizar email (só os campos enviados; `versao` opcional como em classify)"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         service = get_service()
-        service.update_email(email_id=email_id, data = data)
-        return  jsonify({'success': True}), 200 
+        versao = service.update_email(email_id=email_id, data=data, versao=data.get('versao'))
+        return jsonify({'success': True, 'versao': versao}), 200
+    except EmailNotFoundError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+    except ConflictError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
     except Exception as e:
         print(str(e))
         return jsonify({'success': False, 'error': str(e)}), 400
 
 @emails_bp.route('/<email_id>', methods=['DELETE'])
 def delete_email(email_id):
-    """Excluir email"""
+    """Excluir email (?versao= opcional como em classify)"""
     try:
         service = get_service()
-        service.delete_email(email_id)
+        service.delete_email(email_id, versao=request.args.get('versao') or None)
         return jsonify({'success': True}), 200 
+    except EmailNotFoundError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+    except ConflictError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 400
\ No newline at end of file
@@ -1,17 +1,17 @@
-# api/emails.py
+# api/funcionarios.py
 from flask import Blueprint, request, jsonify
 from services.funcionario_service import FuncionarioService
-from repositories.funcionario_repository import FuncionarioRepository
-from services.firestore_client import get_firestore_client
-from datetime import datetime
+from services.email_service import EmailService
+from services.storage import get_email_repository, get_funcionario_repository
+from utils.pagination import parse_limit
+from utils.email_fields import parse_fields
+from config import Config
 
 funcionarios_bp = Blueprint('funcionarios', __name__, url_prefix='/api/funcionarios')
 
 def get_service():
     """Helper: cria service"""
-    db = get_firestore_client()
-    repo = FuncionarioRepository(db)
-    return FuncionarioService(repo)
+    return FuncionarioService(get_funcionario_repository())
 
 @funcionarios_bp.route('/', methods=['GET'])
 def list_funcionarios():
@@ -24,4 +24,44 @@ def list_funcionarios():
             'data': [e.to_dict() for e in funcionarios]
         }), 200
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@funcionarios_bp.route('/<path:funcionario_ref>/emails', methods=['GET'])
+def list_funcionario_emails(funcionario_ref):
+    """
+    Emails enviados por um funcionário, paginados (?limit=&cursor=&fields=).
+    Aceita o ID do funcionário ou o próprio endereço do remetente
+    (sem diferenciar maiúsculas: `remetente` é gravado em minúsculas).
+    Usa o índice (remetente, data) da coleção emails.
+    """
+    try:
+        limit = parse_limit(request.args.get('limit'), Config.PAGE_SIZE_DEFAULT, Config.PAGE_SIZE_MAX)
+        cursor = request.args.get('cursor') or None
+        fields = parse_fields(request.args.get('fields'))
+        
+        if '@' in funcionario_ref:
+            remetente = funcionario_ref.strip().lower()
+        else:
+            funcionario = get_service().get_funcionario(funcionario_ref)
+            if not funcionario:
+                return jsonify({'success': False, 'error': 'Funcionário não encontrado'}), 404
+            remetente = funcionario.email
+        
+        email_service = EmailService(get_email_repository(), None)
+        filters = {'remetente': remetente}
+        emails, next_cursor = email_service.get_emails_page(limit, cursor, filters, fields)
+        
+        response = {
+            'success': True,
+            'data': [e.to_dict(fields) for e in emails],
+            'next_cursor': next_cursor
+        }
+        # Total só na primeira página
+        if not cursor:
+            response['total'] = email_service.count_emails(filters)
+        
+        return jsonify(response), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
@@ -1,47 +1,38 @@
 # api/sync.py
-from flask import Blueprint, jsonify
-from services.imap_service import ImapService
-from services.email_service import EmailService
-from repositories.email_repository import EmailRepository
-from services.firestore_client import get_firestore_client
-import os
+from flask import Blueprint, jsonify, url_for
+from utils.scheduler import get_sync_jobs, get_sync_runner
 
 sync_bp = Blueprint('sync', __name__, url_prefix='/api/sync')
 
 @sync_bp.route('/trigger', methods=['POST'])
 def trigger_sync():
-    """Trigger sincronização manual"""
+    """
+    Trigger sincronização manual de todas as caixas em segundo plano.
+    Responde 202 com o job; acompanhe em GET /api/sync/jobs/<id>.
+    Com um job na fila ou executando, o trigger é mesclado nele.
+    """
     try:
-        # IMAP Service
-        imap = ImapService(
-            email_addr=os.getenv('EMAIL_ADDRESS'),
-            password=os.getenv('EMAIL_PASSWORD')
-        )
-        
-        # Busca novos emails
-        novos_emails = imap.fetch_new_emails()
-        
-        # Salva no banco
-        db = get_firestore_client()
-        repo = EmailRepository(db)
-        service = EmailService(repo)
-        
-        salvos = []
-        for email_obj in novos_emails:
-            email_salvo = service.create_email(
-                remetente=email_obj.remetente,
-                destinatario=email_obj.destinatario,
-                assunto=email_obj.assunto,
-                corpo=email_obj.corpo,
-                data=email_obj.data
-            )
-            salvos.append(email_salvo)
-        
+        jobs = get_sync_jobs()
+        job, criado = jobs.trigger()
+        url = url_for('sync.get_sync_job', job_id=job.id)
         return jsonify({
             'success': True,
-            'message': f'{len(salvos)} emails sincronizados',
-            'data': [e.to_dict() for e in salvos]
-        }), 200
-        
+            'message': 'Sincronização iniciada' if criado else 'Sincronização já em andamento',
+            'data': jobs.snapshot(job.id)
+        }), 202, {'Location': url}
+
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@sync_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_sync_job(job_id):
+    """Status, progresso por caixa, emails gravados e erros de um job de sync"""
+    dados = get_sync_jobs().snapshot(job_id)
+    if dados is None:
+        return jsonify({'success': False, 'error': f'Job {job_id} não encontrado'}), 404
+    return jsonify({'success': True, 'data': dados}), 200
+
+@sync_bp.route('/metrics', methods=['GET'])
+def sync_metrics():
+    """Por caixa: execuções, erros, execuções puladas, intervalo e atraso do sync neste processo"""
+    return jsonify({'success': True, 'data': get_sync_runner().report()}), 200
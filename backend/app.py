@@ -5,6 +5,7 @@ from api.dashboard import dashboard_bp
 from api.funcionarios import funcionarios_bp
 from api.sync import sync_bp
 from utils.scheduler import start_scheduler
+from cli import register_commands
 from config import Config
 
 def create_app(config_class=Config):
@@ -21,6 +22,9 @@ def create_app(config_class=Config):
     app.register_blueprint(sync_bp)
     app.register_blueprint(funcionarios_bp)
     
+    # Comandos de manutenção (flask --app app rebuild-stats)
+    register_commands(app)
+    
     # Scheduler (desabilitar em modo testing)
     # if not app.config.get('TESTING'):
     #     start_scheduler()
@@ -0,0 +1,100 @@
+# benchmarks/bench_dashboard_counts.py
+"""
+Compara as contagens do dashboard: varredura completa (find_all) x aggregation query (count).
+
+Roda contra o emulador do Firestore para não gerar custo:
+
+    firebase emulators:start --only firestore
+    FIRESTORE_EMULATOR_HOST=localhost:8080 python -m benchmarks.bench_dashboard_counts --sizes 10000 100000
+
+Leituras cobradas (estimadas pela tabela de preços do Firestore):
+- varredura: 1 leitura por documento retornado
+- count(): 1 leitura a cada 1000 entradas de índice (mínimo 1)
+"""
+import argparse
+import math
+import os
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from google.cloud import firestore
+from repositories.email_repository import EmailRepository
+
+ESTADOS = ['PI', 'CE', 'MA', 'SP', 'RJ']
+
+
+def seed(db, repo: EmailRepository, atual: int, alvo: int):
+    """Completa a coleção até `alvo` documentos"""
+    agora = datetime.now(timezone.utc)
+    writer = db.bulk_writer()
+    for i in range(atual, alvo):
+        classificado = i % 3 == 0
+        writer.create(repo.collection.document(f'bench-{i:07d}'), {
+            'remetente': f'func{i % 50}@empresa.com',
+            'destinatario': f'cliente{i % 200}@example.com',
+            'assunto': f'Assunto {i}',
+            'corpo': 'Lorem ipsum dolor sit amet. ' * 40,
+            'data': agora - timedelta(minutes=i),
+            'estado': ESTADOS[i % len(ESTADOS)] if classificado else None,
+            'municipio': None,
+            'categoria': None,
+            'classificado': classificado,
+        })
+    writer.close()
+
+
+def medir(fn, repeticoes: int):
+    """Executa `fn` e retorna (resultado, mediana do tempo em ms)"""
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = fn()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return resultado, statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--project', default='bench-local')
+    args = parser.parse_args()
+
+    if not os.getenv('FIRESTORE_EMULATOR_HOST'):
+        raise SystemExit("Defina FIRESTORE_EMULATOR_HOST (o benchmark grava até 100k documentos)")
+
+    db = firestore.Client(project=args.project)
+    repo = EmailRepository(db)
+    atual = 0
+
+    print(f"{'docs':>8} | {'caminho':<22} | {'ms (mediana)':>12} | {'leituras':>9}")
+    for alvo in sorted(args.sizes):
+        seed(db, repo, atual, alvo)
+        atual = alvo
+
+        def varredura():
+            emails = repo.find_all()
+            total = len(emails)
+            classificados = sum(1 for e in emails if e.classificado)
+            sete_dias = datetime.now(timezone.utc) - timedelta(days=7)
+            recentes = sum(1 for e in emails if e.data and e.data >= sete_dias)
+            return total, classificados, total - classificados, recentes
+
+        def agregacao():
+            total = repo.count()
+            classificados = repo.count({'classificado': True})
+            return total, classificados, total - classificados, repo.count_recent(7)
+
+        resultado_scan, ms_scan = medir(varredura, args.repeat)
+        resultado_count, ms_count = medir(agregacao, args.repeat)
+        assert resultado_scan == resultado_count, (resultado_scan, resultado_count)
+
+        total, classificados, _, recentes = resultado_count
+        leituras_count = sum(max(1, math.ceil(n / 1000)) for n in (total, classificados, recentes))
+        print(f"{alvo:>8} | {'varredura (find_all)':<22} | {ms_scan:>12.1f} | {total:>9}")
+        print(f"{alvo:>8} | {'count() x3':<22} | {ms_count:>12.1f} | {leituras_count:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+# benchmarks/bench_email_parser.py
+"""
+Custo por endereço do EmailParser (utils.email_parser).
+
+    python -m benchmarks.bench_email_parser --headers 20000
+
+Mede, em microssegundos por endereço:
+- frio: cabeçalhos todos distintos (sem acerto no cache);
+- cache: remetentes repetidos, como no sync (poucas pessoas enviam muito).
+Os cabeçalhos misturam nomes simples, nomes RFC 2047 e listas de destinatários.
+"""
+import argparse
+import random
+import time
+from utils.email_parser import EmailParser, _parse
+
+NOMES = ['Ana Souza', 'João Pereira', 'Maria da Silva', 'José Araújo', 'Secretaria de Saúde']
+
+
+def _header(i: int) -> str:
+    nome = random.choice(NOMES)
+    tipo = i % 3
+    if tipo == 0:
+        return f'{nome} <pessoa{i}@prefeitura.gov.br>'
+    if tipo == 1:
+        codificado = nome.encode('utf-8').hex('=').upper()
+        return f'=?utf-8?q?={codificado}?= <pessoa{i}@prefeitura.gov.br>'
+    return ', '.join(f'"{nome}, {j}" <pessoa{i}.{j}@prefeitura.gov.br>' for j in range(3))
+
+
+def _medir(headers) -> float:
+    enderecos = 0
+    inicio = time.perf_counter()
+    for header in headers:
+        enderecos += len(EmailParser.parse_addresses(header))
+    return (time.perf_counter() - inicio) / enderecos * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--headers', type=int, default=20000)
+    parser.add_argument('--remetentes', type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(42)
+    distintos = [_header(i) for i in range(args.headers)]
+    repetidos = [random.choice(distintos[:args.remetentes]) for _ in range(args.headers)]
+
+    _parse.cache_clear()
+    print(f"frio:  {_medir(distintos):.2f} µs/endereço")
+    _parse.cache_clear()
+    print(f"cache: {_medir(repetidos):.2f} µs/endereço ({EmailParser.cache_info().hits} acertos)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/bench_gazetteer.py
+"""
+Vazão da sugestão de estado/município (utils.gazetteer) em um núcleo.
+
+    python -m benchmarks.bench_gazetteer --emails 20000 --palavras 150
+
+Gera emails sintéticos (vocabulário de Zipf com nomes de cidades e
+estados misturados, assinatura com 'Cidade - UF' em parte deles) e mede
+emails por segundo do suggest_location, incluindo a tokenização.
+"""
+import argparse
+import itertools
+import random
+import time
+from utils.gazetteer import get_gazetteer, suggest_location
+from utils.localidades import ESTADOS, MUNICIPIOS_POR_ESTADO
+
+PALAVRAS = (
+    'licitação edital prefeitura secretaria saúde educação obra contrato ofício '
+    'memorando reunião pauta orçamento convênio município estado relatório '
+    'pagamento empenho processo pregão aditivo prazo entrega vistoria para de do'
+).split()
+VOCABULARIO = PALAVRAS + [f'termo{i}' for i in range(20000)]
+PESOS = list(itertools.accumulate(1 / (i + 1) for i in range(len(VOCABULARIO))))
+LOCALIDADES = [(uf, municipio) for uf, municipios in MUNICIPIOS_POR_ESTADO.items() for municipio in municipios]
+
+
+def _email(palavras: int):
+    uf, municipio = random.choice(LOCALIDADES)
+    corpo = random.choices(VOCABULARIO, cum_weights=PESOS, k=palavras)
+    if random.random() < 0.5:
+        corpo.insert(random.randrange(len(corpo)), municipio)
+    if random.random() < 0.2:
+        corpo.insert(random.randrange(len(corpo)), ESTADOS[random.choice(list(ESTADOS))])
+    assinatura = f"\n\n--\nFulano de Tal\nSecretaria Municipal\n{municipio} - {uf}" if random.random() < 0.5 else ''
+    assunto = ' '.join(random.choices(VOCABULARIO, cum_weights=PESOS, k=6))
+    return assunto, ' '.join(corpo) + assinatura
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--emails', type=int, default=20000)
+    parser.add_argument('--palavras', type=int, default=150)
+    args = parser.parse_args()
+
+    random.seed(42)
+    emails = [_email(args.palavras) for _ in range(args.emails)]
+
+    inicio = time.perf_counter()
+    get_gazetteer()
+    print(f"gazetteer construído em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    inicio = time.perf_counter()
+    sugeridos = sum(1 for assunto, corpo in emails if suggest_location(assunto, corpo))
+    segundos = time.perf_counter() - inicio
+    print(f"{args.emails} emails ({args.palavras} palavras) em {segundos:.2f} s: "
+          f"{args.emails / segundos:.0f} emails/s, {sugeridos} com sugestão")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+# benchmarks/bench_imap_fetch.py
+"""
+Vazão do sync IMAP contra um servidor IMAP local mínimo (socket TCP de verdade,
+com atraso artificial por comando para simular a latência de rede).
+
+    python -m benchmarks.bench_imap_fetch --messages 2000 --rtt-ms 20
+
+Compara um UID FETCH por mensagem (chunk=1, como antes) com lotes maiores.
+"""
+import argparse
+import imaplib
+import re
+import socketserver
+import threading
+import time
+from services import imap_service
+from services.imap_service import ImapService
+
+MENSAGEM = (
+    "From: Func {uid} <func{uid}@empresa.com>\r\n"
+    "To: cliente@example.com\r\n"
+    "Subject: Relatorio {uid}\r\n"
+    "Message-ID: <{uid}@empresa.com>\r\n"
+    "Content-Type: text/plain; charset=utf-8\r\n\r\n"
+    + "Linha de texto do corpo do email.\r\n" * 60
+)
+
+
+def _uids_do_set(uid_set: str, maximo: int):
+    for faixa in uid_set.split(','):
+        inicio, _, fim = faixa.partition(':')
+        fim = maximo if fim == '*' else int(fim or inicio)
+        yield from range(int(inicio), min(fim, maximo) + 1)
+
+
+class ImapStandIn(socketserver.StreamRequestHandler):
+    """Implementa só o necessário: LOGIN, SELECT/EXAMINE, UID SEARCH, UID FETCH, LOGOUT"""
+
+    def send(self, line: bytes):
+        self.wfile.write(line + b'\r\n')
+
+    def handle(self):
+        total = self.server.total
+        rtt = self.server.rtt
+        self.send(b'* OK IMAP4rev1 stand-in pronto')
+        for raw in self.rfile:
+            time.sleep(rtt)
+            tag, comando, *resto = raw.decode().strip().split(' ', 2)
+            args = resto[0] if resto else ''
+            comando = comando.upper()
+            if comando == 'CAPABILITY':
+                self.send(b'* CAPABILITY IMAP4rev1')
+            elif comando in ('SELECT', 'EXAMINE'):
+                self.send(b'* %d EXISTS' % total)
+                self.send(b'* OK [UIDVALIDITY 1] UIDs validos')
+            elif comando == 'UID' and args.upper().startswith('SEARCH'):
+                faixa = re.search(r'UID (\S+)', args, re.I).group(1)
+                uids = ' '.join(str(u) for u in _uids_do_set(faixa, total))
+                self.send(f'* SEARCH {uids}'.encode())
+            elif comando == 'UID' and args.upper().startswith('FETCH'):
+                uid_set = args.split(' ')[1]
+                for uid in _uids_do_set(uid_set, total):
+                    corpo = MENSAGEM.format(uid=uid).encode()
+                    self.wfile.write(b'* %d FETCH (UID %d BODY[] {%d}\r\n' % (uid, uid, len(corpo)))
+                    self.wfile.write(corpo + b')\r\n')
+            elif comando == 'LOGOUT':
+                self.send(b'* BYE')
+                self.send(f'{tag} OK LOGOUT'.encode())
+                return
+            self.send(f'{tag} OK {comando}'.encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--rtt-ms', type=float, default=20.0)
+    parser.add_argument('--chunks', type=int, nargs='+', default=[1, 50, 200])
+    args = parser.parse_args()
+
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), ImapStandIn)
+    server.daemon_threads = True
+    server.total = args.messages
+    server.rtt = args.rtt_ms / 1000
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+
+    # ImapService usa IMAP4_SSL; o stand-in fala IMAP sem TLS
+    imap_service.imaplib.IMAP4_SSL = imaplib.IMAP4
+
+    print(f"{args.messages} mensagens, RTT simulado {args.rtt_ms} ms")
+    print(f"{'chunk':>6} | {'segundos':>9} | {'msgs/s':>9}")
+    for chunk in args.chunks:
+        service = ImapService('bench@empresa.com', 'senha')
+        service.server, service.port = host, port
+        service.chunk_size = chunk
+
+        inicio = time.perf_counter()
+        mensagens, _ = service.fetch_new_emails()
+        total = sum(1 for _ in mensagens)
+        segundos = time.perf_counter() - inicio
+        assert total == args.messages, total
+        print(f"{chunk:>6} | {segundos:>9.2f} | {total / segundos:>9.0f}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
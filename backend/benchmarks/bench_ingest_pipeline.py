@@ -0,0 +1,85 @@
+# benchmarks/bench_ingest_pipeline.py
+"""
+Vazão do sync: laço sequencial (fetch -> parse -> persist, um de cada vez)
+contra o IngestPipeline com parse em threads e em processos.
+
+    python -m benchmarks.bench_ingest_pipeline --mensagens 2000 --workers 4
+
+O IMAP e o Firestore são simulados por esperas: --fetch-ms por lote de
+IMAP_FETCH_CHUNK_SIZE mensagens e --persist-ms por lote gravado. O parse é
+o ImapService.parse_message real (MimeExtractor) sobre mensagens multipart
+com texto, HTML e um anexo pequeno descartado.
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from services.imap_service import ImapService
+from services.ingest_pipeline import IngestPipeline
+
+CHUNK = 100
+BATCH = 200
+
+RAW = (b'From: Ana <ana@prefeitura.gov.br>\r\nTo: sup@empresa.com\r\nSubject: Relatorio %d\r\n'
+       b'Message-ID: <%d@x>\r\nContent-Type: multipart/mixed; boundary=b\r\n\r\n'
+       b'--b\r\nContent-Type: multipart/alternative; boundary=c\r\n\r\n'
+       b'--c\r\nContent-Type: text/plain; charset=utf-8\r\n\r\n' + b'Relat\xc3\xb3rio da regional.\r\n' * 200 +
+       b'--c\r\nContent-Type: text/html; charset=utf-8\r\n\r\n' + b'<p>Relat&oacute;rio da regional.</p>\r\n' * 200 +
+       b'--c--\r\n--b\r\nContent-Type: application/pdf\r\nContent-Transfer-Encoding: base64\r\n'
+       b'Content-Disposition: attachment; filename="a.pdf"\r\n\r\n' + b'QUJDREVGR0hJSktMTU5PUFFSU1RVVldYWVo=\r\n' * 300 +
+       b'--b--\r\n')
+
+
+def _imap(n: int, fetch_ms: float):
+    for inicio in range(1, n + 1, CHUNK):
+        time.sleep(fetch_ms / 1000)
+        for uid in range(inicio, min(n, inicio + CHUNK - 1) + 1):
+            yield uid, [RAW % (uid, uid)]
+
+
+def _persist(persist_ms: float, lote):
+    time.sleep(persist_ms / 1000)
+
+
+def _sequencial(imap: ImapService, args) -> float:
+    inicio = time.perf_counter()
+    lote = []
+    for uid, partes in _imap(args.mensagens, args.fetch_ms):
+        lote.append((uid, imap.parse_message(1, uid, partes)))
+        if len(lote) >= BATCH:
+            _persist(args.persist_ms, lote)
+            lote = []
+    if lote:
+        _persist(args.persist_ms, lote)
+    return time.perf_counter() - inicio
+
+
+def _pipeline(imap: ImapService, executor, args) -> float:
+    inicio = time.perf_counter()
+    IngestPipeline(partial(imap.parse_message, 1), partial(_persist, args.persist_ms), executor,
+                   batch_size=BATCH, queue_size=500).run(_imap(args.mensagens, args.fetch_ms))
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mensagens', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--fetch-ms', type=float, default=150)
+    parser.add_argument('--persist-ms', type=float, default=250)
+    args = parser.parse_args()
+
+    imap = ImapService('bench@empresa.com', 'senha')
+    resultados = [('sequencial', _sequencial(imap, args))]
+    with ThreadPoolExecutor(args.workers) as executor:
+        resultados.append((f'pipeline, {args.workers} threads', _pipeline(imap, executor, args)))
+    with ProcessPoolExecutor(args.workers) as executor:
+        resultados.append((f'pipeline, {args.workers} processos', _pipeline(imap, executor, args)))
+
+    print(f"{args.mensagens} mensagens, IMAP {args.fetch_ms:g} ms/{CHUNK}, Firestore {args.persist_ms:g} ms/{BATCH}")
+    for nome, segundos in resultados:
+        print(f"  {nome:<24} {segundos:6.2f}s  {args.mensagens / segundos:8.0f} msg/s")
+
+
+if __name__ == '__main__':
+    main()
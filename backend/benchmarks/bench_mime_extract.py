@@ -0,0 +1,118 @@
+# benchmarks/bench_mime_extract.py
+"""
+Extração MIME do sync: email.message_from_bytes + walk (antigo) contra
+o MimeExtractor (utils.mime_extract).
+
+    python -m benchmarks.bench_mime_extract --mensagens 2000 --anexo-mb 30
+
+Mede:
+- corpos vazios num lote misto (texto puro, só HTML, latin-1 sem charset);
+- pico de memória (tracemalloc) de uma mensagem com anexo grande, com o
+  anexo descartado acima de MIME_MAX_ATTACHMENT_BYTES;
+- tempo por mensagem do lote.
+"""
+import argparse
+import base64
+import email
+import tempfile
+import time
+import tracemalloc
+from services.body_store import LocalBodyStore
+from utils.mime_extract import MimeExtractor
+
+CABECALHO = b'From: Ana <ana@prefeitura.gov.br>\r\nSubject: Relatorio\r\nMessage-ID: <%d@x>\r\n'
+
+
+def _texto(i: int) -> bytes:
+    return CABECALHO % i + b'Content-Type: text/plain; charset=utf-8\r\n\r\nRelat\xc3\xb3rio %d\r\n' % i
+
+
+def _html(i: int) -> bytes:
+    return (CABECALHO % i + b'Content-Type: multipart/alternative; boundary=b\r\n\r\n'
+            b'--b\r\nContent-Type: text/html; charset=utf-8\r\n\r\n'
+            b'<html><body><p>Relat&oacute;rio %d</p></body></html>\r\n--b--\r\n' % i)
+
+
+def _latin1(i: int) -> bytes:
+    # Cliente antigo: latin-1 sem charset declarado
+    return CABECALHO % i + b'\r\nReuni\xe3o da regional %d\r\n' % i
+
+
+def _com_anexo(megabytes: int) -> bytes:
+    anexo = base64.encodebytes(b'\x00\x01\x02\x03' * (megabytes * 256 * 1024)).replace(b'\n', b'\r\n')
+    return (CABECALHO % 0 + b'Content-Type: multipart/mixed; boundary=b\r\n\r\n'
+            b'--b\r\nContent-Type: text/plain\r\n\r\nsegue\r\n'
+            b'--b\r\nContent-Type: application/zip\r\nContent-Transfer-Encoding: base64\r\n'
+            b'Content-Disposition: attachment; filename="a.zip"\r\n\r\n' + anexo + b'\r\n--b--\r\n')
+
+
+def _legado(raw: bytes) -> str:
+    """Extração anterior (ImapService._extract_body)"""
+    msg = email.message_from_bytes(raw)
+    if msg.is_multipart():
+        for part in msg.walk():
+            if part.get_content_type() == "text/plain":
+                try:
+                    return part.get_payload(decode=True).decode()
+                except Exception:
+                    return ""
+        return ""
+    try:
+        return msg.get_payload(decode=True).decode()
+    except Exception:
+        return ""
+
+
+def _legado_com_anexos(raw: bytes):
+    msg = email.message_from_bytes(raw)
+    return [part.get_payload(decode=True) for part in msg.walk() if part.get_filename()]
+
+
+def _pico(funcao, *args) -> float:
+    tracemalloc.start()
+    funcao(*args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pico / 1024 / 1024
+
+
+def _chunks(raw: bytes, tamanho: int = 64 * 1024):
+    # Como o imaplib entregaria em pedaços; a cópia de cada pedaço entra na medida
+    for i in range(0, len(raw), tamanho):
+        yield raw[i:i + tamanho]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mensagens', type=int, default=2000)
+    parser.add_argument('--anexo-mb', type=int, default=30)
+    args = parser.parse_args()
+
+    geradores = (_texto, _html, _latin1)
+    lote = [geradores[i % 3](i) for i in range(args.mensagens)]
+    extractor = MimeExtractor()
+
+    inicio = time.perf_counter()
+    vazios_legado = sum(1 for raw in lote if not _legado(raw).strip())
+    tempo_legado = (time.perf_counter() - inicio) / len(lote) * 1e6
+
+    inicio = time.perf_counter()
+    vazios_novo = sum(1 for raw in lote if not extractor.extract([raw]).corpo.strip())
+    tempo_novo = (time.perf_counter() - inicio) / len(lote) * 1e6
+
+    print(f"{len(lote)} mensagens (1/3 texto, 1/3 só HTML, 1/3 latin-1 sem charset)")
+    print(f"  corpos vazios: antigo {vazios_legado}, novo {vazios_novo}")
+    print(f"  tempo/mensagem: antigo {tempo_legado:.1f} µs, novo {tempo_novo:.1f} µs")
+
+    raw = _com_anexo(args.anexo_mb)
+    with tempfile.TemporaryDirectory() as pasta:
+        store = LocalBodyStore(pasta)
+        pico_legado = _pico(_legado_com_anexos, raw)
+        pico_novo = _pico(lambda: MimeExtractor(store).extract(_chunks(raw)))
+    print(f"anexo de {args.anexo_mb} MB ({len(raw) / 1024 / 1024:.0f} MB em base64), "
+          f"fora a mensagem crua já baixada")
+    print(f"  pico de memória: antigo {pico_legado:.1f} MB, novo {pico_novo:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_search.py
+"""
+Latência da busca textual (SearchIndex / SQLite FTS5) sobre emails sintéticos.
+
+    python -m benchmarks.bench_search --emails 100000
+
+Indexa N emails em um arquivo temporário e mede a mediana e o p95 das
+consultas de uma e de várias palavras (primeira página de 50 resultados).
+O vocabulário segue uma distribuição de Zipf (poucas palavras muito
+comuns, muitas raras), como em texto real.
+"""
+import argparse
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import time
+from services.search_index import SearchIndex
+
+PALAVRAS = (
+    'licitação edital prefeitura secretaria saúde educação obra contrato ofício '
+    'memorando reunião pauta orçamento convênio município estado relatório '
+    'pagamento empenho processo pregão aditivo prazo entrega vistoria'
+).split()
+CIDADES = ['Teresina', 'Parnaíba', 'Picos', 'Floriano', 'São Luís', 'Fortaleza', 'Recife', 'Natal']
+VOCABULARIO = PALAVRAS + CIDADES + [f'termo{i}' for i in range(20000)]
+# Peso da i-ésima palavra ~ 1/(i+1) (acumulado, para random.choices)
+PESOS = list(itertools.accumulate(1 / (i + 1) for i in range(len(VOCABULARIO))))
+CONSULTAS = ['licitacao', 'pregao teresina', 'relatorio orcamento', 'contrato aditivo prazo', 'parnaiba', 'emp', 'te']
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--emails', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SearchIndex(os.path.join(tmp, 'search.db'))
+
+        inicio = time.perf_counter()
+        lote = []
+        for i in range(args.emails):
+            assunto = ' '.join(random.choices(VOCABULARIO, cum_weights=PESOS, k=6))
+            corpo = ' '.join(random.choices(VOCABULARIO, cum_weights=PESOS, k=150))
+            lote.append((str(i), assunto, corpo))
+            if len(lote) == 1000:
+                index.add_many(lote)
+                lote = []
+        index.add_many(lote)
+        print(f"{args.emails} emails indexados em {time.perf_counter() - inicio:.1f} s")
+
+        print(f"{'consulta':>24} | {'mediana ms':>10} | {'p95 ms':>8}")
+        for consulta in CONSULTAS:
+            tempos = []
+            for _ in range(args.queries):
+                t0 = time.perf_counter()
+                index.search(consulta, limit=50)
+                tempos.append((time.perf_counter() - t0) * 1000)
+            tempos.sort()
+            p95 = tempos[int(len(tempos) * 0.95) - 1]
+            print(f"{consulta:>24} | {statistics.median(tempos):>10.2f} | {p95:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/bench_storage.py
+"""
+Lógica dos services sem rede: gravação do sync (EmailService.create_emails,
+com dedupe, sugestão de local e estatísticas) e listagens paginadas com
+filtro sobre os repositórios SQLite, em memória e em arquivo.
+
+    python -m benchmarks.bench_storage --emails 5000 --lote 200
+
+Corpos distintos (sem cópias a mesclar); busca e duplicados usam índices
+em memória e o corpo fica inline.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timezone
+from models.email import Email
+from repositories.sqlite_database import SqliteDatabase
+from repositories.sqlite_email_repository import SqliteEmailRepository
+from repositories.sqlite_funcionario_repository import SqliteFuncionarioRepository
+from services.body_store import LocalBodyStore
+from services.duplicate_index import DuplicateIndex
+from services.email_service import EmailService
+from services.funcionario_service import FuncionarioService
+from services.search_index import SearchIndex
+from utils.ttl_cache import TTLCache
+
+ESTADOS = ['PI', 'CE', 'MA', None]
+
+
+def _corpo(i: int) -> str:
+    rng = random.Random(i)
+    return ' '.join(''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=rng.randint(3, 9))) for _ in range(60))
+
+
+def _emails(inicio: int, n: int):
+    return [
+        Email(remetente=f'Servidor {i % 50} <servidor{i % 50}@prefeitura.gov.br>', destinatario='sup@empresa.com',
+              assunto=f'Ofício {i} da regional', corpo=_corpo(i),
+              data=datetime.now(timezone.utc), estado=ESTADOS[i % len(ESTADOS)], message_id=f'<{i}@bench>')
+        for i in range(inicio, inicio + n)
+    ]
+
+
+def _rodar(path: str, args, tmp: str):
+    db = SqliteDatabase(path)
+    repo = SqliteEmailRepository(db)
+    service = EmailService(repo, FuncionarioService(SqliteFuncionarioRepository(db), TTLCache(1000, 3600)),
+                           body_store=LocalBodyStore(tmp), search_index=SearchIndex(':memory:'),
+                           duplicate_index=DuplicateIndex(':memory:'))
+
+    inicio = time.perf_counter()
+    for lote in range(0, args.emails, args.lote):
+        service.create_emails(_emails(lote, min(args.lote, args.emails - lote)))
+    gravacao = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    paginas = 0
+    for filtro in ({}, {'estado': 'PI'}, {'classificado': False}, {'remetente': 'servidor7@prefeitura.gov.br'}):
+        cursor = None
+        while True:
+            _, cursor = repo.find_page(args.pagina, cursor, filtro, fields=['assunto', 'remetente'])
+            paginas += 1
+            if not cursor:
+                break
+    listagem = time.perf_counter() - inicio
+    db.close()
+    return gravacao, paginas, listagem
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--emails', type=int, default=5000)
+    parser.add_argument('--lote', type=int, default=200)
+    parser.add_argument('--pagina', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for nome, path in (('memory', ':memory:'), ('sqlite', os.path.join(tmp, 'storage.db'))):
+            gravacao, paginas, listagem = _rodar(path, args, tmp)
+            print(f"{nome:<7} gravação {args.emails / gravacao:8.0f} emails/s   "
+                  f"listagem {paginas / listagem:8.0f} páginas/s ({paginas} páginas de {args.pagina})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# cli.py
+import click
+from services.email_service import EmailService
+from services.storage import get_email_repository, get_funcionario_repository
+
+
+def register_commands(app):
+    """Registra comandos de manutenção (flask --app app <comando>)"""
+
+    @app.cli.command('rebuild-stats')
+    def rebuild_stats():
+        """Recalcula o documento de estatísticas do dashboard do zero"""
+        repo = get_email_repository()
+        stats = repo.rebuild_stats()
+        click.echo(
+            f"✅ Estatísticas reconstruídas: {stats['total']} emails "
+            f"({stats['classificados']} classificados, {stats['pendentes']} pendentes)"
+        )
+
+    @app.cli.command('migrate-funcionario-ids')
+    def migrate_funcionario_ids():
+        """Move funcionários antigos para o ID derivado do endereço"""
+        repo = get_funcionario_repository()
+        movidos = repo.migrate_document_ids()
+        click.echo(f"✅ {movidos} funcionários migrados para IDs determinísticos")
+
+    @app.cli.command('drop-emails-enviados')
+    def drop_emails_enviados():
+        """Remove o array legado emails_enviados dos funcionários"""
+        repo = get_funcionario_repository()
+        alterados = repo.drop_emails_enviados()
+        click.echo(f"✅ emails_enviados removido de {alterados} funcionários")
+
+    @app.cli.command('normalize-remetentes')
+    def normalize_remetentes():
+        """Grava em minúsculas o remetente dos emails antigos"""
+        service = EmailService(get_email_repository(), None)
+        alterados = service.normalize_remetentes()
+        click.echo(f"✅ Remetente normalizado em {alterados} emails")
+
+    @app.cli.command('reindex-search')
+    def reindex_search():
+        """Reconstrói o índice de busca (SQLite FTS5) a partir dos emails gravados"""
+        service = EmailService(get_email_repository(), None)
+        total = service.reindex()
+        click.echo(f"✅ Índice de busca reconstruído: {total} emails")
+
+    @app.cli.command('reindex-duplicates')
+    def reindex_duplicates():
+        """Reconstrói o índice de duplicados com os emails da janela recente"""
+        service = EmailService(get_email_repository(), None)
+        total = service.reindex_duplicates()
+        click.echo(f"✅ Índice de duplicados reconstruído: {total} emails")
+
+    @app.cli.command('suggest-locations')
+    @click.option('--recompute', is_flag=True, help='Recalcula também os que já têm sugestão')
+    def suggest_locations(recompute):
+        """Sugere estado/município (gazetteer) para os emails pendentes"""
+        service = EmailService(get_email_repository(), None)
+        analisados, sugeridos = service.suggest_pending(recompute)
+        click.echo(f"✅ {analisados} emails pendentes analisados, {sugeridos} com sugestão")
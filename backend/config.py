@@ -13,13 +13,101 @@ class Config:
     
     # Firebase/Firestore
     FIREBASE_CREDENTIALS_PATH = os.getenv('FIREBASE_CREDENTIALS_PATH', 'credentials.json')
+    # Contagens via aggregation query; False força a varredura (emuladores antigos)
+    FIRESTORE_AGGREGATION = os.getenv('FIRESTORE_AGGREGATION', 'True') == 'True'
+    
+    # Armazenamento de emails, funcionários e checkpoints do sync: 'firestore',
+    # 'sqlite' (arquivo em STORAGE_SQLITE_PATH, um nó) ou 'memory' (SQLite em
+    # memória, some ao encerrar; testes, benchmarks e desenvolvimento offline)
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'firestore')
+    STORAGE_SQLITE_PATH = os.getenv('STORAGE_SQLITE_PATH', 'data/storage.db')
     
     # Email (IMAP)
     EMAIL_ADDRESS = os.getenv('EMAIL_ADDRESS')
     EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD')
+    # Caixas sincronizadas: 'env' (só EMAIL_ADDRESS), 'file' (JSON em
+    # MAILBOXES_PATH) ou 'firestore' (coleção mailboxes); relidas a cada MAILBOX_RELOAD_SECONDS
+    MAILBOX_SOURCE = os.getenv('MAILBOX_SOURCE', 'env')
+    MAILBOXES_PATH = os.getenv('MAILBOXES_PATH', 'mailboxes.json')
+    MAILBOX_RELOAD_SECONDS = int(os.getenv('MAILBOX_RELOAD_SECONDS', '60'))
+    # Threads do SYNC_MODE=poll; cada uma sincroniza uma caixa por vez
+    SYNC_WORKERS = int(os.getenv('SYNC_WORKERS', '4'))
+    
+    # Paginação das listagens de emails
+    PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', '50'))
+    PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', '500'))
+    # Emails por requisição em PUT /api/emails/classify-batch
+    CLASSIFY_BATCH_MAX = int(os.getenv('CLASSIFY_BATCH_MAX', '1000'))
     
     # Scheduler
     #SYNC_INTERVAL_MINUTES = int(os.getenv('SYNC_INTERVAL_MINUTES', '1'))
+    # 'idle': conexão IMAP persistente com IDLE; 'poll': job a cada 6 segundos
+    SYNC_MODE = os.getenv('SYNC_MODE', 'idle')
+    # Segundos por ciclo de IDLE; RFC 2177 pede < 29 min
+    IMAP_IDLE_TIMEOUT = int(os.getenv('IMAP_IDLE_TIMEOUT', '300'))
+    # Segundos entre NOOPs quando o servidor não suporta IDLE
+    IMAP_NOOP_INTERVAL = float(os.getenv('IMAP_NOOP_INTERVAL', '6'))
+    # Emails gravados por lote no sync (WriteBatch)
+    SYNC_BATCH_SIZE = int(os.getenv('SYNC_BATCH_SIZE', '200'))
+    # Intervalo adaptativo do SYNC_MODE=poll (segundos): mínimo com emails
+    # chegando, cresce até o máximo com a caixa parada; jitter de ±20%
+    SYNC_INTERVAL_MIN = float(os.getenv('SYNC_INTERVAL_MIN', '5'))
+    SYNC_INTERVAL_MAX = float(os.getenv('SYNC_INTERVAL_MAX', '300'))
+    SYNC_INTERVAL_JITTER = float(os.getenv('SYNC_INTERVAL_JITTER', '0.2'))
+    # Pipeline de ingestão (fetch -> parse -> persist): mensagens em andamento
+    # entre download e gravação (back-pressure) e pool do parse MIME
+    SYNC_QUEUE_SIZE = int(os.getenv('SYNC_QUEUE_SIZE', '500'))
+    # 'thread' ou 'process' (parse usa CPU; processos escalam com os núcleos)
+    SYNC_PARSE_EXECUTOR = os.getenv('SYNC_PARSE_EXECUTOR', 'thread')
+    # 0 = padrão do executor (conforme os núcleos)
+    SYNC_PARSE_WORKERS = int(os.getenv('SYNC_PARSE_WORKERS', '0'))
+    # Segundos para gravar o que já foi baixado ao encerrar o processo
+    SYNC_DRAIN_TIMEOUT = float(os.getenv('SYNC_DRAIN_TIMEOUT', '30'))
+    # Um sync por vez de cada caixa entre processos: 'file' (flock em
+    # SYNC_LEASE_DIR, mesma máquina) ou 'firestore' (coleção leases, várias máquinas)
+    SYNC_LEASE = os.getenv('SYNC_LEASE', 'file')
+    SYNC_LEASE_DIR = os.getenv('SYNC_LEASE_DIR', 'data/leases')
+    # Prazo do lease do Firestore sem renovação (processo que morreu)
+    SYNC_LEASE_TTL = int(os.getenv('SYNC_LEASE_TTL', '120'))
+    
+    # Store de corpos grandes e anexos (comprimidos, endereçados por hash)
+    BODY_STORE_PATH = os.getenv('BODY_STORE_PATH', 'data/bodies')
+    # Corpos acima deste tamanho (bytes UTF-8) saem do documento do email
+    BODY_INLINE_MAX_BYTES = int(os.getenv('BODY_INLINE_MAX_BYTES', '16384'))
+    BODY_PREVIEW_CHARS = int(os.getenv('BODY_PREVIEW_CHARS', '200'))
+    BODY_STORE_COMPRESSION = int(os.getenv('BODY_STORE_COMPRESSION', '6'))
+    
+    # Extração MIME no sync (lida em fluxo, sem montar a mensagem em memória)
+    # Texto guardado por parte text/plain ou text/html
+    MIME_MAX_TEXT_BYTES = int(os.getenv('MIME_MAX_TEXT_BYTES', '1048576'))
+    # Anexos acima disso ficam só com os metadados (descartado: true)
+    MIME_MAX_ATTACHMENT_BYTES = int(os.getenv('MIME_MAX_ATTACHMENT_BYTES', '26214400'))
+    MIME_MAX_HEADER_BYTES = int(os.getenv('MIME_MAX_HEADER_BYTES', '65536'))
+    # Multiparts aninhados além disso são ignorados
+    MIME_MAX_DEPTH = int(os.getenv('MIME_MAX_DEPTH', '10'))
+    
+    # Índice de busca (SQLite FTS5) de assunto/corpo
+    SEARCH_INDEX_PATH = os.getenv('SEARCH_INDEX_PATH', 'data/search.db')
+    # Resultados (mais recentes) ranqueados por busca; limita o custo de termos comuns
+    SEARCH_RANK_WINDOW = int(os.getenv('SEARCH_RANK_WINDOW', '5000'))
+    
+    # Cópias de um mesmo email no sync (encaminhamentos, loops de CC, reenvios):
+    # 'flag' grava com `duplicado_de` (fora das estatísticas); 'merge' descarta
+    # a cópia e soma em `copias` do original, só com o mesmo remetente e os
+    # mesmos anexos (senão marca como 'flag'); 'off' desativa
+    DUPLICATE_POLICY = os.getenv('DUPLICATE_POLICY', 'flag')
+    DUPLICATE_INDEX_PATH = os.getenv('DUPLICATE_INDEX_PATH', 'data/duplicates.db')
+    DUPLICATE_WINDOW_DAYS = int(os.getenv('DUPLICATE_WINDOW_DAYS', '7'))
+    # Distância máxima de SimHash (até 7 toda cópia cai em alguma faixa LSH do índice)
+    DUPLICATE_MAX_DISTANCE = int(os.getenv('DUPLICATE_MAX_DISTANCE', '7'))
+    DUPLICATE_MIN_TOKENS = int(os.getenv('DUPLICATE_MIN_TOKENS', '20'))
+    
+    # Sugestão de estado/município (gazetteer) para emails sem classificação
+    LOCATION_SUGGESTIONS = os.getenv('LOCATION_SUGGESTIONS', 'True') == 'True'
+    
+    # Cache de remetentes (endereço -> funcionário) do FuncionarioService
+    FUNCIONARIO_CACHE_SIZE = int(os.getenv('FUNCIONARIO_CACHE_SIZE', '10000'))
+    FUNCIONARIO_CACHE_TTL = int(os.getenv('FUNCIONARIO_CACHE_TTL', '3600'))
     
     # CORS
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*')
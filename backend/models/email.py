@@ -1,7 +1,7 @@
 # models/email.py
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Iterable, List, Optional
 
 @dataclass
 class Email:
@@ -16,34 +16,83 @@ class Email:
     municipio: Optional[str] = None
     categoria: Optional[str] = None
     classificado: bool = False
+    message_id: Optional[str] = None  # Header Message-ID (chave de idempotência do sync)
+    corpo_ref: Optional[str] = None  # Corpo no BodyStore (corpo fica None no documento)
+    preview: Optional[str] = None  # Início do corpo para as listagens
+    anexos: List[dict] = None  # [{nome, tipo, tamanho, ref}] com o conteúdo no BodyStore
+    conteudo_hash: Optional[str] = None  # Hash exato de assunto + corpo normalizados
+    simhash: Optional[str] = None  # SimHash (64 bits, hex) para quase-duplicados
+    duplicado_de: Optional[str] = None  # ID do original quando marcado como cópia
+    copias: int = 0  # Cópias recebidas e mescladas neste email
+    estado_sugerido: Optional[str] = None  # Pré-classificação pelo gazetteer (pendentes)
+    municipio_sugerido: Optional[str] = None
+    confianca_sugestao: Optional[float] = None  # 0 a 1
+    versao: Optional[str] = None  # update_time do documento (lido); não é gravado
+    destinatarios: List[str] = None  # Todos os endereços do To (destinatario é o primeiro)
     
-    def to_dict(self):
-        """Converte para dict (Firestore/JSON)"""
-        return {
+    def __post_init__(self):
+        if self.anexos is None:
+            self.anexos = []
+        if self.destinatarios is None:
+            self.destinatarios = [self.destinatario] if self.destinatario else []
+    
+    def to_dict(self, fields: Optional[Iterable[str]] = None):
+        """Converte para dict (Firestore/JSON); `fields` limita as chaves (id sempre vai)"""
+        data = {
             'id': self.id,
             'remetente': self.remetente,
             'destinatario': self.destinatario,
+            'destinatarios': self.destinatarios,
             'assunto': self.assunto,
             'corpo': self.corpo,
             'data': self.data,
             'estado': self.estado,
             'municipio': self.municipio,
             'categoria': self.categoria,
-            'classificado': self.classificado
+            'classificado': self.classificado,
+            'message_id': self.message_id,
+            'corpo_ref': self.corpo_ref,
+            'preview': self.preview,
+            'anexos': self.anexos,
+            'conteudo_hash': self.conteudo_hash,
+            'simhash': self.simhash,
+            'duplicado_de': self.duplicado_de,
+            'copias': self.copias,
+            'estado_sugerido': self.estado_sugerido,
+            'municipio_sugerido': self.municipio_sugerido,
+            'confianca_sugestao': self.confianca_sugestao
         }
+        if fields is not None:
+            data = {key: value for key, value in data.items() if key == 'id' or key in fields}
+        # Só na resposta da API (precondição de PUT/DELETE), nunca no documento
+        if self.versao is not None:
+            data['versao'] = self.versao
+        return data
     
     @staticmethod
     def from_dict(data: dict):
-        """Cria Email a partir de dict"""
+        """Cria Email a partir de dict (campos fora de uma projeção ficam None)"""
         return Email(
             id=data.get('id'),
-            remetente=data['remetente'],
-            destinatario=data['destinatario'],
-            assunto=data['assunto'],
-            corpo=data['corpo'],
-            data=data['data'],
+            remetente=data.get('remetente'),
+            destinatario=data.get('destinatario'),
+            destinatarios=data.get('destinatarios'),
+            assunto=data.get('assunto'),
+            corpo=data.get('corpo'),
+            data=data.get('data'),
             estado=data.get('estado'),
             municipio=data.get('municipio'),
             categoria=data.get('categoria'),
-            classificado=data.get('classificado', False)
+            classificado=data.get('classificado', False),
+            message_id=data.get('message_id'),
+            corpo_ref=data.get('corpo_ref'),
+            preview=data.get('preview'),
+            anexos=data.get('anexos') or [],
+            conteudo_hash=data.get('conteudo_hash'),
+            simhash=data.get('simhash'),
+            duplicado_de=data.get('duplicado_de'),
+            copias=data.get('copias', 0),
+            estado_sugerido=data.get('estado_sugerido'),
+            municipio_sugerido=data.get('municipio_sugerido'),
+            confianca_sugestao=data.get('confianca_sugestao')
         )
\ No newline at end of file
@@ -1,27 +1,21 @@
 # models/funcionario.py
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Optional
 
 @dataclass
 class Funcionario:
-    """Model de Funcionário"""
+    """Model de Funcionário (os emails enviados são consultados pelo campo `remetente`)"""
     email: str
     nome: Optional[str] = None
     id: Optional[str] = None
-    emails_enviados: List[str] = None  # Lista de IDs de emails
     total_emails: int = 0
     ativo: bool = True
     
-    def __post_init__(self):
-        if self.emails_enviados is None:
-            self.emails_enviados = []
-    
     def to_dict(self):
         """Converte para dict (Firestore/JSON)"""
         return {
             'email': self.email,
             'nome': self.nome,
-            'emails_enviados': self.emails_enviados,
             'total_emails': self.total_emails,
             'ativo': self.ativo
         }
@@ -33,7 +27,6 @@ class Funcionario:
             id=data.get('id'),
             email=data['email'],
             nome=data.get('nome'),
-            emails_enviados=data.get('emails_enviados', []),
             total_emails=data.get('total_emails', 0),
             ativo=data.get('ativo', True)
-        )
\ No newline at end of file
+        )
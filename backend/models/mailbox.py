@@ -0,0 +1,54 @@
+# models/mailbox.py
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass
+class Mailbox:
+    """
+    Caixa IMAP sincronizada. A senha pode vir direto em `senha` (arquivo
+    local) ou, de preferência, pelo nome de uma variável de ambiente em
+    `senha_env` (obrigatório no Firestore, para não guardar segredos lá).
+    """
+    endereco: str
+    pasta: str = 'INBOX'
+    senha: Optional[str] = None
+    senha_env: Optional[str] = None
+    host: Optional[str] = None  # Padrão: EMAIL_IMAP_HOST
+    porta: Optional[int] = None  # Padrão: EMAIL_IMAP_PORT
+    ativo: bool = True
+
+    @property
+    def key(self) -> str:
+        """Identificador da caixa, igual a ImapService.mailbox (chave do checkpoint)"""
+        return f"{self.endereco}/{self.pasta}"
+
+    def password(self) -> Optional[str]:
+        """Senha da caixa, resolvendo `senha_env`"""
+        if self.senha_env:
+            return os.getenv(self.senha_env)
+        return self.senha
+
+    def to_dict(self):
+        """Converte para dict (Firestore/JSON), sem a senha"""
+        return {
+            'endereco': self.endereco,
+            'pasta': self.pasta,
+            'senha_env': self.senha_env,
+            'host': self.host,
+            'porta': self.porta,
+            'ativo': self.ativo
+        }
+
+    @staticmethod
+    def from_dict(data: dict):
+        """Cria Mailbox a partir de dict"""
+        return Mailbox(
+            endereco=data['endereco'],
+            pasta=data.get('pasta') or 'INBOX',
+            senha=data.get('senha'),
+            senha_env=data.get('senha_env'),
+            host=data.get('host'),
+            porta=int(data['porta']) if data.get('porta') else None,
+            ativo=data.get('ativo', True)
+        )
@@ -0,0 +1,26 @@
+# models/sync_checkpoint.py
+from dataclasses import dataclass
+
+@dataclass
+class SyncCheckpoint:
+    """Até onde uma caixa IMAP já foi sincronizada"""
+    mailbox: str
+    uidvalidity: int
+    last_uid: int = 0
+    
+    def to_dict(self):
+        """Converte para dict (Firestore/JSON)"""
+        return {
+            'mailbox': self.mailbox,
+            'uidvalidity': self.uidvalidity,
+            'last_uid': self.last_uid
+        }
+    
+    @staticmethod
+    def from_dict(data: dict):
+        """Cria SyncCheckpoint a partir de dict"""
+        return SyncCheckpoint(
+            mailbox=data['mailbox'],
+            uidvalidity=int(data['uidvalidity']),
+            last_uid=int(data.get('last_uid', 0))
+        )
@@ -1,28 +1,199 @@
 # repositories/email_repository.py
 from google.cloud import firestore
+from google.api_core import exceptions
+from google.protobuf import timestamp_pb2
 from models.email import Email
-from typing import List, Optional
+from config import Config
+from typing import Dict, Iterator, List, Optional, Tuple
 from services.firestore_client import get_firestore_client
+from utils.pagination import encode_cursor, decode_cursor
+from utils.email_stats import stats_delta, build_stats, merge_delta, stale_days, expired_days
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+import hashlib
+
+class DuplicateEmailError(ValueError):
+    """Email com o mesmo Message-ID já foi gravado"""
+
+class EmailNotFoundError(ValueError):
+    """Email não existe (ou foi excluído antes da escrita)"""
+
+class ConflictError(ValueError):
+    """Email alterado ou excluído por outra requisição desde a versão informada"""
+
+
+def _versao(update_time) -> str:
+    """Versão exposta na API: update_time do documento em RFC 3339 (nanossegundos)"""
+    return update_time.rfc3339()
+
+def _timestamp(versao: str) -> timestamp_pb2.Timestamp:
+    timestamp = timestamp_pb2.Timestamp()
+    try:
+        timestamp.FromJsonString(versao)
+    except (ValueError, TypeError):
+        raise ValueError(f"Versão inválida: {versao}")
+    return timestamp
 
 class EmailRepository:
     """Repositório para persistência de emails no Firestore"""
     
+    # Aggregation queries (count); desligado via FIRESTORE_AGGREGATION=False
+    # ou automaticamente, para o processo todo, na primeira falha
+    use_aggregation = Config.FIRESTORE_AGGREGATION
+    
+    # Emails por WriteBatch (limite do Firestore: 500 escritas, uma vai para as estatísticas)
+    BATCH_SIZE = 450
+    MAX_WRITES = 500
+    
+    # Campos que entram em stats_delta (projeção das leituras antes de escritas)
+    STATS_FIELDS = ['estado', 'destinatario', 'data', 'classificado', 'duplicado_de']
+    
     def __init__(self, db):
         self.db = db
         self.collection = self.db.collection('emails')
+        # Documento materializado com os contadores do dashboard
+        self.stats_ref = self.db.collection('stats').document('dashboard')
+        # Contador por destinatário (um documento por endereço)
+        self.destinatarios = self.db.collection('destinatarios')
     
     def create(self, email: Email) -> Email:
-        """Cria novo email"""
-        doc_ref = self.collection.document()
+        """
+        Cria novo email (e atualiza as estatísticas no mesmo batch).
+        Com Message-ID o ID do documento é derivado dele e a escrita usa
+        create(), então reenvios levantam DuplicateEmailError sem contar de novo.
+        """
+        if email.message_id:
+            doc_ref = self.collection.document(self.document_id_for(email.message_id))
+        else:
+            doc_ref = self.collection.document()
         email.id = doc_ref.id
         
         # Converte datetime para timestamp do Firestore
         email_dict = email.to_dict()
         email_dict['data'] = firestore.SERVER_TIMESTAMP
         
-        doc_ref.set(email_dict)
+        # O balde diário usa a hora atual, a mesma que o servidor vai gravar
+        delta = stats_delta(None, replace(email, data=datetime.now(timezone.utc)))
+        
+        batch = self.db.batch()
+        if email.message_id:
+            batch.create(doc_ref, email_dict)
+        else:
+            batch.set(doc_ref, email_dict)
+        self._increment_stats(batch, delta)
+        
+        try:
+            batch.commit()
+        except exceptions.AlreadyExists:
+            raise DuplicateEmailError(f"Email {email.message_id} já sincronizado")
         return email
     
+    def create_many(self, emails: List[Email]) -> Tuple[List[Email], List[Email]]:
+        """
+        Grava vários emails em WriteBatches de até BATCH_SIZE documentos.
+        Cada lote faz uma leitura (get_all) para descartar Message-IDs já
+        gravados e um commit com os emails e um único incremento agregado
+        das estatísticas. Retorna (criados, duplicados).
+        """
+        criados, duplicados = [], []
+        agora = datetime.now(timezone.utc)
+        
+        for inicio in range(0, len(emails), self.BATCH_SIZE):
+            lote = emails[inicio:inicio + self.BATCH_SIZE]
+            
+            refs = {}
+            for email in lote:
+                if email.message_id:
+                    doc_ref = self.collection.document(self.document_id_for(email.message_id))
+                else:
+                    doc_ref = self.collection.document()
+                # Mesmo Message-ID repetido dentro do lote
+                if doc_ref.id in refs:
+                    duplicados.append(email)
+                    continue
+                email.id = doc_ref.id
+                refs[doc_ref.id] = (doc_ref, email)
+            
+            # Uma leitura para todos os Message-IDs do lote
+            com_message_id = [ref for ref, email in refs.values() if email.message_id]
+            existentes = set()
+            if com_message_id:
+                existentes = {
+                    snapshot.id
+                    for snapshot in self.db.get_all(com_message_id, field_paths=['message_id'])
+                    if snapshot.exists
+                }
+            
+            batch = self.db.batch()
+            delta = {}
+            novos = []
+            for doc_id, (doc_ref, email) in refs.items():
+                if doc_id in existentes:
+                    duplicados.append(email)
+                    continue
+                
+                email_dict = email.to_dict()
+                email_dict['data'] = firestore.SERVER_TIMESTAMP
+                if email.message_id:
+                    batch.create(doc_ref, email_dict)
+                else:
+                    batch.set(doc_ref, email_dict)
+                
+                merge_delta(delta, stats_delta(None, replace(email, data=agora)))
+                novos.append(email)
+            
+            if not novos:
+                continue
+            
+            # Destinatários distintos que não cabem no batch vão num commit à parte
+            destinatarios = {}
+            if len(novos) + 1 + len(delta.get('destinatarios', {})) > self.MAX_WRITES:
+                destinatarios = delta.pop('destinatarios', {})
+            self._increment_stats(batch, delta)
+            try:
+                batch.commit()
+            except exceptions.AlreadyExists:
+                # Outro processo gravou algum desses emails entre a leitura e o commit:
+                # o batch inteiro foi rejeitado, então grava um a um
+                for email in novos:
+                    try:
+                        criados.append(self.create(email))
+                    except DuplicateEmailError:
+                        duplicados.append(email)
+                continue
+            
+            if destinatarios:
+                self._increment_destinatarios(destinatarios)
+            criados.extend(novos)
+        
+        return criados, duplicados
+    
+    def increment_copies(self, copias: Dict[str, int]):
+        """Soma cópias mescladas em `copias` dos emails originais (um WriteBatch)"""
+        ids = list(copias)
+        for inicio in range(0, len(ids), 500):
+            batch = self.db.batch()
+            for email_id in ids[inicio:inicio + 500]:
+                batch.update(self.collection.document(email_id), {'copias': firestore.Increment(copias[email_id])})
+            batch.commit()
+    
+    def update_fields_many(self, updates: Dict[str, dict]):
+        """
+        Grava campos fora das estatísticas (ex.: sugestões do gazetteer)
+        em vários emails, em WriteBatches de até BATCH_SIZE documentos
+        """
+        ids = list(updates)
+        for inicio in range(0, len(ids), self.BATCH_SIZE):
+            batch = self.db.batch()
+            for email_id in ids[inicio:inicio + self.BATCH_SIZE]:
+                batch.update(self.collection.document(email_id), updates[email_id])
+            batch.commit()
+    
+    @staticmethod
+    def document_id_for(message_id: str) -> str:
+        """ID determinístico do documento a partir do Message-ID"""
+        return hashlib.sha1(message_id.strip().encode('utf-8')).hexdigest()
+    
     def find_by_id(self, email_id: str) -> Optional[Email]:
         """Busca email por ID"""
         doc = self.collection.document(email_id).get()
@@ -32,7 +203,24 @@ class EmailRepository:
         
         data = doc.to_dict()
         data['id'] = doc.id
-        return Email.from_dict(data)
+        email = Email.from_dict(data)
+        email.versao = _versao(doc.update_time)
+        return email
+    
+    def find_by_ids(self, email_ids: List[str], fields: Optional[List[str]] = None) -> List[Email]:
+        """Busca vários emails em uma leitura (get_all), na ordem de `email_ids`; ausentes são omitidos"""
+        if not email_ids:
+            return []
+        
+        refs = [self.collection.document(email_id) for email_id in email_ids]
+        encontrados = {}
+        for doc in self.db.get_all(refs, field_paths=fields):
+            if doc.exists:
+                data = doc.to_dict()
+                data['id'] = doc.id
+                encontrados[doc.id] = Email.from_dict(data)
+        
+        return [encontrados[email_id] for email_id in email_ids if email_id in encontrados]
     
     def find_all(self) -> List[Email]:
         """Lista todos emails"""
@@ -58,28 +246,323 @@ class EmailRepository:
         
         return emails
     
-    def update(self, email: Email) -> Email:
-        """Atualiza email"""
-        self.collection.document(email.id).update(email.to_dict())
-        return email
+    def find_page(self, limit: int, cursor: Optional[str] = None, filters: Optional[dict] = None,
+                  fields: Optional[List[str]] = None, descending: bool = True) -> Tuple[List[Email], Optional[str]]:
+        """
+        Lista uma página de emails filtrados, mais recentes primeiro
+        (descending=False: mais antigos primeiro).
+        Com `fields`, o Firestore devolve só esses campos (select), então
+        o corpo não é lido quando fica de fora da projeção.
+        """
+        direction = firestore.Query.DESCENDING if descending else firestore.Query.ASCENDING
+        query = self._apply_filters(self.collection, filters)
+        if fields is not None:
+            # `data` é necessária para montar o cursor da próxima página
+            query = query.select(list(dict.fromkeys([*fields, 'data'])))
+        query = query.order_by('data', direction=direction)
+        return self._fetch_page(query, limit, cursor, direction)
     
-    def delete(self, email_id: str) -> bool:
-        """Deleta email"""
-        self.collection.document(email_id).delete()
-        return True
+    def iter_emails(self, filters: Optional[dict] = None, fields: Optional[List[str]] = None,
+                    page_size: int = 500, descending: bool = True) -> Iterator[Email]:
+        """
+        Percorre todos os emails filtrados página a página (cursor por data/id);
+        só uma página fica em memória por vez
+        """
+        cursor = None
+        while True:
+            emails, cursor = self.find_page(page_size, cursor, filters, fields, descending)
+            yield from emails
+            if not cursor:
+                return
     
-    def count_by_estado(self) -> dict:
-        """Conta emails por estado (para dashboard)"""
-        docs = self.collection.stream()
+    def find_pending_page(self, limit: int, cursor: Optional[str] = None, filters: Optional[dict] = None,
+                          fields: Optional[List[str]] = None) -> Tuple[List[Email], Optional[str]]:
+        """Lista uma página de emails pendentes, mais recentes primeiro"""
+        return self.find_page(limit, cursor, {**(filters or {}), 'classificado': False}, fields)
+    
+    def count(self, filters: Optional[dict] = None) -> int:
+        """
+        Conta emails que atendem os filtros.
+        Usa aggregation query (count) quando disponível; senão varre apenas
+        os nomes dos documentos (ex.: emulador local sem suporte a agregação).
+        """
+        query = self._apply_filters(self.collection, filters)
         
-        estados = {}
-        for doc in docs:
+        if self.use_aggregation:
+            try:
+                result = query.count(alias='total').get()
+                return int(result[0][0].value)
+            except (AttributeError, exceptions.Unimplemented, exceptions.InvalidArgument) as e:
+                print(f"⚠️ Aggregation query indisponível, usando varredura: {e}")
+                EmailRepository.use_aggregation = False
+        
+        return sum(1 for _ in query.select([]).stream())
+    
+    def count_recent(self, days: int = 7) -> int:
+        """Conta emails recebidos nos últimos `days` dias (janela móvel em UTC)"""
+        inicio = datetime.now(timezone.utc) - timedelta(days=days)
+        return self.count({'data_inicio': inicio})
+    
+    def _apply_filters(self, query, filters: Optional[dict]):
+        """
+        Traduz os filtros em where/range do Firestore.
+        Igualdades + ordenação por data usam os índices compostos
+        (campo, data) de firestore.indexes.json, combinados pelo Firestore
+        quando há mais de um filtro de igualdade.
+        """
+        if not filters:
+            return query
+        
+        for field in ('estado', 'municipio', 'categoria', 'remetente', 'classificado'):
+            if field in filters:
+                query = query.where(field, '==', filters[field])
+        
+        if 'data_inicio' in filters:
+            query = query.where('data', '>=', filters['data_inicio'])
+        
+        if 'data_fim' in filters:
+            query = query.where('data', '<', filters['data_fim'])
+        
+        return query
+    
+    def _fetch_page(self, query, limit: int, cursor: Optional[str],
+                    direction: str = firestore.Query.DESCENDING) -> Tuple[List[Email], Optional[str]]:
+        """
+        Executa a query paginada por (data, id do documento).
+        Busca limit + 1 documentos para saber se existe próxima página
+        sem precisar de outra leitura.
+        """
+        # Desempate por id garante ordem total mesmo com datas iguais
+        query = query.order_by('__name__', direction=direction)
+        
+        if cursor:
+            data, doc_id = decode_cursor(cursor)
+            query = query.start_after({'data': data, '__name__': doc_id})
+        
+        docs = list(query.limit(limit + 1).stream())
+        
+        emails = []
+        for doc in docs[:limit]:
             data = doc.to_dict()
-            estado = data.get('estado')
-            if estado:
-                estados[estado] = estados.get(estado, 0) + 1
+            data['id'] = doc.id
+            emails.append(Email.from_dict(data))
+        
+        next_cursor = None
+        if len(docs) > limit and emails:
+            ultimo = emails[-1]
+            next_cursor = encode_cursor(ultimo.data, ultimo.id)
+        
+        return emails, next_cursor
+    
+    def update_fields(self, email_id: str, campos: dict, versao: Optional[str] = None,
+                      tentativas: int = 3) -> str:
+        """
+        Atualiza só os `campos` informados (field mask), sem ler o email antes:
+        a existência vem da precondição da escrita (exists=True, ou
+        last_update_time quando `versao` é informada). Campos que entram nas
+        estatísticas exigem uma leitura projetada de STATS_FIELDS para o
+        delta, gravado no mesmo commit com precondição de last_update_time.
+        Retorna a nova versão. Levanta EmailNotFoundError ou ConflictError.
+        """
+        doc_ref = self.collection.document(email_id)
+        
+        if not set(campos) & set(self.STATS_FIELDS):
+            option = self.db.write_option(last_update_time=_timestamp(versao)) if versao else None
+            try:
+                resultado = doc_ref.update(campos, option=option)
+            except exceptions.NotFound:
+                raise EmailNotFoundError(f"Email {email_id} não encontrado")
+            except exceptions.FailedPrecondition:
+                raise ConflictError(f"Email {email_id} foi alterado ou excluído")
+            return _versao(resultado.update_time)
+        
+        def _escrever(batch, anterior, precondicao):
+            novo = replace(anterior, **{k: v for k, v in campos.items() if k in self.STATS_FIELDS})
+            batch.update(doc_ref, campos, option=precondicao)
+            self._increment_stats(batch, stats_delta(anterior, novo))
+        
+        return self._write_with_stats(doc_ref, versao, tentativas, _escrever)
+    
+    def delete(self, email_id: str, versao: Optional[str] = None, tentativas: int = 3):
+        """
+        Deleta email (e desconta das estatísticas no mesmo commit).
+        Levanta EmailNotFoundError ou ConflictError (ver update_fields).
+        """
+        doc_ref = self.collection.document(email_id)
+        
+        def _escrever(batch, anterior, precondicao):
+            batch.delete(doc_ref, option=precondicao)
+            self._increment_stats(batch, stats_delta(anterior, None))
+        
+        self._write_with_stats(doc_ref, versao, tentativas, _escrever)
+    
+    def _write_with_stats(self, doc_ref, versao: Optional[str], tentativas: int, escrever) -> str:
+        """
+        Lê STATS_FIELDS do email e grava, em um commit, o que `escrever(batch,
+        anterior, precondicao)` adicionar, com precondição de last_update_time.
+        Sem `versao`, uma alteração concorrente entre a leitura e o commit só
+        faz reler (até `tentativas`); com `versao`, é ConflictError.
+        """
+        for tentativa in range(tentativas):
+            snapshot = doc_ref.get(field_paths=self.STATS_FIELDS)
+            if not snapshot.exists:
+                raise EmailNotFoundError(f"Email {doc_ref.id} não encontrado")
+            
+            atual = snapshot.update_time.timestamp_pb()
+            if versao and _timestamp(versao) != atual:
+                raise ConflictError(f"Email {doc_ref.id} foi alterado desde a versão {versao}")
+            
+            anterior = Email.from_dict({**snapshot.to_dict(), 'id': snapshot.id})
+            batch = self.db.batch()
+            escrever(batch, anterior, self.db.write_option(last_update_time=atual))
+            try:
+                resultados = batch.commit()
+            except exceptions.FailedPrecondition:
+                if versao or tentativa == tentativas - 1:
+                    raise ConflictError(f"Email {doc_ref.id} foi alterado ou excluído durante a escrita")
+                print(f"🔄 Email {doc_ref.id} alterado durante a escrita, relendo")
+                continue
+            return _versao(resultados[0].update_time)
+    
+    def classify_many(self, classificacoes: Dict[str, dict], tentativas: int = 3) -> Dict[str, bool]:
+        """
+        Aplica {id: {estado, municipio, categoria}} marcando como classificado.
+        Por lote de até BATCH_SIZE emails: uma leitura projetada (get_all)
+        para calcular o delta das estatísticas e um commit com as
+        atualizações e um único incremento das estatísticas. Cada update
+        leva a precondição de last_update_time; se algum email mudou entre
+        a leitura e o commit, o lote inteiro é relido e reaplicado; esgotadas
+        as `tentativas`, levanta ConflictError. Lotes anteriores já ficam
+        gravados (não há rollback entre lotes). Retorna {id: encontrado}.
+        """
+        resultado = {}
+        ids = list(classificacoes)
+        
+        for inicio in range(0, len(ids), self.BATCH_SIZE):
+            lote = ids[inicio:inicio + self.BATCH_SIZE]
+            refs = [self.collection.document(email_id) for email_id in lote]
+            
+            for tentativa in range(tentativas):
+                batch = self.db.batch()
+                delta = {}
+                encontrados = set()
+                for snapshot in self.db.get_all(refs, field_paths=self.STATS_FIELDS):
+                    if not snapshot.exists:
+                        continue
+                    encontrados.add(snapshot.id)
+                    
+                    campos = {**classificacoes[snapshot.id], 'classificado': True}
+                    anterior = Email.from_dict({**snapshot.to_dict(), 'id': snapshot.id})
+                    merge_delta(delta, stats_delta(anterior, replace(anterior, **campos)))
+                    batch.update(
+                        snapshot.reference, campos,
+                        option=self.db.write_option(last_update_time=snapshot.update_time.timestamp_pb())
+                    )
+                
+                self._increment_stats(batch, delta)
+                try:
+                    if encontrados:
+                        batch.commit()
+                    break
+                except exceptions.FailedPrecondition:
+                    if tentativa == tentativas - 1:
+                        raise ConflictError(
+                            f"Emails alterados durante a classificação em lote; {len(resultado)} emails "
+                            f"de lotes anteriores já foram classificados"
+                        )
+                    print(f"🔄 Emails alterados durante a classificação em lote, relendo {len(lote)} emails")
+            
+            for email_id in lote:
+                resultado[email_id] = email_id in encontrados
+        
+        return resultado
+    
+    def count_by_estado(self) -> dict:
+        """Conta emails por estado (para dashboard), lido do documento de estatísticas"""
+        stats = self.get_stats() or {}
+        return {estado: n for estado, n in stats.get('emails_por_estado', {}).items() if n > 0}
+    
+    def get_stats(self) -> Optional[dict]:
+        """Lê o documento de estatísticas (None se ainda não foi construído)"""
+        snapshot = self.stats_ref.get()
+        return snapshot.to_dict() if snapshot.exists else None
+    
+    def rebuild_stats(self) -> dict:
+        """Recalcula as estatísticas varrendo a coleção inteira (corrige desvios)"""
+        # Sem order_by: inclui também documentos sem o campo `data`
+        stats = build_stats(
+            Email.from_dict({**doc.to_dict(), 'id': doc.id})
+            for doc in self.collection.stream()
+        )
+        destinatarios = stats.pop('destinatarios')
+        for key in stale_days(stats['emails_por_dia']):
+            del stats['emails_por_dia'][key]
+        
+        # Regrava os contadores por destinatário (remove os que não têm mais emails)
+        ids = {self._destinatario_id(dest): dest for dest in destinatarios}
+        escritas = [('delete', doc.reference, None) for doc in self.destinatarios.select([]).stream()
+                    if doc.id not in ids]
+        escritas += [('set', self.destinatarios.document(doc_id), {'destinatario': dest, 'total': destinatarios[dest]})
+                     for doc_id, dest in ids.items()]
+        for inicio in range(0, len(escritas), self.MAX_WRITES):
+            batch = self.db.batch()
+            for operacao, ref, data in escritas[inicio:inicio + self.MAX_WRITES]:
+                if operacao == 'delete':
+                    batch.delete(ref)
+                else:
+                    batch.set(ref, data)
+            batch.commit()
+        
+        self.stats_ref.set({**stats, 'atualizado_em': firestore.SERVER_TIMESTAMP})
+        return stats
+    
+    def get_top_destinatarios(self, limit: int = 3) -> List[Tuple[str, int]]:
+        """Destinatários com mais emails: [(endereço, total)]"""
+        docs = (self.destinatarios
+                .order_by('total', direction=firestore.Query.DESCENDING)
+                .limit(limit)
+                .stream())
+        return [(doc.get('destinatario'), doc.get('total')) for doc in docs]
+    
+    @staticmethod
+    def _destinatario_id(destinatario: str) -> str:
+        """ID do documento do destinatário (endereços podem ter '/')"""
+        return hashlib.sha1(destinatario.encode('utf-8')).hexdigest()
+    
+    def _increment_destinatarios(self, destinatarios: Dict[str, int], writer=None):
+        """Soma os contadores por destinatário no `writer` (ou em batches próprios)"""
+        itens = list(destinatarios.items())
+        for inicio in range(0, len(itens), self.MAX_WRITES):
+            batch = writer or self.db.batch()
+            for dest, n in itens[inicio:inicio + self.MAX_WRITES]:
+                batch.set(self.destinatarios.document(self._destinatario_id(dest)),
+                          {'destinatario': dest, 'total': firestore.Increment(n)}, merge=True)
+            if writer is None:
+                batch.commit()
+    
+    def _increment_stats(self, writer, delta: dict):
+        """Soma `delta` às estatísticas (e aos destinatários) usando o batch/transação `writer`"""
+        if not delta:
+            return
+        
+        increments = {}
+        for field, value in delta.items():
+            if field == 'destinatarios':
+                self._increment_destinatarios(value, writer)
+            elif isinstance(value, dict):
+                increments[field] = {key: firestore.Increment(n) for key, n in value.items()}
+            else:
+                increments[field] = firestore.Increment(value)
         
-        return estados
+        if 'emails_por_dia' in increments:
+            # Baldes diários antes da janela do dashboard: o delta não os toca
+            # (exclusão de email antigo) e a mesma escrita os apaga, sem leitura
+            dias = increments['emails_por_dia']
+            for key in stale_days(dias):
+                del dias[key]
+            dias.update({key: firestore.DELETE_FIELD for key in expired_days()})
+        if increments:
+            writer.set(self.stats_ref, increments, merge=True)
     
     # def ja_foi_processado(self, uid: str) -> bool:
     #     doc_ref = self.collection.document(uid)
@@ -1,18 +1,24 @@
 # repositories/funcionario_repository.py
 from google.cloud import firestore
 from models.funcionario import Funcionario
-from typing import List, Optional
+from typing import Dict, List, Optional
+import hashlib
 
 class FuncionarioRepository:
     """Repositório para persistência de funcionários"""
     
+    # Campos lidos nas listagens; documentos antigos ainda podem ter o
+    # array `emails_enviados`, que não deve trafegar
+    FIELDS = ['email', 'nome', 'total_emails', 'ativo']
+    
     def __init__(self, db: firestore.Client):
         self.db = db
         self.collection = db.collection('funcionarios')
     
     def find_by_email(self, email: str) -> Optional[Funcionario]:
-        """Busca funcionário pelo email"""
-        docs = self.collection.where('email', '==', email).limit(1).stream()
+        """Busca funcionário pelo email (normalizado, ou como gravado por versões antigas)"""
+        enderecos = list(dict.fromkeys([self.normalize_email(email), email.strip()]))
+        docs = self.collection.where('email', 'in', enderecos).select(self.FIELDS).limit(1).stream()
         
         for doc in docs:
             data = doc.to_dict()
@@ -21,9 +27,41 @@ class FuncionarioRepository:
         
         return None
     
+    @staticmethod
+    def normalize_email(email: str) -> str:
+        """Forma canônica do endereço (chave do cache e do ID do documento)"""
+        return email.strip().lower()
+    
+    @classmethod
+    def document_id_for(cls, email: str) -> str:
+        """ID determinístico do documento a partir do endereço normalizado"""
+        return hashlib.sha1(cls.normalize_email(email).encode('utf-8')).hexdigest()
+    
+    def upsert(self, email: str, nome: Optional[str] = None, ativo: bool = True) -> Funcionario:
+        """
+        Cria ou atualiza o funcionário no ID determinístico do endereço,
+        sem leitura. Não sobrescreve o nome com None, não zera o contador
+        e não reativa um funcionário desativado (`ativo` ausente vale True).
+        """
+        email = self.normalize_email(email)
+        doc_ref = self.collection.document(self.document_id_for(email))
+        
+        data = {
+            'email': email,
+            # Increment(0) cria o campo com 0 e não altera um valor existente
+            'total_emails': firestore.Increment(0)
+        }
+        if nome:
+            data['nome'] = nome
+        if not ativo:
+            data['ativo'] = False
+        doc_ref.set(data, merge=True)
+        
+        return Funcionario(id=doc_ref.id, email=email, nome=nome, ativo=ativo)
+    
     def create(self, funcionario: Funcionario) -> Funcionario:
         """Cria novo funcionário"""
-        doc_ref = self.collection.document()
+        doc_ref = self.collection.document(self.document_id_for(funcionario.email))
         funcionario.id = doc_ref.id
         doc_ref.set(funcionario.to_dict())
         return funcionario
@@ -33,9 +71,24 @@ class FuncionarioRepository:
         self.collection.document(funcionario.id).update(funcionario.to_dict())
         return funcionario
     
+    def update_nome(self, funcionario_id: str, nome: str):
+        """Atualiza apenas o nome (sem tocar nos contadores)"""
+        self.collection.document(funcionario_id).update({'nome': nome})
+    
+    def find_by_id(self, funcionario_id: str) -> Optional[Funcionario]:
+        """Busca funcionário por ID"""
+        doc = self.collection.document(funcionario_id).get(field_paths=self.FIELDS)
+        
+        if not doc.exists:
+            return None
+        
+        data = doc.to_dict()
+        data['id'] = doc.id
+        return Funcionario.from_dict(data)
+    
     def find_all(self) -> List[Funcionario]:
         """Lista todos funcionários"""
-        docs = self.collection.stream()
+        docs = self.collection.select(self.FIELDS).stream()
         
         funcionarios = []
         for doc in docs:
@@ -47,7 +100,13 @@ class FuncionarioRepository:
     
     def get_top_senders(self, limit: int = 3) -> List[Funcionario]:
         """Retorna top N funcionários que mais enviam emails"""
-        docs = self.collection.order_by('total_emails', direction=firestore.Query.DESCENDING).limit(limit).stream()
+        docs = (
+            self.collection
+            .select(self.FIELDS)
+            .order_by('total_emails', direction=firestore.Query.DESCENDING)
+            .limit(limit)
+            .stream()
+        )
         
         funcionarios = []
         for doc in docs:
@@ -57,11 +116,75 @@ class FuncionarioRepository:
         
         return funcionarios
     
-    def increment_email_count(self, funcionario_id: str, email_id: str):
-        """Incrementa contador de emails e adiciona ID do email"""
-        doc_ref = self.collection.document(funcionario_id)
+    def increment_email_count(self, funcionario_id: str):
+        """Incrementa contador de emails"""
+        self.collection.document(funcionario_id).update({
+            'total_emails': firestore.Increment(1)
+        })
+    
+    def increment_email_counts(self, emails_por_funcionario: Dict[str, int]):
+        """Incrementa contadores de vários funcionários em um único WriteBatch"""
+        ids = list(emails_por_funcionario)
+        
+        # Limite do Firestore: 500 escritas por batch
+        for inicio in range(0, len(ids), 500):
+            batch = self.db.batch()
+            for funcionario_id in ids[inicio:inicio + 500]:
+                batch.update(self.collection.document(funcionario_id), {
+                    'total_emails': firestore.Increment(emails_por_funcionario[funcionario_id])
+                })
+            batch.commit()
+    
+    def migrate_document_ids(self) -> int:
+        """
+        Move funcionários com ID automático (versões antigas) para o ID
+        determinístico do endereço, somando contadores quando o mesmo
+        endereço aparece em mais de um documento. Retorna quantos foram movidos.
+        """
+        movidos = 0
+        for funcionario in self.find_all():
+            destino_id = self.document_id_for(funcionario.email)
+            if funcionario.id == destino_id:
+                continue
+            
+            data = {
+                'email': self.normalize_email(funcionario.email),
+                'ativo': funcionario.ativo,
+                'total_emails': firestore.Increment(funcionario.total_emails or 0),
+            }
+            if funcionario.nome:
+                data['nome'] = funcionario.nome
+            
+            batch = self.db.batch()
+            batch.set(self.collection.document(destino_id), data, merge=True)
+            batch.delete(self.collection.document(funcionario.id))
+            batch.commit()
+            movidos += 1
+        
+        return movidos
+    
+    def drop_emails_enviados(self) -> int:
+        """
+        Remove o array legado `emails_enviados` dos documentos (a relação
+        email -> funcionário agora é o campo `remetente` dos emails).
+        Retorna quantos documentos foram alterados.
+        """
+        alterados = 0
+        batch = self.db.batch()
+        pendentes = 0
+        
+        # Só os nomes dos documentos: o array pode ser grande
+        for doc in self.collection.select([]).stream():
+            batch.update(doc.reference, {'emails_enviados': firestore.DELETE_FIELD})
+            pendentes += 1
+            if pendentes == 500:
+                batch.commit()
+                alterados += pendentes
+                batch = self.db.batch()
+                pendentes = 0
+        
+        if pendentes:
+            batch.commit()
+            alterados += pendentes
         
-        doc_ref.update({
-            'total_emails': firestore.Increment(1),
-            'emails_enviados': firestore.ArrayUnion([email_id])
-        })
\ No newline at end of file
+        return alterados
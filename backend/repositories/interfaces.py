@@ -0,0 +1,103 @@
+# repositories/interfaces.py
+from typing import Dict, Iterator, List, Optional, Protocol, Tuple
+from models.email import Email
+from models.funcionario import Funcionario
+from models.sync_checkpoint import SyncCheckpoint
+
+# Interfaces dos repositórios usadas pelos services. Implementações:
+# Firestore (EmailRepository, ...) e SQLite/memória (SqliteEmailRepository, ...),
+# escolhidas por STORAGE_BACKEND em services/storage.py
+
+
+class EmailStore(Protocol):
+    """Emails, estatísticas do dashboard e versão para precondição de escrita"""
+
+    BATCH_SIZE: int
+
+    @staticmethod
+    def document_id_for(message_id: str) -> str: ...
+
+    def create(self, email: Email) -> Email: ...
+
+    def create_many(self, emails: List[Email]) -> Tuple[List[Email], List[Email]]: ...
+
+    def increment_copies(self, copias: Dict[str, int]): ...
+
+    def update_fields_many(self, updates: Dict[str, dict]): ...
+
+    def find_by_id(self, email_id: str) -> Optional[Email]: ...
+
+    def find_by_ids(self, email_ids: List[str], fields: Optional[List[str]] = None) -> List[Email]: ...
+
+    def find_all(self) -> List[Email]: ...
+
+    def find_pending(self) -> List[Email]: ...
+
+    def find_page(self, limit: int, cursor: Optional[str] = None, filters: Optional[dict] = None,
+                  fields: Optional[List[str]] = None, descending: bool = True) -> Tuple[List[Email], Optional[str]]: ...
+
+    def iter_emails(self, filters: Optional[dict] = None, fields: Optional[List[str]] = None,
+                    page_size: int = 500, descending: bool = True) -> Iterator[Email]: ...
+
+    def find_pending_page(self, limit: int, cursor: Optional[str] = None, filters: Optional[dict] = None,
+                          fields: Optional[List[str]] = None) -> Tuple[List[Email], Optional[str]]: ...
+
+    def count(self, filters: Optional[dict] = None) -> int: ...
+
+    def count_recent(self, days: int = 7) -> int: ...
+
+    def update_fields(self, email_id: str, campos: dict, versao: Optional[str] = None,
+                      tentativas: int = 3) -> str: ...
+
+    def delete(self, email_id: str, versao: Optional[str] = None, tentativas: int = 3): ...
+
+    def classify_many(self, classificacoes: Dict[str, dict], tentativas: int = 3) -> Dict[str, bool]: ...
+
+    def count_by_estado(self) -> dict: ...
+
+    def get_stats(self) -> Optional[dict]: ...
+
+    def get_top_destinatarios(self, limit: int = 3) -> List[Tuple[str, int]]: ...
+
+    def rebuild_stats(self) -> dict: ...
+
+
+class FuncionarioStore(Protocol):
+    """Funcionários (remetentes) com ID determinístico pelo endereço"""
+
+    @staticmethod
+    def normalize_email(email: str) -> str: ...
+
+    def document_id_for(self, email: str) -> str: ...
+
+    def find_by_email(self, email: str) -> Optional[Funcionario]: ...
+
+    def upsert(self, email: str, nome: Optional[str] = None, ativo: bool = True) -> Funcionario: ...
+
+    def create(self, funcionario: Funcionario) -> Funcionario: ...
+
+    def update(self, funcionario: Funcionario) -> Funcionario: ...
+
+    def update_nome(self, funcionario_id: str, nome: str): ...
+
+    def find_by_id(self, funcionario_id: str) -> Optional[Funcionario]: ...
+
+    def find_all(self) -> List[Funcionario]: ...
+
+    def get_top_senders(self, limit: int = 3) -> List[Funcionario]: ...
+
+    def increment_email_count(self, funcionario_id: str): ...
+
+    def increment_email_counts(self, emails_por_funcionario: Dict[str, int]): ...
+
+    def migrate_document_ids(self) -> int: ...
+
+    def drop_emails_enviados(self) -> int: ...
+
+
+class SyncStateStore(Protocol):
+    """Checkpoints do sync IMAP, um por caixa"""
+
+    def get(self, mailbox: str) -> Optional[SyncCheckpoint]: ...
+
+    def save(self, checkpoint: SyncCheckpoint) -> SyncCheckpoint: ...
@@ -0,0 +1,21 @@
+# repositories/mailbox_repository.py
+from google.cloud import firestore
+from models.mailbox import Mailbox
+from typing import List
+
+class MailboxRepository:
+    """Registro das caixas IMAP sincronizadas (coleção `mailboxes`)"""
+
+    def __init__(self, db: firestore.Client):
+        self.db = db
+        self.collection = db.collection('mailboxes')
+
+    def find_active(self) -> List[Mailbox]:
+        """Caixas com ativo=true"""
+        caixas = []
+        for doc in self.collection.where('ativo', '==', True).stream():
+            data = doc.to_dict()
+            # Senha em texto no Firestore é ignorada: só senha_env
+            data.pop('senha', None)
+            caixas.append(Mailbox.from_dict(data))
+        return caixas
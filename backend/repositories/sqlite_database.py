@@ -0,0 +1,143 @@
+# repositories/sqlite_database.py
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional
+
+# Tabelas dos repositórios SQLite. Cada documento fica inteiro em `doc`
+# (JSON); os campos filtrados/ordenados são copiados em colunas próprias,
+# com índices compostos (campo, data) como os de firestore.indexes.json
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS emails (
+    id TEXT PRIMARY KEY,
+    data TEXT,
+    classificado INTEGER NOT NULL DEFAULT 0,
+    estado TEXT,
+    municipio TEXT,
+    categoria TEXT,
+    remetente TEXT,
+    versao INTEGER NOT NULL DEFAULT 1,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS emails_data ON emails (data, id);
+CREATE INDEX IF NOT EXISTS emails_classificado_data ON emails (classificado, data, id);
+CREATE INDEX IF NOT EXISTS emails_estado_data ON emails (estado, data, id);
+CREATE INDEX IF NOT EXISTS emails_municipio_data ON emails (municipio, data, id);
+CREATE INDEX IF NOT EXISTS emails_categoria_data ON emails (categoria, data, id);
+CREATE INDEX IF NOT EXISTS emails_remetente_data ON emails (remetente, data, id);
+
+CREATE TABLE IF NOT EXISTS stats (
+    id TEXT PRIMARY KEY,
+    doc TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS destinatarios (
+    destinatario TEXT PRIMARY KEY,
+    total INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS destinatarios_total ON destinatarios (total);
+
+CREATE TABLE IF NOT EXISTS funcionarios (
+    id TEXT PRIMARY KEY,
+    email TEXT NOT NULL,
+    nome TEXT,
+    total_emails INTEGER NOT NULL DEFAULT 0,
+    ativo INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS funcionarios_email ON funcionarios (email);
+CREATE INDEX IF NOT EXISTS funcionarios_total_emails ON funcionarios (total_emails);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    id TEXT PRIMARY KEY,
+    doc TEXT NOT NULL,
+    atualizado_em TEXT
+);
+'''
+
+
+def encode_datetime(value: Optional[datetime]) -> Optional[str]:
+    """
+    Datetime em texto UTC de largura fixa: a ordem do texto é a ordem
+    cronológica (ORDER BY/comparações na coluna). Sem fuso vale UTC.
+    """
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f+00:00')
+
+
+def decode_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return encode_datetime(value)
+    raise TypeError(f"Tipo não serializável no documento: {type(value).__name__}")
+
+
+def encode_doc(data: dict) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=_json_default)
+
+
+class SqliteDatabase:
+    """
+    Banco dos repositórios SQLite (STORAGE_BACKEND=sqlite ou memory).
+    Uma conexão compartilhada pelas threads, serializada pelo lock; com
+    arquivo, vários processos usam o mesmo banco (WAL) e as escritas
+    abrem a transação com BEGIN IMMEDIATE, então a leitura antes da
+    escrita (estatísticas, versão) não é intercalada por outro processo.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        # Reentrante: repositórios fazem leituras dentro de transaction()
+        self._lock = threading.RLock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # isolation_level=None: as transações são abertas por transaction()
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Transação de escrita (commit ao fim do bloco, rollback em exceção)"""
+        with self._lock:
+            conn = self.conn
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """A conexão, com o lock, para várias leituras seguidas"""
+        with self._lock:
+            yield self.conn
+
+    def query(self, sql: str, params=()) -> List[sqlite3.Row]:
+        """Executa uma leitura e devolve todas as linhas"""
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,382 @@
+# repositories/sqlite_email_repository.py
+import json
+import sqlite3
+import uuid
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+from models.email import Email
+from repositories.email_repository import ConflictError, DuplicateEmailError, EmailNotFoundError, EmailRepository
+from repositories.sqlite_database import SqliteDatabase, decode_datetime, encode_datetime, encode_doc
+from utils.pagination import encode_cursor, decode_cursor
+from utils.email_stats import stats_delta, build_stats, merge_delta, stale_days
+
+# Campos de igualdade com coluna (e índice) próprios
+FILTER_FIELDS = ('estado', 'municipio', 'categoria', 'remetente', 'classificado')
+
+
+def _numero_versao(versao: str) -> int:
+    """Versão exposta na API: contador de escritas do email"""
+    try:
+        return int(versao)
+    except (TypeError, ValueError):
+        raise ValueError(f"Versão inválida: {versao}")
+
+
+def _doc(email: Email) -> dict:
+    """Documento do email sem as chaves que ficam em colunas (id, data) ou não são gravadas (versao)"""
+    data = email.to_dict()
+    for key in ('id', 'data', 'versao'):
+        data.pop(key, None)
+    return data
+
+
+def _email(row: sqlite3.Row, fields: Optional[List[str]] = None) -> Email:
+    data = json.loads(row['doc'])
+    if fields is not None:
+        data = {key: value for key, value in data.items() if key in fields}
+    if fields is None or 'data' in fields:
+        data['data'] = decode_datetime(row['data'])
+    data['id'] = row['id']
+    return Email.from_dict(data)
+
+
+class SqliteEmailRepository:
+    """
+    Repositório de emails em SQLite (STORAGE_BACKEND=sqlite|memory), com a
+    mesma interface e semântica do EmailRepository: Message-ID como chave
+    de idempotência, estatísticas atualizadas na mesma transação, versão
+    para precondição de PUT/DELETE e paginação por cursor (data, id).
+    """
+
+    BATCH_SIZE = EmailRepository.BATCH_SIZE
+    STATS_FIELDS = EmailRepository.STATS_FIELDS
+
+    document_id_for = staticmethod(EmailRepository.document_id_for)
+
+    def __init__(self, db: SqliteDatabase):
+        self.db = db
+
+    def create(self, email: Email) -> Email:
+        """Cria novo email; Message-ID repetido levanta DuplicateEmailError"""
+        email.id = self.document_id_for(email.message_id) if email.message_id else uuid.uuid4().hex
+        # Como o SERVER_TIMESTAMP do Firestore: `data` é a hora da gravação
+        agora = datetime.now(timezone.utc)
+
+        with self.db.transaction() as conn:
+            if not self._insert(conn, email, agora):
+                raise DuplicateEmailError(f"Email {email.message_id} já sincronizado")
+            self._increment_stats(conn, stats_delta(None, replace(email, data=agora)))
+        return email
+
+    def create_many(self, emails: List[Email]) -> Tuple[List[Email], List[Email]]:
+        """Grava vários emails, uma transação por lote de BATCH_SIZE. Retorna (criados, duplicados)"""
+        criados, duplicados = [], []
+        agora = datetime.now(timezone.utc)
+
+        for inicio in range(0, len(emails), self.BATCH_SIZE):
+            with self.db.transaction() as conn:
+                delta = {}
+                for email in emails[inicio:inicio + self.BATCH_SIZE]:
+                    email.id = self.document_id_for(email.message_id) if email.message_id else uuid.uuid4().hex
+                    if not self._insert(conn, email, agora):
+                        duplicados.append(email)
+                        continue
+                    merge_delta(delta, stats_delta(None, replace(email, data=agora)))
+                    criados.append(email)
+                self._increment_stats(conn, delta)
+
+        return criados, duplicados
+
+    def _insert(self, conn: sqlite3.Connection, email: Email, data: datetime) -> bool:
+        """Insere o email; False se o ID já existe"""
+        doc = _doc(email)
+        cursor = conn.execute(
+            'INSERT INTO emails (id, data, estado, municipio, categoria, remetente, classificado, doc) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (id) DO NOTHING',
+            (email.id, encode_datetime(data), *self._columns(doc), encode_doc(doc))
+        )
+        return cursor.rowcount == 1
+
+    @staticmethod
+    def _columns(doc: dict) -> tuple:
+        """Valores das colunas de filtro (ordem de FILTER_FIELDS)"""
+        return (doc.get('estado'), doc.get('municipio'), doc.get('categoria'), doc.get('remetente'),
+                1 if doc.get('classificado') else 0)
+
+    def _update(self, conn: sqlite3.Connection, row: sqlite3.Row, campos: dict) -> int:
+        """Grava `campos` sobre o email da linha `row`; retorna a nova versão"""
+        doc = json.loads(row['doc'])
+        data = row['data']
+        for key, value in campos.items():
+            if key == 'data':
+                data = encode_datetime(value)
+            elif key not in ('id', 'versao'):
+                doc[key] = value
+
+        conn.execute(
+            'UPDATE emails SET data = ?, estado = ?, municipio = ?, categoria = ?, remetente = ?, '
+            'classificado = ?, doc = ?, versao = versao + 1 WHERE id = ?',
+            (data, *self._columns(doc), encode_doc(doc), row['id'])
+        )
+        return row['versao'] + 1
+
+    def increment_copies(self, copias: Dict[str, int]):
+        """Soma cópias mescladas em `copias` dos emails originais (uma transação)"""
+        with self.db.transaction() as conn:
+            for row in self._rows(conn, list(copias)):
+                atual = json.loads(row['doc']).get('copias') or 0
+                self._update(conn, row, {'copias': atual + copias[row['id']]})
+
+    def update_fields_many(self, updates: Dict[str, dict]):
+        """Grava campos fora das estatísticas em vários emails (uma transação)"""
+        with self.db.transaction() as conn:
+            for row in self._rows(conn, list(updates)):
+                self._update(conn, row, updates[row['id']])
+
+    def _rows(self, conn: sqlite3.Connection, email_ids: List[str]) -> List[sqlite3.Row]:
+        """Linhas dos emails existentes entre `email_ids` (IN em blocos de 500)"""
+        rows = []
+        for inicio in range(0, len(email_ids), 500):
+            bloco = email_ids[inicio:inicio + 500]
+            rows.extend(conn.execute(
+                f'SELECT * FROM emails WHERE id IN ({", ".join("?" * len(bloco))})', bloco
+            ).fetchall())
+        return rows
+
+    def find_by_id(self, email_id: str) -> Optional[Email]:
+        """Busca email por ID (com a versão)"""
+        rows = self.db.query('SELECT * FROM emails WHERE id = ?', (email_id,))
+        if not rows:
+            return None
+
+        email = _email(rows[0])
+        email.versao = str(rows[0]['versao'])
+        return email
+
+    def find_by_ids(self, email_ids: List[str], fields: Optional[List[str]] = None) -> List[Email]:
+        """Busca vários emails, na ordem de `email_ids`; ausentes são omitidos"""
+        if not email_ids:
+            return []
+
+        with self.db.connection() as conn:
+            rows = self._rows(conn, list(email_ids))
+        encontrados = {row['id']: _email(row, fields) for row in rows}
+        return [encontrados[email_id] for email_id in email_ids if email_id in encontrados]
+
+    def find_all(self) -> List[Email]:
+        """Lista todos emails, mais recentes primeiro"""
+        rows = self.db.query('SELECT * FROM emails WHERE data IS NOT NULL ORDER BY data DESC, id DESC')
+        return [_email(row) for row in rows]
+
+    def find_pending(self) -> List[Email]:
+        """Lista emails pendentes (não classificados)"""
+        return [_email(row) for row in self.db.query('SELECT * FROM emails WHERE classificado = 0')]
+
+    def find_page(self, limit: int, cursor: Optional[str] = None, filters: Optional[dict] = None,
+                  fields: Optional[List[str]] = None, descending: bool = True) -> Tuple[List[Email], Optional[str]]:
+        """
+        Lista uma página de emails filtrados, mais recentes primeiro
+        (descending=False: mais antigos primeiro), paginada por (data, id)
+        """
+        where, params = self._where(filters)
+        # Como o order_by do Firestore: emails sem `data` ficam de fora
+        where.append('data IS NOT NULL')
+        if cursor:
+            data, doc_id = decode_cursor(cursor)
+            where.append('(data, id) < (?, ?)' if descending else '(data, id) > (?, ?)')
+            params += [encode_datetime(data), doc_id]
+
+        ordem = 'DESC' if descending else 'ASC'
+        rows = self.db.query(
+            f'SELECT * FROM emails WHERE {" AND ".join(where)} ORDER BY data {ordem}, id {ordem} LIMIT ?',
+            (*params, limit + 1)
+        )
+
+        if fields is not None:
+            # `data` é necessária para montar o cursor da próxima página
+            fields = [*fields, 'data']
+        emails = [_email(row, fields) for row in rows[:limit]]
+
+        next_cursor = None
+        if len(rows) > limit and emails:
+            ultimo = emails[-1]
+            next_cursor = encode_cursor(ultimo.data, ultimo.id)
+
+        return emails, next_cursor
+
+    def iter_emails(self, filters: Optional[dict] = None, fields: Optional[List[str]] = None,
+                    page_size: int = 500, descending: bool = True) -> Iterator[Email]:
+        """Percorre todos os emails filtrados página a página"""
+        cursor = None
+        while True:
+            emails, cursor = self.find_page(page_size, cursor, filters, fields, descending)
+            yield from emails
+            if not cursor:
+                return
+
+    def find_pending_page(self, limit: int, cursor: Optional[str] = None, filters: Optional[dict] = None,
+                          fields: Optional[List[str]] = None) -> Tuple[List[Email], Optional[str]]:
+        """Lista uma página de emails pendentes, mais recentes primeiro"""
+        return self.find_page(limit, cursor, {**(filters or {}), 'classificado': False}, fields)
+
+    def count(self, filters: Optional[dict] = None) -> int:
+        """Conta emails que atendem os filtros"""
+        where, params = self._where(filters)
+        sql = 'SELECT COUNT(*) FROM emails'
+        if where:
+            sql += f' WHERE {" AND ".join(where)}'
+        return self.db.query(sql, params)[0][0]
+
+    def count_recent(self, days: int = 7) -> int:
+        """Conta emails recebidos nos últimos `days` dias (janela móvel em UTC)"""
+        inicio = datetime.now(timezone.utc) - timedelta(days=days)
+        return self.count({'data_inicio': inicio})
+
+    @staticmethod
+    def _where(filters: Optional[dict]) -> Tuple[List[str], list]:
+        """Traduz os filtros em condições SQL sobre as colunas indexadas"""
+        where, params = [], []
+        if not filters:
+            return where, params
+
+        for field in FILTER_FIELDS:
+            if field in filters:
+                where.append(f'{field} = ?')
+                value = filters[field]
+                params.append((1 if value else 0) if field == 'classificado' else value)
+
+        if 'data_inicio' in filters:
+            where.append('data >= ?')
+            params.append(encode_datetime(filters['data_inicio']))
+
+        if 'data_fim' in filters:
+            where.append('data < ?')
+            params.append(encode_datetime(filters['data_fim']))
+
+        return where, params
+
+    def update_fields(self, email_id: str, campos: dict, versao: Optional[str] = None,
+                      tentativas: int = 3) -> str:
+        """
+        Atualiza só os `campos` informados (e as estatísticas, na mesma
+        transação). Com `versao`, o email precisa estar nela.
+        Retorna a nova versão. Levanta EmailNotFoundError ou ConflictError.
+        """
+        esperada = _numero_versao(versao) if versao else None
+
+        with self.db.transaction() as conn:
+            row = self._current(conn, email_id, esperada)
+            nova = self._update(conn, row, campos)
+
+            if set(campos) & set(self.STATS_FIELDS):
+                anterior = _email(row)
+                novo = replace(anterior, **{k: v for k, v in campos.items() if k in self.STATS_FIELDS})
+                self._increment_stats(conn, stats_delta(anterior, novo))
+
+        return str(nova)
+
+    def delete(self, email_id: str, versao: Optional[str] = None, tentativas: int = 3):
+        """Deleta email (e desconta das estatísticas). Levanta EmailNotFoundError ou ConflictError"""
+        esperada = _numero_versao(versao) if versao else None
+
+        with self.db.transaction() as conn:
+            row = self._current(conn, email_id, esperada)
+            conn.execute('DELETE FROM emails WHERE id = ?', (email_id,))
+            self._increment_stats(conn, stats_delta(_email(row), None))
+
+    def _current(self, conn: sqlite3.Connection, email_id: str, versao: Optional[int]) -> sqlite3.Row:
+        """Linha do email (dentro da transação), conferindo a versão esperada"""
+        row = conn.execute('SELECT * FROM emails WHERE id = ?', (email_id,)).fetchone()
+        if row is None:
+            raise EmailNotFoundError(f"Email {email_id} não encontrado")
+        if versao is not None and row['versao'] != versao:
+            raise ConflictError(f"Email {email_id} foi alterado desde a versão {versao}")
+        return row
+
+    def classify_many(self, classificacoes: Dict[str, dict], tentativas: int = 3) -> Dict[str, bool]:
+        """
+        Aplica {id: {estado, municipio, categoria}} marcando como classificado,
+        uma transação por lote de BATCH_SIZE (lotes anteriores a uma falha
+        ficam gravados). Retorna {id: encontrado}.
+        """
+        resultado = {}
+        ids = list(classificacoes)
+
+        for inicio in range(0, len(ids), self.BATCH_SIZE):
+            lote = ids[inicio:inicio + self.BATCH_SIZE]
+            with self.db.transaction() as conn:
+                delta = {}
+                encontrados = set()
+                for row in self._rows(conn, lote):
+                    encontrados.add(row['id'])
+                    campos = {**classificacoes[row['id']], 'classificado': True}
+                    anterior = _email(row)
+                    merge_delta(delta, stats_delta(anterior, replace(anterior, **campos)))
+                    self._update(conn, row, campos)
+                self._increment_stats(conn, delta)
+
+            for email_id in lote:
+                resultado[email_id] = email_id in encontrados
+
+        return resultado
+
+    def count_by_estado(self) -> dict:
+        """Conta emails por estado (para dashboard), lido das estatísticas"""
+        stats = self.get_stats() or {}
+        return {estado: n for estado, n in stats.get('emails_por_estado', {}).items() if n > 0}
+
+    def get_stats(self) -> Optional[dict]:
+        """Lê as estatísticas (None se ainda não foram construídas)"""
+        rows = self.db.query("SELECT doc FROM stats WHERE id = 'dashboard'")
+        return json.loads(rows[0]['doc']) if rows else None
+
+    def rebuild_stats(self) -> dict:
+        """Recalcula as estatísticas varrendo a tabela inteira (em blocos, por id)"""
+        def emails() -> Iterator[Email]:
+            ultimo = ''
+            while True:
+                rows = self.db.query('SELECT * FROM emails WHERE id > ? ORDER BY id LIMIT 500', (ultimo,))
+                if not rows:
+                    return
+                for row in rows:
+                    yield _email(row, self.STATS_FIELDS)
+                ultimo = rows[-1]['id']
+
+        stats = build_stats(emails())
+        destinatarios = stats.pop('destinatarios')
+        with self.db.transaction() as conn:
+            conn.execute('DELETE FROM destinatarios')
+            conn.executemany('INSERT INTO destinatarios (destinatario, total) VALUES (?, ?)',
+                             destinatarios.items())
+            self._save_stats(conn, {**stats, 'atualizado_em': encode_datetime(datetime.now(timezone.utc))})
+        return stats
+
+    def get_top_destinatarios(self, limit: int = 3) -> List[Tuple[str, int]]:
+        """Destinatários com mais emails: [(endereço, total)]"""
+        rows = self.db.query('SELECT destinatario, total FROM destinatarios ORDER BY total DESC LIMIT ?', (limit,))
+        return [(row['destinatario'], row['total']) for row in rows]
+
+    def _increment_stats(self, conn: sqlite3.Connection, delta: dict):
+        """Soma `delta` às estatísticas (dentro da transação `conn`)"""
+        if not delta:
+            return
+
+        delta = dict(delta)
+        conn.executemany(
+            'INSERT INTO destinatarios (destinatario, total) VALUES (?, ?) '
+            'ON CONFLICT (destinatario) DO UPDATE SET total = total + excluded.total',
+            delta.pop('destinatarios', {}).items()
+        )
+        row = conn.execute("SELECT doc FROM stats WHERE id = 'dashboard'").fetchone()
+        self._save_stats(conn, merge_delta(json.loads(row['doc']) if row else {}, delta))
+
+    @staticmethod
+    def _save_stats(conn: sqlite3.Connection, stats: dict):
+        # Baldes diários fora da janela do dashboard não são mais lidos
+        for key in stale_days(stats.get('emails_por_dia', {})):
+            del stats['emails_por_dia'][key]
+        conn.execute(
+            "INSERT INTO stats (id, doc) VALUES ('dashboard', ?) ON CONFLICT (id) DO UPDATE SET doc = excluded.doc",
+            (encode_doc(stats),)
+        )
@@ -0,0 +1,105 @@
+# repositories/sqlite_funcionario_repository.py
+import sqlite3
+from typing import Dict, List, Optional
+from models.funcionario import Funcionario
+from repositories.funcionario_repository import FuncionarioRepository
+from repositories.sqlite_database import SqliteDatabase
+
+
+def _funcionario(row: sqlite3.Row) -> Funcionario:
+    return Funcionario(id=row['id'], email=row['email'], nome=row['nome'],
+                       total_emails=row['total_emails'], ativo=bool(row['ativo']))
+
+
+class SqliteFuncionarioRepository:
+    """Repositório de funcionários em SQLite, com a interface do FuncionarioRepository"""
+
+    normalize_email = staticmethod(FuncionarioRepository.normalize_email)
+    document_id_for = staticmethod(FuncionarioRepository.document_id_for)
+
+    def __init__(self, db: SqliteDatabase):
+        self.db = db
+
+    def find_by_email(self, email: str) -> Optional[Funcionario]:
+        """Busca funcionário pelo email (normalizado, ou como gravado por versões antigas)"""
+        rows = self.db.query('SELECT * FROM funcionarios WHERE email IN (?, ?) LIMIT 1',
+                             (self.normalize_email(email), email.strip()))
+        return _funcionario(rows[0]) if rows else None
+
+    def upsert(self, email: str, nome: Optional[str] = None, ativo: bool = True) -> Funcionario:
+        """
+        Cria ou atualiza o funcionário no ID determinístico do endereço.
+        Não sobrescreve o nome com None, não zera o contador e não reativa
+        um funcionário desativado.
+        """
+        email = self.normalize_email(email)
+        funcionario_id = self.document_id_for(email)
+        with self.db.transaction() as conn:
+            conn.execute(
+                'INSERT INTO funcionarios (id, email, nome, ativo) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (id) DO UPDATE SET email = excluded.email, '
+                'nome = COALESCE(excluded.nome, funcionarios.nome), '
+                'ativo = MIN(funcionarios.ativo, excluded.ativo)',
+                (funcionario_id, email, nome or None, 1 if ativo else 0)
+            )
+        return Funcionario(id=funcionario_id, email=email, nome=nome, ativo=ativo)
+
+    def create(self, funcionario: Funcionario) -> Funcionario:
+        """Cria (ou sobrescreve) o funcionário"""
+        funcionario.id = self.document_id_for(funcionario.email)
+        with self.db.transaction() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO funcionarios (id, email, nome, total_emails, ativo) VALUES (?, ?, ?, ?, ?)',
+                (funcionario.id, funcionario.email, funcionario.nome, funcionario.total_emails or 0,
+                 1 if funcionario.ativo else 0)
+            )
+        return funcionario
+
+    def update(self, funcionario: Funcionario) -> Funcionario:
+        """Atualiza funcionário"""
+        with self.db.transaction() as conn:
+            conn.execute(
+                'UPDATE funcionarios SET email = ?, nome = ?, total_emails = ?, ativo = ? WHERE id = ?',
+                (funcionario.email, funcionario.nome, funcionario.total_emails or 0,
+                 1 if funcionario.ativo else 0, funcionario.id)
+            )
+        return funcionario
+
+    def update_nome(self, funcionario_id: str, nome: str):
+        """Atualiza apenas o nome (sem tocar nos contadores)"""
+        with self.db.transaction() as conn:
+            conn.execute('UPDATE funcionarios SET nome = ? WHERE id = ?', (nome, funcionario_id))
+
+    def find_by_id(self, funcionario_id: str) -> Optional[Funcionario]:
+        """Busca funcionário por ID"""
+        rows = self.db.query('SELECT * FROM funcionarios WHERE id = ?', (funcionario_id,))
+        return _funcionario(rows[0]) if rows else None
+
+    def find_all(self) -> List[Funcionario]:
+        """Lista todos funcionários"""
+        return [_funcionario(row) for row in self.db.query('SELECT * FROM funcionarios')]
+
+    def get_top_senders(self, limit: int = 3) -> List[Funcionario]:
+        """Retorna top N funcionários que mais enviam emails"""
+        rows = self.db.query('SELECT * FROM funcionarios ORDER BY total_emails DESC LIMIT ?', (limit,))
+        return [_funcionario(row) for row in rows]
+
+    def increment_email_count(self, funcionario_id: str):
+        """Incrementa contador de emails"""
+        self.increment_email_counts({funcionario_id: 1})
+
+    def increment_email_counts(self, emails_por_funcionario: Dict[str, int]):
+        """Incrementa contadores de vários funcionários em uma transação"""
+        with self.db.transaction() as conn:
+            conn.executemany(
+                'UPDATE funcionarios SET total_emails = total_emails + ? WHERE id = ?',
+                [(n, funcionario_id) for funcionario_id, n in emails_por_funcionario.items()]
+            )
+
+    def migrate_document_ids(self) -> int:
+        """Nada a migrar: no SQLite os IDs sempre foram os determinísticos"""
+        return 0
+
+    def drop_emails_enviados(self) -> int:
+        """Nada a remover: o array legado só existe no Firestore"""
+        return 0
@@ -0,0 +1,28 @@
+# repositories/sqlite_sync_state_repository.py
+import json
+from datetime import datetime, timezone
+from typing import Optional
+from models.sync_checkpoint import SyncCheckpoint
+from repositories.sqlite_database import SqliteDatabase, encode_datetime, encode_doc
+
+
+class SqliteSyncStateRepository:
+    """Checkpoints de sincronização IMAP em SQLite (uma linha por caixa)"""
+
+    def __init__(self, db: SqliteDatabase):
+        self.db = db
+
+    def get(self, mailbox: str) -> Optional[SyncCheckpoint]:
+        """Busca o checkpoint da caixa"""
+        rows = self.db.query('SELECT doc FROM sync_state WHERE id = ?', (mailbox.lower(),))
+        return SyncCheckpoint.from_dict(json.loads(rows[0]['doc'])) if rows else None
+
+    def save(self, checkpoint: SyncCheckpoint) -> SyncCheckpoint:
+        """Grava (sobrescreve) o checkpoint da caixa"""
+        with self.db.transaction() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO sync_state (id, doc, atualizado_em) VALUES (?, ?, ?)',
+                (checkpoint.mailbox.lower(), encode_doc(checkpoint.to_dict()),
+                 encode_datetime(datetime.now(timezone.utc)))
+            )
+        return checkpoint
@@ -0,0 +1,32 @@
+# repositories/sync_state_repository.py
+from google.cloud import firestore
+from models.sync_checkpoint import SyncCheckpoint
+from typing import Optional
+
+class SyncStateRepository:
+    """Repositório dos checkpoints de sincronização IMAP (um documento por caixa)"""
+    
+    def __init__(self, db: firestore.Client):
+        self.db = db
+        self.collection = db.collection('sync_state')
+    
+    def get(self, mailbox: str) -> Optional[SyncCheckpoint]:
+        """Busca o checkpoint da caixa"""
+        doc = self.collection.document(self._doc_id(mailbox)).get()
+        
+        if not doc.exists:
+            return None
+        
+        return SyncCheckpoint.from_dict(doc.to_dict())
+    
+    def save(self, checkpoint: SyncCheckpoint) -> SyncCheckpoint:
+        """Grava (sobrescreve) o checkpoint da caixa"""
+        data = checkpoint.to_dict()
+        data['atualizado_em'] = firestore.SERVER_TIMESTAMP
+        self.collection.document(self._doc_id(checkpoint.mailbox)).set(data)
+        return checkpoint
+    
+    @staticmethod
+    def _doc_id(mailbox: str) -> str:
+        """ID do documento: '/' não é permitido em IDs do Firestore"""
+        return mailbox.lower().replace('/', '_')
@@ -1,26 +1,32 @@
 # services/analytics_service.py
-from repositories.email_repository import EmailRepository
-from repositories.funcionario_repository import FuncionarioRepository
-from collections import Counter
-from datetime import datetime, timedelta, timezone
+from repositories.interfaces import EmailStore, FuncionarioStore
+from utils.email_stats import RECENT_DAYS, count_last_days
 
 class AnalyticsService:
     """Service para analytics do dashboard"""
     
-    def __init__(self, email_repository: EmailRepository, funcionario_repository: FuncionarioRepository):
+    def __init__(self, email_repository: EmailStore, funcionario_repository: FuncionarioStore):
         self.email_repository = email_repository
         self.funcionario_repository = funcionario_repository
     
     def get_dashboard_stats(self) -> dict:
-        """Retorna estatísticas do dashboard"""
-        emails = self.email_repository.find_all()
+        """Retorna estatísticas do dashboard a partir do documento materializado"""
+        stats = self.email_repository.get_stats()
         
-        total = len(emails)
-        classificados = sum(1 for e in emails if getattr(e, "classificado", False))
-        pendentes = total - classificados
+        # Primeira execução: documento ainda não existe, constrói a partir da coleção
+        if stats is None:
+            stats = self.email_repository.rebuild_stats()
         
-        # Emails por estado
-        estados = Counter(e.estado for e in emails if getattr(e, "estado", None))
+        total = stats.get('total', 0)
+        classificados = stats.get('classificados', 0)
+        pendentes = stats.get('pendentes', 0)
+        
+        # Emails por estado (contadores zerados por exclusões são omitidos)
+        estados = {
+            estado: count
+            for estado, count in stats.get('emails_por_estado', {}).items()
+            if count > 0
+        }
         
         # Top 5 funcionários (remetentes) da coleção funcionarios
         top_funcionarios = self.funcionario_repository.get_top_senders(limit=5)
@@ -33,26 +39,27 @@ class AnalyticsService:
             for f in top_funcionarios
         ]
         
-        # Top 3 destinatários (mantido do código original)
-        destinatarios = Counter(e.destinatario for e in emails if getattr(e, "destinatario", None))
+        # Top 3 destinatários (contadores fora do documento de estatísticas)
         top_destinatarios = [
-            {'destinatario': dest, 'count': count} 
-            for dest, count in destinatarios.most_common(3)
+            {'destinatario': dest, 'count': count}
+            for dest, count in self.email_repository.get_top_destinatarios(3)
+            if count > 0
         ]
         
-        # Últimos 7 dias (em UTC)
-        sete_dias = datetime.now(timezone.utc) - timedelta(days=7)
-        emails_recentes = [
-            e for e in emails 
-            if e.data and e.data >= sete_dias
-        ]
+        # Últimos 7 dias: count() com range em `data` dá a janela móvel exata;
+        # os baldes diários ficam como alternativa se a consulta falhar
+        try:
+            emails_recentes = self.email_repository.count_recent(days=RECENT_DAYS)
+        except Exception as e:
+            print(f"⚠️ Erro ao contar emails recentes: {e}")
+            emails_recentes = count_last_days(stats.get('emails_por_dia', {}), days=RECENT_DAYS)
         
         return {
             'total': total,
             'classificados': classificados,
             'pendentes': pendentes,
-            'emails_por_estado': dict(estados),
-            'emails_ultimos_7_dias': len(emails_recentes),
+            'emails_por_estado': estados,
+            'emails_ultimos_7_dias': emails_recentes,
             'top_remetentes': top_remetentes, 
             'top_destinatarios': top_destinatarios 
-        }   
\ No newline at end of file
+        }
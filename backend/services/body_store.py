@@ -0,0 +1,114 @@
+# services/body_store.py
+import hashlib
+import os
+import tempfile
+import zlib
+from config import Config
+
+
+class BodyNotFoundError(KeyError):
+    """Referência sem conteúdo no store"""
+
+
+class LocalBodyStore:
+    """
+    Store endereçado por conteúdo para corpos grandes e anexos.
+    Cada blob é gravado comprimido (zlib) em <raiz>/<2 hex>/<sha256>.z;
+    conteúdo repetido gera a mesma referência e é gravado uma única vez.
+    """
+
+    PREFIX = 'sha256:'
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def put(self, data: bytes) -> str:
+        """Grava o conteúdo (se ainda não existir) e retorna a referência"""
+        writer = self.writer()
+        writer.write(data)
+        return writer.commit()
+
+    def writer(self) -> 'BlobWriter':
+        """Gravação incremental (anexos grandes sem o conteúdo inteiro em memória)"""
+        return BlobWriter(self)
+
+    def get(self, ref: str) -> bytes:
+        """Conteúdo descomprimido da referência"""
+        try:
+            with open(self._path(self._digest(ref)), 'rb') as blob:
+                return zlib.decompress(blob.read())
+        except FileNotFoundError:
+            raise BodyNotFoundError(ref)
+
+    def exists(self, ref: str) -> bool:
+        return os.path.exists(self._path(self._digest(ref)))
+
+    def _digest(self, ref: str) -> str:
+        if not ref.startswith(self.PREFIX):
+            raise ValueError(f"Referência inválida: {ref}")
+        digest = ref[len(self.PREFIX):]
+        if len(digest) != 64 or any(c not in '0123456789abcdef' for c in digest):
+            raise ValueError(f"Referência inválida: {ref}")
+        return digest
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], f"{digest}.z")
+
+
+class BlobWriter:
+    """
+    Comprime e calcula o hash enquanto grava em um arquivo temporário;
+    commit() move para o caminho do hash (ou descarta, se já existir)
+    """
+
+    def __init__(self, store: LocalBodyStore):
+        self.store = store
+        self.tamanho = 0
+        self._hash = hashlib.sha256()
+        self._compressor = zlib.compressobj(Config.BODY_STORE_COMPRESSION)
+        os.makedirs(store.root, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=store.root, suffix='.tmp')
+        self._tmp = os.fdopen(fd, 'wb')
+
+    def write(self, data: bytes):
+        self.tamanho += len(data)
+        self._hash.update(data)
+        self._tmp.write(self._compressor.compress(data))
+
+    def commit(self) -> str:
+        """Finaliza a gravação e retorna a referência"""
+        try:
+            self._tmp.write(self._compressor.flush())
+            self._tmp.close()
+            digest = self._hash.hexdigest()
+            path = self.store._path(digest)
+            if os.path.exists(path):
+                os.remove(self._tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Escrita atômica: outro processo nunca lê um arquivo pela metade
+                os.replace(self._tmp_path, path)
+            return self.store.PREFIX + digest
+        except BaseException:
+            self.abort()
+            raise
+
+    def abort(self):
+        """Descarta o que foi gravado"""
+        if not self._tmp.closed:
+            self._tmp.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+# Singleton - um store por processo
+_body_store = None
+
+def get_body_store() -> LocalBodyStore:
+    """Retorna o store de corpos/anexos configurado (BODY_STORE_PATH)"""
+    global _body_store
+
+    if _body_store is None:
+        _body_store = LocalBodyStore(Config.BODY_STORE_PATH)
+
+    return _body_store
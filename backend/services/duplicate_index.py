@@ -0,0 +1,163 @@
+# services/duplicate_index.py
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, NamedTuple, Optional, Tuple
+from config import Config
+from utils.fingerprint import Fingerprint, is_copy
+
+
+_MASK = (1 << 64) - 1
+
+
+def _signed(value: int) -> int:
+    """SimHash (64 bits sem sinal) -> INTEGER do SQLite (64 bits com sinal)"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _timestamp(data: Optional[datetime]) -> float:
+    if data is None:
+        return datetime.now(timezone.utc).timestamp()
+    if data.tzinfo is None:
+        data = data.replace(tzinfo=timezone.utc)
+    return data.timestamp()
+
+
+class Original(NamedTuple):
+    """Email indexado de que um email novo é cópia"""
+    email_id: str
+    remetente: Optional[str]
+    anexos: Optional[str]  # attachments_hash (None em entradas antigas do índice)
+
+
+class DuplicateIndex:
+    """
+    Índice local (SQLite) de fingerprints dos emails recebidos: hash exato
+    e faixas LSH do SimHash, para achar cópias de um email (encaminhamentos,
+    loops de CC, reenvios) dentro de uma janela de tempo.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            # Descarta no próprio SQLite os candidatos de faixa distantes demais
+            self._conn.create_function('hamming', 2, lambda a, b: bin((a ^ b) & _MASK).count('1'),
+                                       deterministic=True)
+            self._conn.executescript(
+                'CREATE TABLE IF NOT EXISTS fingerprints ('
+                '  email_id TEXT PRIMARY KEY, exact TEXT NOT NULL, simhash INTEGER NOT NULL,'
+                '  tokens INTEGER NOT NULL, remetente TEXT, recebido REAL NOT NULL);'
+                'CREATE INDEX IF NOT EXISTS fingerprints_exact ON fingerprints (exact, recebido);'
+                'CREATE TABLE IF NOT EXISTS bands ('
+                '  band INTEGER NOT NULL, email_id TEXT NOT NULL, recebido REAL NOT NULL, simhash INTEGER NOT NULL);'
+                'CREATE INDEX IF NOT EXISTS bands_band ON bands (band, recebido, simhash);'
+                'CREATE INDEX IF NOT EXISTS bands_email ON bands (email_id);'
+                # Limpeza das entradas fora da janela (prune)
+                'CREATE INDEX IF NOT EXISTS fingerprints_recebido ON fingerprints (recebido);'
+                'CREATE INDEX IF NOT EXISTS bands_recebido ON bands (recebido);'
+            )
+            colunas = {row[1] for row in self._conn.execute('PRAGMA table_info(fingerprints)')}
+            if 'anexos' not in colunas:
+                # Índices criados antes do hash dos anexos: entradas antigas ficam NULL
+                self._conn.execute('ALTER TABLE fingerprints ADD COLUMN anexos TEXT')
+                self._conn.commit()
+        return self._conn
+
+    def find(self, fp: Fingerprint, remetente: Optional[str] = None,
+             data: Optional[datetime] = None) -> Optional[Original]:
+        """
+        Email já indexado (na janela DUPLICATE_WINDOW_DAYS) de que `fp` é
+        cópia, com remetente e hash dos anexos, ou None. Candidatos: mesmo hash exato ou alguma faixa
+        LSH em comum; a decisão final é de utils.fingerprint.is_copy.
+        """
+        recebido = _timestamp(data)
+        inicio = recebido - timedelta(days=Config.DUPLICATE_WINDOW_DAYS).total_seconds()
+        bands = fp.bands()
+        marcas = ','.join('?' * len(bands))
+
+        with self._lock:
+            candidatos = self.conn.execute(
+                f'SELECT email_id, exact, simhash, tokens, remetente, recebido, anexos FROM fingerprints '
+                f'WHERE exact = ? AND recebido >= ? '
+                f'UNION '
+                f'SELECT f.email_id, f.exact, f.simhash, f.tokens, f.remetente, f.recebido, f.anexos '
+                f'FROM bands b JOIN fingerprints f ON f.email_id = b.email_id '
+                f'WHERE b.band IN ({marcas}) AND b.recebido >= ? AND hamming(b.simhash, ?) <= ? '
+                f'ORDER BY 6',
+                (fp.exact, inicio, *bands, inicio, _signed(fp.simhash), Config.DUPLICATE_MAX_DISTANCE)
+            ).fetchall()
+
+        for email_id, exact, simhash, tokens, outro_remetente, _, anexos in candidatos:
+            outro = Fingerprint(exact=exact, simhash=simhash & _MASK, tokens=tokens)
+            if is_copy(fp, remetente, outro, outro_remetente,
+                       Config.DUPLICATE_MIN_TOKENS, Config.DUPLICATE_MAX_DISTANCE):
+                return Original(email_id, outro_remetente, anexos)
+        return None
+
+    def add_many(self, entradas: Iterable[Tuple[str, Fingerprint, Optional[str], Optional[datetime], Optional[str]]]):
+        """
+        Indexa [(email_id, fingerprint, remetente, data, hash dos anexos)] em
+        uma transação e remove as entradas que saíram da janela
+        """
+        mais_recente = None
+        with self._lock, self.conn:
+            for email_id, fp, remetente, data, anexos in entradas:
+                recebido = _timestamp(data)
+                mais_recente = recebido if mais_recente is None else max(mais_recente, recebido)
+                self.conn.execute('DELETE FROM bands WHERE email_id = ?', (email_id,))
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO fingerprints (email_id, exact, simhash, tokens, remetente, recebido, anexos) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (email_id, fp.exact, _signed(fp.simhash), fp.tokens, remetente, recebido, anexos)
+                )
+                self.conn.executemany(
+                    'INSERT INTO bands (band, email_id, recebido, simhash) VALUES (?, ?, ?, ?)',
+                    [(band, email_id, recebido, _signed(fp.simhash)) for band in fp.bands()]
+                )
+            if mais_recente is not None:
+                # Relativo ao email mais novo do lote (sync de emails antigos não
+                # apaga a própria janela), limitado a agora (Date no futuro)
+                self._prune(min(mais_recente, _timestamp(None)))
+
+    def _prune(self, referencia: float):
+        """Remove entradas mais antigas que DUPLICATE_WINDOW_DAYS antes de `referencia` (com o lock)"""
+        limite = referencia - timedelta(days=Config.DUPLICATE_WINDOW_DAYS).total_seconds()
+        self.conn.execute('DELETE FROM bands WHERE recebido < ?', (limite,))
+        self.conn.execute('DELETE FROM fingerprints WHERE recebido < ?', (limite,))
+
+    def remove(self, email_id: str):
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM fingerprints WHERE email_id = ?', (email_id,))
+            self.conn.execute('DELETE FROM bands WHERE email_id = ?', (email_id,))
+
+    def clear(self):
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM fingerprints')
+            self.conn.execute('DELETE FROM bands')
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute('SELECT count(*) FROM fingerprints').fetchone()[0]
+
+
+# Singleton - um índice por processo
+_duplicate_index = None
+
+def get_duplicate_index() -> DuplicateIndex:
+    """Retorna o índice de duplicados configurado (DUPLICATE_INDEX_PATH)"""
+    global _duplicate_index
+
+    if _duplicate_index is None:
+        _duplicate_index = DuplicateIndex(Config.DUPLICATE_INDEX_PATH)
+
+    return _duplicate_index
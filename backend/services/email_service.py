@@ -1,44 +1,72 @@
 # services/email_service.py
-from repositories.email_repository import EmailRepository
+from repositories.interfaces import EmailStore
 from services.funcionario_service import FuncionarioService
 from models.email import Email
 from utils.email_parser import EmailParser
-from typing import List
+from services.body_store import LocalBodyStore, get_body_store
+from services.search_index import SearchIndex, get_search_index
+from services.duplicate_index import DuplicateIndex, Original, get_duplicate_index
+from utils.fingerprint import Fingerprint, attachments_hash, fingerprint, is_copy
+from utils.gazetteer import suggest_location
+from config import Config
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+def _preview(corpo: str) -> str:
+    """Primeiros caracteres do corpo, com espaços colapsados"""
+    texto = ' '.join(corpo[:Config.BODY_PREVIEW_CHARS * 4].split())
+    return texto[:Config.BODY_PREVIEW_CHARS]
 
 class EmailService:
     """Service com lógica de negócio"""
     
-    def __init__(self, repository: EmailRepository, funcionario_service: FuncionarioService):
+    def __init__(self, repository: EmailStore, funcionario_service: FuncionarioService,
+                 body_store: Optional[LocalBodyStore] = None, search_index: Optional[SearchIndex] = None,
+                 duplicate_index: Optional[DuplicateIndex] = None):
         self.repository = repository
         self.funcionario_service = funcionario_service
         self.email_parser = EmailParser()
+        self.body_store = body_store if body_store is not None else get_body_store()
+        self.search_index = search_index if search_index is not None else get_search_index()
+        self.duplicate_index = duplicate_index if duplicate_index is not None else get_duplicate_index()
     
     def create_email(self, remetente: str, destinatario: str, 
                      assunto: str, corpo: str, data, 
-                     estado: str = None, municipio: str = None, categoria: str = None) -> Email:
-        """Cria email (manual ou automático)"""
+                     estado: str = None, municipio: str = None, categoria: str = None,
+                     message_id: str = None, anexos: List[dict] = None) -> Email:
+        """
+        Cria email (manual ou automático).
+        Emails do sync trazem message_id; repetidos levantam DuplicateEmailError.
+        """
         
-        # Extrai email e nome do remetente
+        # Extrai email e nome do remetente (endereço em minúsculas, como o do funcionário)
         email_remetente, nome_remetente = self.email_parser.extract_email_and_name(remetente)
+        email_remetente = email_remetente.lower()
         
-        # Extrai apenas email do destinatário
-        email_destinatario, _ = self.email_parser.extract_email_and_name(destinatario)
+        # Extrai apenas os emails dos destinatários
+        email_destinatario, destinatarios = self._recipients(destinatario)
         
         # Cria email
         email = Email(
             remetente=email_remetente,  # Apenas o email
             destinatario=email_destinatario,  # Apenas o email
+            destinatarios=destinatarios,
             assunto=assunto,
             corpo=corpo,
             data=data,
             estado=estado,
             municipio=municipio,
             categoria=categoria,
-            classificado=bool(estado and municipio)
+            classificado=bool(estado and municipio),
+            message_id=message_id,
+            anexos=anexos
         )
+        self._suggest_location(email)
+        self._store_body(email)
         
         # Salva email
         email = self.repository.create(email)
+        self._index([(email, corpo)])
         
         # Registra funcionário (se service disponível)
         if self.funcionario_service:
@@ -51,19 +79,258 @@ class EmailService:
         
         return email
     
-    def classify_email(self, email_id: str, estado: str, municipio: str, categoria: str) -> Email:
-        """Classifica email pendente"""
-        email = self.repository.find_by_id(email_id)
+    def create_emails(self, emails: List[Email]) -> Tuple[List[Email], List[Email]]:
+        """
+        Cria vários emails (sync) com escritas em lote: os emails e as
+        estatísticas vão em WriteBatches, e os contadores dos remetentes
+        em um batch agrupado por remetente. Retorna (criados, duplicados).
         
-        if not email:
-            raise ValueError(f"Email {email_id} não encontrado")
+        Cópias de conteúdo (encaminhamentos, loops de CC) seguem
+        DUPLICATE_POLICY: 'flag' (padrão) grava com `duplicado_de`
+        preenchido; 'merge' descarta a cópia e soma em `copias` do original
+        (a cópia volta em duplicados) só quando remetente e anexos são os
+        mesmos, senão também grava com `duplicado_de`; 'off' não verifica.
+        """
+        nomes = {}
+        corpos = {}
+        fingerprints = {}
+        mesclados = []
+        normalizados = []
+        vistos = []
+        remetentes = self.email_parser.extract_many(email_obj.remetente for email_obj in emails)
+        for email_obj, (email_remetente, nome_remetente) in zip(emails, remetentes):
+            email_destinatario, destinatarios = self._recipients(email_obj.destinatario)
+            
+            email = Email(
+                remetente=email_remetente.lower(),
+                destinatario=email_destinatario,
+                destinatarios=destinatarios,
+                assunto=email_obj.assunto,
+                corpo=email_obj.corpo,
+                data=email_obj.data,
+                estado=email_obj.estado,
+                municipio=email_obj.municipio,
+                categoria=email_obj.categoria,
+                classificado=bool(email_obj.estado and email_obj.municipio),
+                message_id=email_obj.message_id,
+                anexos=email_obj.anexos
+            )
+            
+            if Config.DUPLICATE_POLICY != 'off':
+                fp = fingerprint(email.assunto, email.corpo)
+                email.conteudo_hash = fp.exact
+                email.simhash = f'{fp.simhash:016x}'
+                fingerprints[id(email)] = fp
+                
+                original = self._find_original(email, fp, vistos)
+                vistos.append((email, fp, original))
+                if original and Config.DUPLICATE_POLICY == 'merge' and self._can_merge(email, original):
+                    mesclados.append((email, original))
+                    continue
+                if original:
+                    email.duplicado_de = self._original_id(original)
+            
+            self._suggest_location(email)
+            self._store_body(email)
+            nomes[id(email)] = nome_remetente
+            corpos[id(email)] = email_obj.corpo
+            normalizados.append(email)
+        
+        criados, duplicados = self.repository.create_many(normalizados)
+        self._index([(email, corpos[id(email)]) for email in criados])
+        self._index_fingerprints([(email, fingerprints[id(email)]) for email in criados if id(email) in fingerprints])
+        
+        if mesclados:
+            duplicados.extend(email for email, _ in mesclados)
+            self._merge_copies([original for _, original in mesclados])
         
-        email.estado = estado
-        email.municipio = municipio
-        email.categoria = categoria
-        email.classificado = True
+        if self.funcionario_service and criados:
+            self.funcionario_service.register_emails_sent([
+                (email.remetente, nomes[id(email)], email.id) for email in criados
+            ])
         
-        return self.repository.update(email)
+        return criados, duplicados
+    
+    def _recipients(self, raw) -> Tuple[str, List[str]]:
+        """(primeiro destinatário, todos os destinatários) de um cabeçalho To"""
+        enderecos = [email for email, _ in self.email_parser.parse_addresses(raw)]
+        if not enderecos:
+            email, _ = self.email_parser.extract_email_and_name(raw)
+            return email, [email] if email else []
+        return enderecos[0], enderecos
+    
+    def _find_original(self, email: Email, fp: Fingerprint, lote: List[tuple]):
+        """
+        Original de que `email` é cópia: ID de um email já gravado (índice
+        de duplicados) ou um Email anterior do mesmo lote, dado em `lote` como
+        [(email, fingerprint, original)]. None se não for cópia.
+        """
+        proprio_id = self.repository.document_id_for(email.message_id) if email.message_id else None
+        try:
+            original = self.duplicate_index.find(fp, email.remetente, email.data)
+        except Exception as e:
+            print(f"⚠️ Falha ao consultar índice de duplicados: {e}")
+            original = None
+        # Mesmo Message-ID já gravado (sync repetido) não é cópia: o repositório descarta
+        if original and original.email_id != proprio_id:
+            return original
+        
+        for anterior, outro, original_anterior in lote:
+            if anterior.message_id and anterior.message_id == email.message_id:
+                continue
+            if is_copy(fp, email.remetente, outro, anterior.remetente,
+                       Config.DUPLICATE_MIN_TOKENS, Config.DUPLICATE_MAX_DISTANCE):
+                # Cópia de uma cópia aponta para o mesmo original
+                return original_anterior or anterior
+        return None
+    
+    def _original_id(self, original) -> Optional[str]:
+        """ID do original (já gravado ou do lote; no lote, só Message-ID dá o ID antes da gravação)"""
+        if isinstance(original, Original):
+            return original.email_id
+        if original.id:
+            return original.id
+        if original.message_id:
+            return self.repository.document_id_for(original.message_id)
+        return None
+    
+    @staticmethod
+    def _can_merge(email: Email, original) -> bool:
+        """
+        Cópia pode ser descartada no original? Só do mesmo remetente e com os
+        mesmos anexos: o mesmo texto de outro remetente (avisos padronizados
+        de municípios diferentes) ou com outros anexos é outra mensagem
+        """
+        if isinstance(original, Original):
+            remetente, anexos = original.remetente, original.anexos
+        else:
+            remetente, anexos = original.remetente, attachments_hash(original.anexos)
+        return (bool(email.remetente) and email.remetente.lower() == (remetente or '').lower()
+                and attachments_hash(email.anexos) == anexos)
+    
+    def _merge_copies(self, originais: list):
+        """Soma as cópias mescladas no contador `copias` de cada original"""
+        copias: Dict[str, int] = {}
+        for original in originais:
+            original_id = self._original_id(original)
+            if original_id:
+                copias[original_id] = copias.get(original_id, 0) + 1
+        if copias:
+            self.repository.increment_copies(copias)
+    
+    def _index_fingerprints(self, emails: List[Tuple[Email, Fingerprint]]):
+        """Indexa fingerprints dos emails gravados; falhas só deixam cópias futuras passarem"""
+        if not emails:
+            return
+        try:
+            self.duplicate_index.add_many([
+                (email.id, fp, email.remetente, email.data, attachments_hash(email.anexos)) for email, fp in emails
+            ])
+        except Exception as e:
+            print(f"⚠️ Falha ao indexar fingerprints: {e}")
+    
+    def _suggest_location(self, email: Email):
+        """Preenche a sugestão de estado/município (gazetteer) de emails sem estado"""
+        if email.estado or not Config.LOCATION_SUGGESTIONS:
+            return
+        sugestao = suggest_location(email.assunto, email.corpo)
+        if sugestao:
+            email.estado_sugerido = sugestao.estado
+            email.municipio_sugerido = sugestao.municipio
+            email.confianca_sugestao = sugestao.confianca
+    
+    def suggest_pending(self, recompute: bool = False) -> Tuple[int, int]:
+        """
+        Sugere estado/município para os emails pendentes (backlog anterior
+        ao gazetteer). Sem `recompute`, pula os que já têm sugestão.
+        Retorna (analisados, com sugestão).
+        """
+        analisados = 0
+        sugeridos = 0
+        updates = {}
+        for email in self.iter_emails({'classificado': False}, ['assunto', 'corpo', 'estado', 'estado_sugerido'],
+                                      descending=False):
+            if email.estado or (email.estado_sugerido and not recompute):
+                continue
+            analisados += 1
+            self._suggest_location(email)
+            if email.estado_sugerido:
+                sugeridos += 1
+                updates[email.id] = {
+                    'estado_sugerido': email.estado_sugerido,
+                    'municipio_sugerido': email.municipio_sugerido,
+                    'confianca_sugestao': email.confianca_sugestao,
+                }
+            if len(updates) >= self.repository.BATCH_SIZE:
+                self.repository.update_fields_many(updates)
+                updates = {}
+        if updates:
+            self.repository.update_fields_many(updates)
+        return analisados, sugeridos
+    
+    def normalize_remetentes(self) -> int:
+        """
+        Grava em minúsculas o `remetente` de emails antigos (filtro por
+        remetente e endereço do funcionário são normalizados).
+        Retorna quantos emails foram alterados.
+        """
+        alterados = 0
+        updates = {}
+        for email in self.iter_emails(fields=['remetente']):
+            if email.remetente and email.remetente != email.remetente.lower():
+                updates[email.id] = {'remetente': email.remetente.lower()}
+                alterados += 1
+            if len(updates) >= self.repository.BATCH_SIZE:
+                self.repository.update_fields_many(updates)
+                updates = {}
+        if updates:
+            self.repository.update_fields_many(updates)
+        return alterados
+    
+    def classify_email(self, email_id: str, estado: str, municipio: str, categoria: str,
+                       versao: Optional[str] = None) -> dict:
+        """
+        Classifica email pendente gravando só os campos da classificação.
+        Retorna os campos gravados com a nova `versao`.
+        """
+        campos = {'estado': estado, 'municipio': municipio, 'categoria': categoria, 'classificado': True}
+        nova_versao = self.repository.update_fields(email_id, campos, versao)
+        return {'id': email_id, **campos, 'versao': nova_versao}
+    
+    def classify_emails(self, itens: List[dict]) -> List[dict]:
+        """
+        Classifica vários emails ([{id, estado, municipio, categoria}]) com
+        escritas em lote, sem ler cada email antes. Retorna um resultado por
+        item: {'id', 'status': 'classificado' | 'nao_encontrado' | 'invalido', 'error'?}.
+        Emails alterados durante a escrita levantam ConflictError; os lotes
+        já gravados antes disso continuam classificados.
+        """
+        resultados = []
+        classificacoes = {}
+        for item in itens:
+            email_id = item.get('id') if isinstance(item, dict) else None
+            faltando = [
+                campo for campo in ('estado', 'municipio', 'categoria')
+                if not isinstance(item, dict) or not isinstance(item.get(campo), str) or not item[campo].strip()
+            ]
+            if not isinstance(email_id, str) or not email_id:
+                resultados.append({'id': email_id, 'status': 'invalido', 'error': "Campo 'id' obrigatório"})
+            elif email_id in classificacoes:
+                resultados.append({'id': email_id, 'status': 'invalido', 'error': 'ID repetido no lote'})
+            elif faltando:
+                resultados.append({
+                    'id': email_id, 'status': 'invalido',
+                    'error': f"Campos obrigatórios: {', '.join(faltando)}"
+                })
+            else:
+                classificacoes[email_id] = {campo: item[campo] for campo in ('estado', 'municipio', 'categoria')}
+                resultados.append({'id': email_id, 'status': None})
+        
+        encontrados = self.repository.classify_many(classificacoes) if classificacoes else {}
+        for resultado in resultados:
+            if resultado['status'] is None:
+                resultado['status'] = 'classificado' if encontrados[resultado['id']] else 'nao_encontrado'
+        return resultados
     
     def get_all_emails(self) -> List[Email]:
         """Lista todos emails"""
@@ -73,49 +340,163 @@ class EmailService:
         """Lista emails pendentes"""
         return self.repository.find_pending()
     
+    def get_emails_page(self, limit: int, cursor: Optional[str] = None, filters: Optional[dict] = None,
+                        fields: Optional[List[str]] = None) -> Tuple[List[Email], Optional[str]]:
+        """Lista uma página de emails filtrados e o cursor da próxima"""
+        return self.repository.find_page(limit, cursor, filters, fields)
+    
+    def get_pending_emails_page(self, limit: int, cursor: Optional[str] = None, filters: Optional[dict] = None,
+                                fields: Optional[List[str]] = None) -> Tuple[List[Email], Optional[str]]:
+        """Lista uma página de emails pendentes e o cursor da próxima"""
+        return self.repository.find_pending_page(limit, cursor, filters, fields)
+    
+    def iter_emails(self, filters: Optional[dict] = None, fields: Optional[List[str]] = None,
+                    descending: bool = True) -> Iterator[Email]:
+        """Todos os emails filtrados, em streaming (corpo carregado se pedido em fields)"""
+        carregar_corpo = fields is None or 'corpo' in fields
+        if carregar_corpo and fields is not None and 'corpo_ref' not in fields:
+            fields = [*fields, 'corpo_ref']
+        for email in self.repository.iter_emails(filters, fields, descending=descending):
+            yield self.load_body(email) if carregar_corpo else email
+    
+    def count_emails(self, filters: Optional[dict] = None) -> int:
+        """Conta emails que atendem os filtros"""
+        return self.repository.count(filters)
+    
     def get_emails_by_id(self, email_id: str) -> Email:
-        """Busca email por ID"""
+        """Busca email por ID, com o corpo carregado do BodyStore se necessário"""
         email = self.repository.find_by_id(email_id)
         if not email:
             raise ValueError(f"Email {email_id} não encontrado")
-        return email
-    
-    def update_email(self, email_id: str, data: dict) -> Email:
-        """Atualiza email"""
-
-        email = self.repository.find_by_id(email_id)
-        if not email:
-            raise Exception("Email não encontrado")
-
-        # Atualizar somente os campos recebidos
-        if "assunto" in data:
-            email.assunto = data["assunto"]
-
-        if "categoria" in data:
-            email.categoria = data["categoria"]
-
-        if "estado" in data:
-            email.estado = data["estado"]
-
-        if "municipio" in data:
-            email.municipio = data["municipio"]
-
-        if "corpo" in data:
-            email.corpo = data["corpo"]
-
-        if "classificado" in data:
-            email.classificado = data["classificado"]
-
-        # Salva no banco
-        updated_email = self.repository.update(email)
-
-        return updated_email
-
+        return self.load_body(email)
     
-
-    def delete_email(self, email_id: str):
-        """Exclui email"""
+    def get_attachment(self, email_id: str, index: int) -> Tuple[dict, bytes]:
+        """Metadados e conteúdo do anexo `index` do email"""
         email = self.repository.find_by_id(email_id)
         if not email:
             raise ValueError(f"Email {email_id} não encontrado")
-        self.repository.delete(email_id)
\ No newline at end of file
+        if index < 0 or index >= len(email.anexos):
+            raise ValueError(f"Anexo {index} não encontrado")
+        anexo = email.anexos[index]
+        if not anexo.get('ref'):
+            # Acima de MIME_MAX_ATTACHMENT_BYTES só os metadados são guardados
+            raise ValueError(f"Anexo {index} não foi armazenado (excede o tamanho máximo)")
+        return anexo, self.body_store.get(anexo['ref'])
+    
+    def load_body(self, email: Email) -> Email:
+        """Preenche `corpo` a partir de `corpo_ref` (carregamento sob demanda)"""
+        if email.corpo is None and email.corpo_ref:
+            email.corpo = self.body_store.get(email.corpo_ref).decode('utf-8', errors='replace')
+        return email
+    
+    def _store_body(self, email: Email):
+        """
+        Gera a prévia e move corpos acima de BODY_INLINE_MAX_BYTES para o
+        BodyStore; o documento guarda só a referência
+        """
+        corpo = email.corpo or ''
+        email.preview = _preview(corpo)
+        
+        dados = corpo.encode('utf-8')
+        if len(dados) > Config.BODY_INLINE_MAX_BYTES:
+            email.corpo_ref = self.body_store.put(dados)
+            email.corpo = None
+        else:
+            email.corpo_ref = None
+    
+    # Campos editáveis em PUT /api/emails/<id>
+    EDITABLE_FIELDS = ('assunto', 'corpo', 'estado', 'municipio', 'categoria', 'classificado')
+    
+    def update_email(self, email_id: str, data: dict, versao: Optional[str] = None) -> str:
+        """
+        Atualiza só os campos recebidos (sem ler o email antes).
+        Retorna a nova versão.
+        """
+        campos = {campo: data[campo] for campo in self.EDITABLE_FIELDS if campo in data}
+        if not campos:
+            raise ValueError(f"Nenhum campo para atualizar (aceitos: {', '.join(self.EDITABLE_FIELDS)})")
+        if 'classificado' in campos and not isinstance(campos['classificado'], bool):
+            raise ValueError("'classificado' deve ser true ou false")
+        
+        if 'corpo' in campos:
+            # Corpo grande vai para o store; atualiza também a referência e a prévia
+            email = Email(remetente=None, destinatario=None, assunto=None, corpo=campos['corpo'], data=None)
+            self._store_body(email)
+            campos.update({'corpo': email.corpo, 'corpo_ref': email.corpo_ref, 'preview': email.preview})
+        
+        nova_versao = self.repository.update_fields(email_id, campos, versao)
+        
+        if 'assunto' in data or 'corpo' in data:
+            try:
+                self.search_index.update(email_id, assunto=data.get('assunto'), corpo=data.get('corpo'))
+            except Exception as e:
+                print(f"⚠️ Falha ao reindexar {email_id} para busca: {e}")
+        
+        return nova_versao
+    
+    def delete_email(self, email_id: str, versao: Optional[str] = None):
+        """Exclui email (EmailNotFoundError se não existir)"""
+        self.repository.delete(email_id, versao)
+        try:
+            self.search_index.remove(email_id)
+            self.duplicate_index.remove(email_id)
+        except Exception as e:
+            print(f"⚠️ Falha ao remover {email_id} dos índices locais: {e}")
+    
+    def search_emails(self, q: str, limit: int, cursor: Optional[str] = None,
+                      fields: Optional[List[str]] = None) -> Tuple[List[Tuple[Email, float]], Optional[str]]:
+        """
+        Busca textual em assunto/corpo. Retorna ([(email, score)], próximo cursor),
+        mais relevantes primeiro
+        """
+        hits, next_cursor = self.search_index.search(q, limit, cursor)
+        scores = dict(hits)
+        emails = self.repository.find_by_ids([email_id for email_id, _ in hits], fields)
+        return [(email, scores[email.id]) for email in emails], next_cursor
+    
+    def reindex(self) -> int:
+        """Reconstrói o índice de busca a partir do repositório"""
+        self.search_index.clear()
+        total = 0
+        lote = []
+        # Do mais antigo para o mais recente: a ordem de inserção define a
+        # janela de ranqueamento por recência do índice
+        for email in self.iter_emails(fields=['assunto', 'corpo'], descending=False):
+            lote.append((email.id, email.assunto, email.corpo))
+            if len(lote) >= 500:
+                self.search_index.add_many(lote)
+                total += len(lote)
+                lote = []
+        if lote:
+            self.search_index.add_many(lote)
+            total += len(lote)
+        return total
+    
+    def reindex_duplicates(self) -> int:
+        """Reconstrói o índice de duplicados com os emails da janela DUPLICATE_WINDOW_DAYS"""
+        self.duplicate_index.clear()
+        inicio = datetime.now(timezone.utc) - timedelta(days=Config.DUPLICATE_WINDOW_DAYS)
+        total = 0
+        lote = []
+        for email in self.iter_emails({'data_inicio': inicio}, ['assunto', 'corpo', 'remetente', 'anexos'], descending=False):
+            lote.append((email, fingerprint(email.assunto, email.corpo)))
+            if len(lote) >= 500:
+                self._index_fingerprints(lote)
+                total += len(lote)
+                lote = []
+        if lote:
+            self._index_fingerprints(lote)
+            total += len(lote)
+        return total
+    
+    def _index(self, emails: List[Tuple[Email, Optional[str]]]):
+        """
+        Atualiza o índice de busca; falhas não desfazem a gravação
+        (o comando reindex-search reconstrói o índice)
+        """
+        if not emails:
+            return
+        try:
+            self.search_index.add_many([(email.id, email.assunto, corpo) for email, corpo in emails])
+        except Exception as e:
+            print(f"⚠️ Falha ao indexar emails para busca: {e}")
\ No newline at end of file
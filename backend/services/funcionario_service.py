@@ -1,36 +1,57 @@
 # services/funcionario_service.py
-from repositories.funcionario_repository import FuncionarioRepository
+from repositories.interfaces import FuncionarioStore
 from models.funcionario import Funcionario
-from typing import Optional
+from utils.ttl_cache import TTLCache
+from config import Config
+from typing import Dict, List, Optional, Tuple
+
+# Endereço normalizado -> (id do funcionário, nome), compartilhado pelo processo
+_remetentes = TTLCache(maxsize=Config.FUNCIONARIO_CACHE_SIZE, ttl=Config.FUNCIONARIO_CACHE_TTL)
 
 class FuncionarioService:
     """Service para gerenciar funcionários"""
     
-    def __init__(self, repository: FuncionarioRepository):
+    def __init__(self, repository: FuncionarioStore, cache: Optional[TTLCache] = None):
         self.repository = repository
+        self.cache = cache if cache is not None else _remetentes
+    
+    def warm_cache(self) -> int:
+        """Carrega o diretório de remetentes no cache (início do processo)"""
+        funcionarios = self.repository.find_all()
+        legados = 0
+        for funcionario in funcionarios:
+            if funcionario.id != self.repository.document_id_for(funcionario.email):
+                legados += 1
+            self.cache.set(self.repository.normalize_email(funcionario.email), (funcionario.id, funcionario.nome))
+        
+        if legados:
+            print(f"⚠️ {legados} funcionários com ID antigo; rode 'flask --app app migrate-funcionario-ids'")
+        print(f"👥 Cache de remetentes carregado: {len(self.cache)} funcionários")
+        return len(funcionarios)
     
     def get_or_create_funcionario(self, email: str, nome: Optional[str] = None, ativo: bool = True) -> Funcionario:
         """
-        Busca funcionário por email, se não existir cria um novo
+        Retorna o funcionário do remetente. Consulta o cache; na falta (ou
+        se o nome mudou) faz um upsert idempotente no ID derivado do endereço,
+        sem leitura. Documentos antigos (ID automático) só são reaproveitados
+        se vierem do warm_cache; 'migrate-funcionario-ids' os move para o ID
+        derivado
         """
-        funcionario = self.repository.find_by_email(email)
-        
-        if not funcionario:
-            # Cria novo funcionário
-            funcionario = Funcionario(
-                email=email,
-                nome=nome,
-                total_emails=0,
-                ativo=ativo
-            )
-            funcionario = self.repository.create(funcionario)
-            print(f"✨ Novo funcionário criado: {email}")
+        chave = self.repository.normalize_email(email)
+        cached = self.cache.get(chave)
+        
+        if cached and (not nome or cached[1] == nome):
+            funcionario_id, nome_cached = cached
+            return Funcionario(id=funcionario_id, email=email, nome=nome_cached, ativo=ativo)
+        
+        if cached and cached[0] != self.repository.document_id_for(email):
+            # Documento antigo com ID automático: mantém o ID até a migração
+            funcionario = Funcionario(id=cached[0], email=email, nome=nome, ativo=ativo)
+            self.repository.update_nome(cached[0], nome)
         else:
-            # Atualiza nome se veio diferente
-            if nome and funcionario.nome != nome:
-                funcionario.nome = nome
-                self.repository.update(funcionario)
+            funcionario = self.repository.upsert(email, nome, ativo)
         
+        self.cache.set(chave, (funcionario.id, nome or (cached[1] if cached else None)))
         return funcionario
     
     def register_email_sent(self, email_remetente: str, nome_remetente: Optional[str], email_id: str, ativo: bool = True):
@@ -40,15 +61,42 @@ class FuncionarioService:
         # Busca ou cria funcionário
         funcionario = self.get_or_create_funcionario(email_remetente, nome_remetente, ativo)
         
-        # Incrementa contador e adiciona ID do email
-        self.repository.increment_email_count(funcionario.id, email_id)
+        # Incrementa contador (a relação com o email é o campo `remetente`)
+        self.repository.increment_email_count(funcionario.id)
         
         print(f"📧 Email registrado para {funcionario.nome or funcionario.email}")
     
+    def register_emails_sent(self, enviados: List[Tuple[str, Optional[str], str]]):
+        """
+        Registra vários emails de uma vez: [(email_remetente, nome_remetente, email_id)].
+        Busca/cria cada remetente uma única vez e atualiza todos os contadores
+        em um batch, agrupando os emails por remetente.
+        """
+        por_remetente: Dict[str, List[str]] = {}
+        nomes: Dict[str, Optional[str]] = {}
+        for email_remetente, nome_remetente, email_id in enviados:
+            por_remetente.setdefault(email_remetente, []).append(email_id)
+            if nome_remetente:
+                nomes[email_remetente] = nome_remetente
+        
+        emails_por_funcionario: Dict[str, int] = {}
+        for email_remetente, email_ids in por_remetente.items():
+            funcionario = self.get_or_create_funcionario(email_remetente, nomes.get(email_remetente))
+            emails_por_funcionario[funcionario.id] = emails_por_funcionario.get(funcionario.id, 0) + len(email_ids)
+        
+        if emails_por_funcionario:
+            self.repository.increment_email_counts(emails_por_funcionario)
+        
+        print(f"📧 {len(enviados)} emails registrados para {len(por_remetente)} funcionários")
+    
     def get_top_senders(self, limit: int = 3):
         """Retorna top funcionários que mais enviam"""
         return self.repository.get_top_senders(limit)
     
     def get_all_funcionarios(self):
         """Lista todos funcionários"""
-        return self.repository.find_all()
\ No newline at end of file
+        return self.repository.find_all()
+    
+    def get_funcionario(self, funcionario_id: str) -> Optional[Funcionario]:
+        """Busca funcionário por ID"""
+        return self.repository.find_by_id(funcionario_id)
\ No newline at end of file
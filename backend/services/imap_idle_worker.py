@@ -0,0 +1,115 @@
+# services/imap_idle_worker.py
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+from models.mailbox import Mailbox
+from services.imap_service import ImapService
+from services.mailbox_sync_runner import MailboxRemovedError
+
+class ImapIdleWorker(threading.Thread):
+    """
+    Worker de longa duração: mantém uma conexão IMAP autenticada e só
+    sincroniza quando o servidor avisa mensagens novas (IDLE, ou NOOP
+    periódico se o servidor não suportar IDLE). Reconecta com backoff
+    exponencial quando a conexão cai. Se o sync for pulado (outro sync da
+    caixa em andamento), tenta de novo a cada `noop_interval` até rodar, para
+    não perder o aviso.
+    """
+    
+    def __init__(self, imap: ImapService, sync: Callable[[ImapService], Optional[List]],
+                 idle_timeout: float = 300, noop_interval: float = 6, max_backoff: float = 300):
+        super().__init__(name='imap-idle-worker', daemon=True)
+        self.imap = imap
+        self.sync = sync  # recebe o ImapService conectado, retorna os emails gravados (None se pulado)
+        self.idle_timeout = idle_timeout
+        # Sem IDLE o servidor não avisa: NOOP curto para não atrasar os emails
+        self.noop_interval = noop_interval
+        self.max_backoff = max_backoff
+        self._stop_event = threading.Event()
+        self._pendente = False
+    
+    def stop(self):
+        """Pede para o worker parar (interrompe a espera do NOOP; com IDLE, efetivo ao fim do ciclo)"""
+        self._stop_event.set()
+    
+    def run(self):
+        backoff = 1
+        while not self._stop_event.is_set():
+            try:
+                self.imap.connect()
+                backoff = 1
+                print(f"📡 Conectado a {self.imap.mailbox} (IDLE: {self.imap.supports_idle})")
+                
+                # Recupera o que chegou enquanto estava desconectado
+                self._sync()
+                
+                while not self._stop_event.is_set():
+                    timeout = self.idle_timeout if self.imap.supports_idle and not self._pendente else self.noop_interval
+                    novas = self.imap.wait_for_changes(timeout, stop=self._stop_event)
+                    if (novas or self._pendente) and not self._stop_event.is_set():
+                        self._sync()
+            except MailboxRemovedError as e:
+                print(f"🛑 {e}; worker encerrado")
+                self._stop_event.set()
+            except Exception as e:
+                print(f"❌ Conexão IMAP perdida: {e}; reconectando em {backoff}s")
+                self.imap.close()
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+        
+        self.imap.close()
+    
+    def _sync(self):
+        salvos = self.sync(self.imap)
+        self._pendente = salvos is None
+        if self._pendente:
+            print(f"⏳ Sync de {self.imap.mailbox} já em andamento; nova tentativa em {self.noop_interval:g}s")
+        elif salvos:
+            print(f"✅ {len(salvos)} emails sincronizados")
+
+
+class ImapIdleSupervisor(threading.Thread):
+    """
+    Mantém um ImapIdleWorker por caixa do registro: a cada `reload_every`
+    segundos relê as caixas (`reload`, ex.: MailboxSyncRunner.reload), inicia
+    workers para caixas novas ou alteradas e para os das removidas.
+    """
+
+    def __init__(self, reload: Callable[[], List[Mailbox]], new_worker: Callable[[Mailbox], ImapIdleWorker],
+                 reload_every: float = 60):
+        super().__init__(name='imap-idle-supervisor', daemon=True)
+        self.reload = reload
+        self.new_worker = new_worker
+        self.reload_every = reload_every
+        self.workers: Dict[str, Tuple[Mailbox, ImapIdleWorker]] = {}
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """Para a supervisão e os workers"""
+        self._stop_event.set()
+        for _, worker in self.workers.values():
+            worker.stop()
+
+    def run(self):
+        # O primeiro refresh é feito por quem inicia o supervisor
+        while not self._stop_event.wait(self.reload_every):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"❌ Erro ao recarregar as caixas: {e}")
+
+    def refresh(self) -> int:
+        """Ajusta os workers às caixas do registro; retorna quantos estão rodando"""
+        atuais = {mailbox.key.lower(): mailbox for mailbox in self.reload()}
+        for key in list(self.workers):
+            mailbox, worker = self.workers[key]
+            if atuais.get(key) != mailbox or not worker.is_alive():
+                worker.stop()
+                del self.workers[key]
+                if key not in atuais:
+                    print(f"🛑 Caixa {mailbox.key} removida do registro")
+        for key, mailbox in atuais.items():
+            if key not in self.workers and not self._stop_event.is_set():
+                worker = self.new_worker(mailbox)
+                worker.start()
+                self.workers[key] = (mailbox, worker)
+        return len(self.workers)
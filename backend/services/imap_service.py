@@ -1,69 +1,350 @@
 import imaplib
-import email
 from datetime import datetime
 from models.email import Email
-from typing import List
+from models.sync_checkpoint import SyncCheckpoint
+from services.body_store import LocalBodyStore
+from utils.email_parser import decode_header_value
+from utils.mime_extract import ExtractedMessage, MimeExtractor
+from typing import Iterator, List, Optional, Tuple
 import os
+import re
+import select
+import threading
+import time
+
+_FETCH_START = re.compile(rb'^\* \d+ FETCH ')
+_FETCH_UID = re.compile(rb'UID (\d+)')
+_LITERAL = re.compile(rb'\{(\d+)\}\r?\n$')
+_EXISTS = re.compile(rb'^\* (\d+) EXISTS')
+# Bytes por leitura do socket ao consumir um literal
+_READ_CHUNK = 64 * 1024
 
 class ImapService:
     """Service para sincronização IMAP"""
 
-    def __init__(self, email_addr: str, password: str):
+    def __init__(self, email_addr: str, password: str, folder: str = 'INBOX',
+                 body_store: Optional[LocalBodyStore] = None, server: Optional[str] = None,
+                 port: Optional[int] = None):
         self.email = email_addr
         self.password = password
-        self.server = os.getenv("EMAIL_IMAP_HOST", "imap.gmail.com")
-        self.port = int(os.getenv("EMAIL_IMAP_PORT", "993"))
+        self.folder = folder
+        self.server = server or os.getenv("EMAIL_IMAP_HOST", "imap.gmail.com")
+        self.port = port or int(os.getenv("EMAIL_IMAP_PORT", "993"))
+        # UIDs por comando UID FETCH e limite do corpo baixado (0 = sem limite)
+        self.chunk_size = int(os.getenv("IMAP_FETCH_CHUNK_SIZE", "100"))
+        self.max_body_bytes = int(os.getenv("IMAP_MAX_BODY_BYTES", str(10 * 1024 * 1024)))
+        # Sem store, anexos são descartados
+        self.body_store = body_store
+        self.extractor = MimeExtractor(body_store)
+        self._mail = None
+        self._supports_idle = False
 
-    def fetch_new_emails(self) -> List[Email]:
-        mail = imaplib.IMAP4_SSL(self.server, self.port)
-        mail.login(self.email, self.password)
-
-        mail.select('inbox')
-        
-        # Busca emails não lidos
-        status, messages = mail.search(None, 'UNSEEN')
-        email_ids = messages[0].split()
-        
-        emails = []
-        for email_id in email_ids[-10:]:  # Últimos 10 apenas
+    @property
+    def mailbox(self) -> str:
+        """Identificador da caixa usado no checkpoint"""
+        return f"{self.email}/{self.folder}"
+
+    def connect(self):
+        """
+        Abre uma conexão persistente (LOGIN + EXAMINE da pasta). Enquanto
+        aberta, fetch_new_emails e wait_for_changes a reutilizam.
+        """
+        self.close()
+        self._mail, self._uidvalidity_atual = self._open()
+        self._supports_idle = 'IDLE' in getattr(self._mail, 'capabilities', ())
+
+    def close(self):
+        """Fecha a conexão persistente, se houver"""
+        mail, self._mail = self._mail, None
+        if mail is not None:
             try:
-                status, msg_data = mail.fetch(email_id, '(RFC822)')
-                raw_email = msg_data[0][1]
-                msg = email.message_from_bytes(raw_email)
-                
-                corpo = self._extract_body(msg)
-                
-                email_obj = Email(
-                    remetente=msg['From'],
-                    destinatario=msg['To'],
-                    assunto=msg.get('Subject', 'Sem assunto'),
-                    corpo=corpo,
-                    data=datetime.now(),
-                    classificado=False
-                )
-                
-                emails.append(email_obj)
-            except Exception as e:
-                print(f"Erro ao processar email: {e}")
-                continue
-        
-        mail.close()
-        mail.logout()
-        
-        return emails
-    
-    def _extract_body(self, msg) -> str:
-        """Extrai corpo do email"""
-        if msg.is_multipart():
-            for part in msg.walk():
-                if part.get_content_type() == "text/plain":
-                    try:
-                        return part.get_payload(decode=True).decode()
-                    except:
-                        return ""
+                mail.logout()
+            except Exception:
+                pass
+
+    @property
+    def supports_idle(self) -> bool:
+        """O servidor da conexão persistente anuncia IDLE"""
+        return self._supports_idle
+
+    @property
+    def connected(self) -> bool:
+        """Há conexão persistente aberta"""
+        return self._mail is not None
+
+    def fetch_new_emails(self, checkpoint: Optional[SyncCheckpoint] = None) -> Tuple[Iterator[Tuple[int, Email]], SyncCheckpoint]:
+        """
+        Busca as mensagens com UID acima do checkpoint e as converte em Email
+        (fetch_raw_emails + parse_message). Retorna um iterador de (uid, Email)
+        em ordem de UID e o checkpoint ao fim da busca; mensagens que não
+        puderem ser convertidas são puladas.
+        """
+        brutas, novo_checkpoint = self.fetch_raw_emails(checkpoint)
+
+        def mensagens():
+            for uid, partes in brutas:
+                email_obj = self.parse_message(novo_checkpoint.uidvalidity, uid, partes)
+                if email_obj is not None:
+                    yield uid, email_obj
+
+        return mensagens(), novo_checkpoint
+
+    def fetch_raw_emails(self, checkpoint: Optional[SyncCheckpoint] = None) -> Tuple[Iterator[Tuple[int, List[bytes]]], SyncCheckpoint]:
+        """
+        Busca as mensagens com UID acima do checkpoint (UID SEARCH UID n:*).
+        Sem checkpoint, ou se o UIDVALIDITY mudou, busca a caixa inteira;
+        a idempotência por Message-ID evita duplicados nesse caso.
+
+        Retorna um iterador de (uid, partes) em ordem de UID, com os
+        literais crus de cada mensagem, e o checkpoint ao fim da busca. As
+        mensagens são pedidas em lotes (UID FETCH de IMAP_FETCH_CHUNK_SIZE
+        UIDs por comando) e cada uma é entregue assim que sua resposta
+        termina de chegar, conforme o iterador é consumido. Sem conexão
+        persistente (connect), abre uma só para esta busca e a fecha ao fim
+        da iteração.
+        """
+        persistente = self.connected
+        if persistente:
+            mail, uidvalidity = self._mail, self._uidvalidity_atual
+            # Avisos de EXISTS pendentes ficam cobertos por esta busca
+            mail.response('EXISTS')
         else:
-            try:
-                return msg.get_payload(decode=True).decode()
-            except:
-                return ""
-        return ""
\ No newline at end of file
+            mail, uidvalidity = self._open()
+
+        try:
+            last_uid = 0
+            if checkpoint and checkpoint.uidvalidity == uidvalidity:
+                last_uid = checkpoint.last_uid
+            elif checkpoint:
+                print(f"⚠️ UIDVALIDITY mudou em {self.mailbox}, ressincronizando a caixa")
+
+            status, data = mail.uid('SEARCH', None, f'UID {last_uid + 1}:*')
+            # "n:*" sempre inclui a última mensagem, mesmo com UID <= n
+            uids = sorted(int(uid) for uid in data[0].split() if int(uid) > last_uid)
+        except Exception:
+            if persistente:
+                self.close()
+            else:
+                mail.logout()
+            raise
+
+        novo_checkpoint = SyncCheckpoint(
+            mailbox=self.mailbox,
+            uidvalidity=uidvalidity,
+            last_uid=uids[-1] if uids else last_uid
+        )
+
+        if not uids:
+            if not persistente:
+                mail.logout()
+            return iter(()), novo_checkpoint
+
+        return self._iter_messages(mail, uids, fechar=not persistente), novo_checkpoint
+
+    def wait_for_changes(self, timeout: float, stop: Optional[threading.Event] = None) -> bool:
+        """
+        Bloqueia até o servidor avisar mensagens novas (EXISTS) ou até `timeout`
+        segundos. Usa IDLE quando o servidor anuncia a capacidade; senão
+        aguarda `timeout` (interrompido por `stop`) e faz NOOP. Requer conexão
+        persistente. Retorna True se houve aviso de mensagens novas.
+        """
+        mail = self._mail
+
+        # Avisos que chegaram junto com comandos anteriores
+        if mail.response('EXISTS')[1][0] is not None:
+            return True
+
+        if not self._supports_idle:
+            if (stop or threading.Event()).wait(timeout):
+                return False
+            mail.noop()
+            return mail.response('EXISTS')[1][0] is not None
+
+        tag = mail._new_tag()
+        mail.send(tag + b' IDLE\r\n')
+        resposta = mail.readline()
+        if not resposta.startswith(b'+'):
+            raise imaplib.IMAP4.error(f"IDLE recusado: {resposta!r}")
+
+        novas = False
+        limite = time.monotonic() + timeout
+        try:
+            while not novas:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                # Dados já decifrados no buffer TLS não aparecem para o select
+                pendente = getattr(mail.sock, 'pending', lambda: 0)()
+                if not pendente and not select.select([mail.sock], [], [], restante)[0]:
+                    break
+                linha = mail.readline()
+                if not linha:
+                    raise imaplib.IMAP4.abort("Conexão encerrada durante IDLE")
+                if linha.rstrip().endswith(b'EXISTS'):
+                    novas = True
+        finally:
+            mail.send(b'DONE\r\n')
+
+        # Consome o restante até a resposta com a tag do IDLE
+        while True:
+            linha = mail.readline()
+            if not linha:
+                raise imaplib.IMAP4.abort("Conexão encerrada durante IDLE")
+            if linha.startswith(tag):
+                break
+            if linha.rstrip().endswith(b'EXISTS'):
+                novas = True
+
+        return novas
+
+    def _open(self):
+        """Conecta, autentica e abre a pasta somente leitura; retorna (conexão, UIDVALIDITY)"""
+        mail = imaplib.IMAP4_SSL(self.server, self.port)
+        try:
+            mail.login(self.email, self.password)
+            mail.select(self.folder, readonly=True)
+            return mail, self._uidvalidity(mail)
+        except Exception:
+            mail.logout()
+            raise
+
+    def parse_message(self, uidvalidity: int, uid: int, partes: List[bytes]) -> Optional[Email]:
+        """
+        Converte os literais de uma mensagem em Email (None se não for
+        possível). Não usa a conexão: pode rodar em outra thread ou processo.
+        """
+        try:
+            return self._to_email(self.extractor.extract(partes), uidvalidity, uid)
+        except Exception as e:
+            print(f"Erro ao processar email UID {uid}: {e}")
+            return None
+
+    def __getstate__(self):
+        # Cópias para outros processos (parse em ProcessPoolExecutor) vão sem a conexão
+        state = self.__dict__.copy()
+        state['_mail'] = None
+        return state
+
+    def _iter_messages(self, mail, uids: List[int], fechar: bool = True) -> Iterator[Tuple[int, List[bytes]]]:
+        """Baixa os UIDs em lotes e entrega os literais de cada mensagem"""
+        try:
+            for inicio in range(0, len(uids), self.chunk_size):
+                lote = uids[inicio:inicio + self.chunk_size]
+                yield from self._fetch_stream(mail, self._uid_set(lote), self._fetch_items())
+        finally:
+            if fechar:
+                mail.logout()
+
+    def _fetch_stream(self, mail, uid_set: str, items: str) -> Iterator[Tuple[int, List[bytes]]]:
+        """
+        UID FETCH lendo a resposta do socket linha a linha (em vez de
+        mail.uid, que só retorna com o lote inteiro em memória): cada
+        mensagem sai assim que sua resposta não-tagged termina. Cada resposta
+        é '* <seq> FETCH (... {n}' + literal + ... + ')'; o UID pode vir antes
+        ou depois dos literais. Uma conexão só roda um FETCH por vez: consuma
+        (ou feche) o iterador antes de outro comando.
+        """
+        tag = mail._new_tag()
+        mail.send(tag + b' UID FETCH ' + uid_set.encode() + b' ' + items.encode() + b'\r\n')
+
+        while True:
+            linha = self._readline(mail)
+            if linha.startswith(tag):
+                if not linha[len(tag):].strip().startswith(b'OK'):
+                    raise imaplib.IMAP4.error(f"UID FETCH falhou: {linha!r}")
+                return
+
+            meta, partes = linha, []
+            while True:
+                literal = _LITERAL.search(linha)
+                if not literal:
+                    break
+                partes.append(self._read_literal(mail, int(literal.group(1))))
+                linha = self._readline(mail)
+                meta += linha
+
+            exists = _EXISTS.match(meta)
+            if exists:
+                # Aviso durante o FETCH: fica para wait_for_changes/mail.response
+                mail._append_untagged('EXISTS', exists.group(1))
+                continue
+
+            uid = _FETCH_UID.search(meta)
+            if _FETCH_START.match(meta) and uid and partes:
+                yield int(uid.group(1)), partes
+
+    @staticmethod
+    def _readline(mail) -> bytes:
+        linha = mail.readline()
+        if not linha:
+            raise imaplib.IMAP4.abort("Conexão encerrada durante o FETCH")
+        return linha
+
+    def _read_literal(self, mail, tamanho: int) -> bytes:
+        """
+        Lê um literal de `tamanho` bytes em blocos de _READ_CHUNK, guardando
+        só os primeiros IMAP_MAX_BODY_BYTES: o excedente (servidor que ignora
+        o <0.N>, cabeçalho enorme) é lido e descartado, sem ficar em memória
+        """
+        limite = self.max_body_bytes if self.max_body_bytes > 0 else tamanho
+        blocos = []
+        guardados = 0
+        restante = tamanho
+        while restante:
+            bloco = mail.read(min(restante, _READ_CHUNK))
+            if not bloco:
+                raise imaplib.IMAP4.abort("Conexão encerrada durante o FETCH")
+            restante -= len(bloco)
+            if guardados < limite:
+                bloco = bloco[:limite - guardados]
+                blocos.append(bloco)
+                guardados += len(bloco)
+        return b''.join(blocos)
+
+    def _fetch_items(self) -> str:
+        """
+        Itens do UID FETCH. BODY.PEEK não marca a mensagem como lida; com
+        IMAP_MAX_BODY_BYTES > 0 (padrão 10 MiB) o corpo é truncado no
+        servidor (<0.N>) e cada literal também em _read_literal.
+        """
+        if self.max_body_bytes > 0:
+            return f'(UID BODY.PEEK[HEADER] BODY.PEEK[TEXT]<0.{self.max_body_bytes}>)'
+        return '(UID BODY.PEEK[])'
+
+    @staticmethod
+    def _uid_set(uids: List[int]) -> str:
+        """Compacta UIDs ordenados em faixas: [1, 2, 3, 7] -> '1:3,7'"""
+        faixas = []
+        inicio = anterior = uids[0]
+        for uid in uids[1:]:
+            if uid != anterior + 1:
+                faixas.append(f'{inicio}:{anterior}' if inicio != anterior else str(inicio))
+                inicio = uid
+            anterior = uid
+        faixas.append(f'{inicio}:{anterior}' if inicio != anterior else str(inicio))
+        return ','.join(faixas)
+
+    def _uidvalidity(self, mail) -> int:
+        """UIDVALIDITY informado no SELECT"""
+        status, data = mail.response('UIDVALIDITY')
+        if not data or data[0] is None:
+            status, data = mail.status(self.folder, '(UIDVALIDITY)')
+            return int(data[0].split(b'UIDVALIDITY')[1].strip(b' ()'))
+        return int(data[0])
+
+    def _to_email(self, extraida: ExtractedMessage, uidvalidity: int, uid: int) -> Email:
+        """Converte a mensagem extraída (MimeExtractor) em Email"""
+        msg = extraida.headers
+        # Sem Message-ID, a posição na caixa é estável enquanto o UIDVALIDITY não mudar
+        message_id = (msg.get('Message-ID') or '').strip() or f"<{uidvalidity}.{uid}@{self.mailbox}>"
+
+        return Email(
+            remetente=msg['From'],
+            destinatario=msg['To'],
+            assunto=decode_header_value(msg.get('Subject')) or 'Sem assunto',
+            corpo=extraida.corpo,
+            data=datetime.now(),
+            classificado=False,
+            message_id=message_id,
+            anexos=extraida.anexos
+        )
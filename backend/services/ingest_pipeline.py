@@ -0,0 +1,187 @@
+# services/ingest_pipeline.py
+import queue
+import threading
+import weakref
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from config import Config
+from models.email import Email
+
+# Fim da fila do fetch
+_FIM = object()
+
+
+class IngestPipeline:
+    """
+    Ingestão em estágios com filas limitadas:
+
+        fetch (thread) -> parse (pool de threads ou processos) -> persist (lotes)
+
+    - fetch: consome o iterador de mensagens cruas (IMAP) numa thread e
+      envia cada uma ao pool de parse;
+    - parse: `parse(uid, partes)` roda em paralelo no executor;
+    - persist: `persist(lote)` recebe lotes de até `batch_size` (uid, Email)
+      em ordem de UID, na thread de quem chamou run().
+
+    A fila entre fetch e persist guarda até `queue_size` mensagens em
+    andamento; cheia, o fetch espera (back-pressure), então a memória não
+    cresce quando a gravação é mais lenta que o IMAP. Enquanto um lote é
+    gravado, o próximo já está sendo baixado e convertido.
+
+    stop() drena: o fetch para na mensagem atual, o que já foi baixado é
+    convertido e gravado, e run() retorna normalmente.
+    """
+
+    def __init__(self, parse: Callable[[int, List[bytes]], Optional[Email]],
+                 persist: Callable[[List[Tuple[int, Email]]], None],
+                 executor: Executor, batch_size: int = 200, queue_size: int = 500):
+        self.parse = parse
+        self.persist = persist
+        self.executor = executor
+        self.batch_size = batch_size
+        self._fila: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self._stop_event = threading.Event()
+        self._terminado = threading.Event()
+        self._abortado = threading.Event()
+        self._erro_fetch: Optional[BaseException] = None
+        # Último UID que passou por todos os estágios
+        self.last_uid: Optional[int] = None
+        _ativos.add(self)
+
+    def stop(self):
+        """Para de buscar mensagens novas; o que está na fila ainda é gravado"""
+        self._stop_event.set()
+
+    @property
+    def stopped(self) -> bool:
+        """stop() foi chamado (a execução pode ter parado antes do fim das mensagens)"""
+        return self._stop_event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Aguarda run() terminar; False se o tempo acabou antes"""
+        return self._terminado.wait(timeout)
+
+    def run(self, mensagens: Iterable[Tuple[int, List[bytes]]]):
+        """
+        Processa as mensagens até o fim do iterador ou até stop(). Erros do
+        fetch são propagados depois de gravar o que já havia chegado; um erro
+        do persist interrompe o pipeline e é propagado (last_uid fica no
+        último lote gravado).
+        """
+        fetch = threading.Thread(target=self._fetch, args=(mensagens,), name='ingest-fetch', daemon=True)
+        fetch.start()
+        try:
+            for lote, ultimo_uid in self._lotes():
+                if lote:
+                    self.persist(lote)
+                # Mensagens que não puderam ser convertidas também avançam o checkpoint
+                self.last_uid = ultimo_uid
+        finally:
+            # Ninguém mais lê a fila: libera o fetch se estiver bloqueado nela
+            self._abortado.set()
+            self._esvaziar()
+            fetch.join()
+            self._terminado.set()
+
+        if self._erro_fetch is not None:
+            raise self._erro_fetch
+
+    def _fetch(self, mensagens: Iterable[Tuple[int, List[bytes]]]):
+        iterador = iter(mensagens)
+        try:
+            for uid, partes in iterador:
+                if not self._put((uid, self.executor.submit(self.parse, uid, partes))):
+                    break
+                if self._stop_event.is_set():
+                    break
+        except BaseException as e:
+            self._erro_fetch = e
+        finally:
+            # Fecha a conexão IMAP de quem criou o iterador (generator.close)
+            fechar = getattr(iterador, 'close', None)
+            if fechar:
+                fechar()
+            self._put(_FIM, drenando=True)
+
+    def _put(self, item, drenando: bool = False) -> bool:
+        """
+        Coloca na fila, esperando vaga. Desiste se o persist parou de ler ou,
+        fora do fim da fila, se stop() foi chamado.
+        """
+        while not self._abortado.is_set():
+            if self._stop_event.is_set() and not drenando:
+                return False
+            try:
+                self._fila.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _lotes(self) -> Iterator[Tuple[List[Tuple[int, Email]], int]]:
+        """Resultados do parse em ordem de UID, em lotes com o último UID visto"""
+        lote = []
+        ultimo_uid = None
+        while True:
+            item = self._fila.get()
+            if item is _FIM:
+                break
+            uid, futuro = item
+            ultimo_uid = uid
+            email_obj = self._resultado(uid, futuro)
+            if email_obj is not None:
+                lote.append((uid, email_obj))
+            if len(lote) >= self.batch_size:
+                yield lote, ultimo_uid
+                lote = []
+        if ultimo_uid is not None and (lote or ultimo_uid != self.last_uid):
+            yield lote, ultimo_uid
+
+    @staticmethod
+    def _resultado(uid: int, futuro: Future) -> Optional[Email]:
+        try:
+            return futuro.result()
+        except Exception as e:
+            print(f"Erro ao processar email UID {uid}: {e}")
+            return None
+
+    def _esvaziar(self):
+        """Descarta o que sobrou na fila (persist interrompido por erro)"""
+        while True:
+            try:
+                item = self._fila.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _FIM:
+                item[1].cancel()
+
+
+# Pipelines em execução no processo (drain_pipelines no encerramento)
+_ativos = weakref.WeakSet()
+
+def drain_pipelines(timeout: float = None):
+    """Pede para os pipelines em execução pararem e espera gravarem o que já foi baixado"""
+    timeout = Config.SYNC_DRAIN_TIMEOUT if timeout is None else timeout
+    pipelines = list(_ativos)
+    for pipeline in pipelines:
+        pipeline.stop()
+    for pipeline in pipelines:
+        if not pipeline.wait(timeout):
+            print(f"⚠️ Ingestão não terminou em {timeout}s; o restante fica para o próximo sync")
+
+
+# Singleton - pool de parse compartilhado pelas execuções do sync
+_parse_executor = None
+
+def get_parse_executor() -> Executor:
+    """Pool do estágio de parse conforme SYNC_PARSE_EXECUTOR e SYNC_PARSE_WORKERS"""
+    global _parse_executor
+
+    if _parse_executor is None:
+        workers = Config.SYNC_PARSE_WORKERS or None  # None: padrão do executor (núcleos)
+        if Config.SYNC_PARSE_EXECUTOR == 'process':
+            _parse_executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            _parse_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ingest-parse')
+
+    return _parse_executor
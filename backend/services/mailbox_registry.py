@@ -0,0 +1,33 @@
+# services/mailbox_registry.py
+import json
+import os
+from typing import List
+from config import Config
+from models.mailbox import Mailbox
+from repositories.mailbox_repository import MailboxRepository
+from services.firestore_client import get_firestore_client
+
+
+def load_mailboxes() -> List[Mailbox]:
+    """
+    Caixas ativas conforme MAILBOX_SOURCE:
+    - 'env' (padrão): uma caixa, EMAIL_ADDRESS/EMAIL_PASSWORD;
+    - 'file': lista JSON em MAILBOXES_PATH
+      ([{"endereco": ..., "senha_env": ..., "pasta": "INBOX"}, ...]);
+    - 'firestore': coleção `mailboxes`.
+    Caixas repetidas (mesmo endereço e pasta) contam uma vez.
+    """
+    if Config.MAILBOX_SOURCE == 'file':
+        with open(Config.MAILBOXES_PATH, encoding='utf-8') as f:
+            caixas = [Mailbox.from_dict(data) for data in json.load(f)]
+    elif Config.MAILBOX_SOURCE == 'firestore':
+        caixas = MailboxRepository(get_firestore_client()).find_active()
+    else:
+        endereco = os.getenv('EMAIL_ADDRESS')
+        caixas = [Mailbox(endereco=endereco, senha_env='EMAIL_PASSWORD')] if endereco else []
+
+    unicas = {}
+    for caixa in caixas:
+        if caixa.ativo:
+            unicas.setdefault(caixa.key.lower(), caixa)
+    return list(unicas.values())
@@ -0,0 +1,211 @@
+# services/mailbox_sync_runner.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+from models.mailbox import Mailbox
+from services.imap_service import ImapService
+from services.sync_coordinator import SyncCoordinator
+
+
+class MailboxRemovedError(LookupError):
+    """A caixa saiu do registro (reload) e não é mais sincronizada"""
+
+
+@dataclass
+class _Caixa:
+    """Estado de uma caixa no runner: conexão, coordenador e próximo sync agendado"""
+    mailbox: Mailbox
+    imap: ImapService
+    coordinator: SyncCoordinator
+    proxima: float = 0.0  # time.monotonic()
+    ocupada: bool = False
+
+
+class MailboxSyncRunner:
+    """
+    Sincroniza várias caixas IMAP com um pool de `workers` threads. Cada
+    thread pega a caixa com o sync agendado mais cedo que não esteja em uso;
+    uma caixa lenta ou com erro ocupa só uma thread, e seu intervalo cresce
+    (backoff do SyncCoordinator) sem atrasar as outras.
+
+    Cada caixa tem sua conexão persistente, seu checkpoint (SyncState por
+    ImapService.mailbox) e seu lease: com vários processos, cada caixa é
+    sincronizada por um de cada vez, e as caixas se dividem entre eles.
+    """
+
+    def __init__(self, load: Callable[[], List[Mailbox]], new_imap: Callable[[Mailbox], ImapService],
+                 sync: Callable[[ImapService], List], new_coordinator: Callable[[Mailbox], SyncCoordinator],
+                 workers: int = 4, reload_every: float = 60):
+        self.load = load  # registro das caixas (load_mailboxes)
+        self.new_imap = new_imap
+        self.sync = sync  # sincroniza a caixa do ImapService, retorna os emails gravados
+        self.new_coordinator = new_coordinator
+        self.workers = max(1, workers)
+        self.reload_every = reload_every
+        self._caixas: Dict[str, _Caixa] = {}
+        self._cond = threading.Condition()
+        self._recarregar_em = 0.0
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def reload(self) -> List[Mailbox]:
+        """Relê o registro: caixas novas entram já agendadas, removidas saem"""
+        mailboxes = self.load()
+        with self._cond:
+            atuais = {mailbox.key.lower(): mailbox for mailbox in mailboxes}
+            for key in list(self._caixas):
+                if key not in atuais and not self._caixas[key].ocupada:
+                    self._caixas.pop(key).imap.close()
+            for key, mailbox in atuais.items():
+                caixa = self._caixas.get(key)
+                if caixa is None or (caixa.mailbox != mailbox and not caixa.ocupada):
+                    if caixa is not None:
+                        caixa.imap.close()
+                    coordinator = caixa.coordinator if caixa else self.new_coordinator(mailbox)
+                    self._caixas[key] = _Caixa(mailbox, self.new_imap(mailbox), coordinator)
+            self._recarregar_em = time.monotonic() + self.reload_every
+            self._cond.notify_all()
+        return mailboxes
+
+    def start(self):
+        """Inicia as threads do polling"""
+        self.reload()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f'mailbox-sync-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Para as threads (o sync em andamento de cada uma termina antes)"""
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def run_once(self, key: str, sync: Callable[[], List], origem: str = 'agendado') -> Optional[List]:
+        """
+        Sync de uma caixa pelo seu coordenador (None se já havia um em andamento).
+        Levanta MailboxRemovedError se a caixa saiu do registro.
+        """
+        with self._cond:
+            caixa = self._caixas.get(key.lower())
+        if caixa is None:
+            raise MailboxRemovedError(f"Caixa {key} não está no registro")
+        return caixa.coordinator.run_once(sync, origem)
+
+    def sync_all(self, origem: str = 'manual', on_result: Optional[Callable[[str, dict], None]] = None,
+                 reload: bool = True) -> Dict[str, dict]:
+        """
+        Sincroniza todas as caixas agora, em paralelo (até `workers` por vez).
+        Retorna por caixa {'status': 'ok'|'em_andamento'|'erro', 'emails'|'erro'};
+        `on_result(caixa, resultado)` é chamado conforme cada caixa termina.
+        """
+        if reload:
+            self.reload()
+        with self._cond:
+            caixas = list(self._caixas.values())
+
+        def sincronizar(caixa: _Caixa) -> dict:
+            resultado = self._sync_now(caixa, origem)
+            if on_result is not None:
+                on_result(caixa.mailbox.key, resultado)
+            return resultado
+
+        if not caixas:
+            return {}
+        with ThreadPoolExecutor(min(self.workers, len(caixas))) as executor:
+            resultados = executor.map(sincronizar, caixas)
+            return {caixa.mailbox.key: resultado for caixa, resultado in zip(caixas, resultados)}
+
+    def _sync_now(self, caixa: _Caixa, origem: str) -> dict:
+        # Conexão própria: a persistente pode estar em uso pelo polling
+        imap = self.new_imap(caixa.mailbox)
+        try:
+            salvos = caixa.coordinator.run_once(lambda: self.sync(imap), origem)
+        except Exception as e:
+            print(f"❌ Erro no sync de {caixa.mailbox.key}: {e}")
+            return {'status': 'erro', 'erro': str(e)}
+        finally:
+            imap.close()
+        if salvos is None:
+            return {'status': 'em_andamento'}
+        return {'status': 'ok', 'emails': salvos}
+
+    def report(self) -> List[dict]:
+        """Métricas e atraso (segundos desde o último sync sem erro) por caixa"""
+        agora = time.monotonic()
+        with self._cond:
+            caixas = list(self._caixas.values())
+        return [{
+            'caixa': caixa.mailbox.key,
+            'em_andamento': caixa.ocupada,
+            'proximo_sync_em': None if caixa.ocupada else round(max(0.0, caixa.proxima - agora), 1),
+            **caixa.coordinator.metrics.to_dict(),
+        } for caixa in caixas]
+
+    def _worker(self):
+        while not self._stop_event.is_set():
+            caixa = self._next_due()
+            if caixa is None:
+                continue
+            try:
+                self._sync(caixa)
+            finally:
+                with self._cond:
+                    caixa.proxima = time.monotonic() + caixa.coordinator.next_wait()
+                    caixa.ocupada = False
+                    self._cond.notify_all()
+
+    def _sync(self, caixa: _Caixa):
+        """Um sync da caixa na conexão persistente; erros ficam nesta caixa"""
+        imap = caixa.imap
+        try:
+            salvos = caixa.coordinator.run_once(lambda: self._sync_connected(imap))
+        except Exception as e:
+            imap.close()
+            print(f"❌ Erro no sync de {caixa.mailbox.key}: {e}; "
+                  f"próxima tentativa em {caixa.coordinator.metrics.intervalo:.0f}s")
+            return
+        if salvos:
+            print(f"✅ {len(salvos)} emails sincronizados em {caixa.mailbox.key}")
+
+    def _sync_connected(self, imap: ImapService) -> List:
+        if not imap.connected:
+            imap.connect()
+        return self.sync(imap)
+
+    def _next_due(self) -> Optional[_Caixa]:
+        """Espera a próxima caixa livre com sync vencido e a marca como ocupada"""
+        with self._cond:
+            while not self._stop_event.is_set():
+                agora = time.monotonic()
+                if agora >= self._recarregar_em:
+                    self._reload_unlocked()
+                    continue
+
+                prazos = [self._recarregar_em]
+                livres = [caixa for caixa in self._caixas.values() if not caixa.ocupada]
+                if livres:
+                    caixa = min(livres, key=lambda c: c.proxima)
+                    if caixa.proxima <= agora:
+                        caixa.ocupada = True
+                        return caixa
+                    prazos.append(caixa.proxima)
+                espera = min(prazos) - agora
+                # Infinito: outra thread está relendo o registro e notifica ao fim
+                self._cond.wait(espera if espera != float('inf') else None)
+        return None
+
+    def _reload_unlocked(self):
+        """Relê o registro fora do lock (chamado com o lock); as outras threads seguem"""
+        self._recarregar_em = float('inf')
+        self._cond.release()
+        try:
+            self.reload()
+        except Exception as e:
+            print(f"⚠️ Registro de caixas não recarregado: {e}")
+        finally:
+            self._cond.acquire()
+        if self._recarregar_em == float('inf'):
+            self._recarregar_em = time.monotonic() + self.reload_every
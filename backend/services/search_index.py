@@ -0,0 +1,179 @@
+# services/search_index.py
+import os
+import sqlite3
+import threading
+from typing import Iterable, List, Optional, Tuple
+from config import Config
+from utils.text_normalize import normalize_text, tokenize
+
+
+class SearchIndex:
+    """
+    Índice invertido de assunto/corpo em SQLite FTS5 (arquivo local).
+    O texto entra já normalizado (sem acentos, minúsculo) e a busca usa
+    os mesmos tokens, então 'licitacao' encontra 'Licitação'.
+    Ranking por BM25 com peso maior para o assunto.
+    """
+
+    # Pesos do bm25 por coluna: assunto, corpo
+    WEIGHTS = (5.0, 1.0)
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # Uma conexão compartilhada pelas threads, serializada pelo lock
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            # email_id -> rowid do FTS; localizar um documento na tabela FTS
+            # por coluna seria varredura completa
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS emails_docs ('
+                'rowid INTEGER PRIMARY KEY AUTOINCREMENT, email_id TEXT NOT NULL UNIQUE)'
+            )
+            # prefix='2 3': buscas por prefixo curto (digitação) sem varrer o vocabulário
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS emails_fts USING fts5("
+                "assunto, corpo, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+            # Coluna `rank` = bm25 com os pesos; ORDER BY rank LIMIT n deixa o
+            # FTS5 manter só os n melhores em vez de ordenar todos os resultados
+            self._conn.execute(
+                "INSERT INTO emails_fts (emails_fts, rank) VALUES ('rank', ?)",
+                (f'bm25({", ".join(str(w) for w in self.WEIGHTS)})',)
+            )
+            self._conn.commit()
+        return self._conn
+
+    def add(self, email_id: str, assunto: Optional[str], corpo: Optional[str]):
+        """Indexa (ou reindexa) um email"""
+        self.add_many([(email_id, assunto, corpo)])
+
+    def add_many(self, docs: Iterable[Tuple[str, Optional[str], Optional[str]]]):
+        """Indexa vários emails em uma transação"""
+        with self._lock, self.conn:
+            for email_id, assunto, corpo in docs:
+                rowid = self._delete(email_id)
+                if rowid is None:
+                    rowid = self.conn.execute(
+                        'INSERT INTO emails_docs (email_id) VALUES (?)', (email_id,)
+                    ).lastrowid
+                self.conn.execute(
+                    'INSERT INTO emails_fts (rowid, assunto, corpo) VALUES (?, ?, ?)',
+                    (rowid, normalize_text(assunto), normalize_text(corpo))
+                )
+
+    def update(self, email_id: str, assunto: Optional[str] = None, corpo: Optional[str] = None):
+        """
+        Reindexa só o texto alterado (None mantém o indexado), sem precisar
+        buscar o outro campo no Firestore
+        """
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                'SELECT f.assunto, f.corpo FROM emails_docs AS d JOIN emails_fts AS f ON f.rowid = d.rowid '
+                'WHERE d.email_id = ?', (email_id,)
+            ).fetchone()
+            # Texto indexado já está normalizado; normalizar de novo não o altera
+            atual_assunto, atual_corpo = row if row else ('', '')
+        self.add(email_id, atual_assunto if assunto is None else assunto, atual_corpo if corpo is None else corpo)
+
+    def remove(self, email_id: str):
+        with self._lock, self.conn:
+            if self._delete(email_id) is not None:
+                self.conn.execute('DELETE FROM emails_docs WHERE email_id = ?', (email_id,))
+
+    def clear(self):
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM emails_fts')
+            self.conn.execute('DELETE FROM emails_docs')
+
+    def _delete(self, email_id: str) -> Optional[int]:
+        """Remove o texto indexado do email; retorna o rowid (None se não indexado)"""
+        row = self.conn.execute('SELECT rowid FROM emails_docs WHERE email_id = ?', (email_id,)).fetchone()
+        if row is None:
+            return None
+        self.conn.execute('DELETE FROM emails_fts WHERE rowid = ?', (row[0],))
+        return row[0]
+
+    def search(self, q: str, limit: int, cursor: Optional[str] = None) -> Tuple[List[Tuple[str, float]], Optional[str]]:
+        """
+        Busca todos os termos de `q` (o último também como prefixo).
+        Retorna ([(email_id, score)], próximo cursor); score maior = mais relevante.
+        
+        Calcular o bm25 custa proporcional ao número de resultados, então
+        termos muito comuns são ranqueados só entre os SEARCH_RANK_WINDOW
+        emails indexados mais recentemente. O limite (rowid mínimo) é fixado
+        na primeira página e segue no cursor, para as páginas seguintes
+        ranquearem o mesmo conjunto.
+        """
+        match = self.match_expression(q)
+        if not match:
+            return [], None
+        offset, min_rowid = self._decode_cursor(cursor)
+
+        with self._lock:
+            if min_rowid is None:
+                row = self.conn.execute(
+                    'SELECT rowid FROM emails_fts WHERE emails_fts MATCH ? ORDER BY rowid DESC LIMIT 1 OFFSET ?',
+                    (match, Config.SEARCH_RANK_WINDOW - 1)
+                ).fetchone()
+                min_rowid = row[0] if row else 0
+
+            rows = self.conn.execute(
+                'SELECT d.email_id, f.rank FROM ('
+                '  SELECT rowid, rank FROM emails_fts '
+                '  WHERE emails_fts MATCH ? AND rowid >= ? ORDER BY rank LIMIT ? OFFSET ?'
+                ') AS f JOIN emails_docs AS d ON d.rowid = f.rowid ORDER BY f.rank',
+                (match, min_rowid, limit + 1, offset)
+            ).fetchall()
+
+        # bm25 do SQLite é negativo (menor = melhor)
+        hits = [(email_id, -rank) for email_id, rank in rows[:limit]]
+        next_cursor = f"{offset + limit}:{min_rowid}" if len(rows) > limit else None
+        return hits, next_cursor
+
+    @staticmethod
+    def _decode_cursor(cursor: Optional[str]) -> Tuple[int, Optional[int]]:
+        """'offset:rowid_minimo' -> (offset, rowid_minimo); levanta ValueError se inválido"""
+        if not cursor:
+            return 0, None
+        try:
+            offset, min_rowid = (int(parte) for parte in cursor.split(':'))
+        except ValueError:
+            raise ValueError("Cursor inválido")
+        if offset < 0:
+            raise ValueError("Cursor inválido")
+        return offset, min_rowid
+
+    @staticmethod
+    def match_expression(q: str) -> str:
+        """Converte a consulta do usuário em expressão MATCH segura (só tokens)"""
+        tokens = tokenize(q)
+        if not tokens:
+            return ''
+        termos = [f'"{token}"' for token in tokens[:-1]]
+        termos.append(f'"{tokens[-1]}"*')
+        return ' AND '.join(termos)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute('SELECT count(*) FROM emails_fts').fetchone()[0]
+
+
+# Singleton - um índice por processo
+_search_index = None
+
+def get_search_index() -> SearchIndex:
+    """Retorna o índice de busca configurado (SEARCH_INDEX_PATH)"""
+    global _search_index
+
+    if _search_index is None:
+        _search_index = SearchIndex(Config.SEARCH_INDEX_PATH)
+
+    return _search_index
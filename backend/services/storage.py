@@ -0,0 +1,54 @@
+# services/storage.py
+from config import Config
+from repositories.interfaces import EmailStore, FuncionarioStore, SyncStateStore
+from repositories.email_repository import EmailRepository
+from repositories.funcionario_repository import FuncionarioRepository
+from repositories.sync_state_repository import SyncStateRepository
+from repositories.sqlite_database import SqliteDatabase
+from repositories.sqlite_email_repository import SqliteEmailRepository
+from repositories.sqlite_funcionario_repository import SqliteFuncionarioRepository
+from repositories.sqlite_sync_state_repository import SqliteSyncStateRepository
+from services.firestore_client import get_firestore_client
+
+STORAGE_BACKENDS = ('firestore', 'sqlite', 'memory')
+
+# Singleton - banco dos backends sqlite/memory (memory: some ao fim do processo)
+_sqlite_database = None
+
+def get_sqlite_database() -> SqliteDatabase:
+    """Banco SQLite do processo: STORAGE_SQLITE_PATH, ou :memory: com STORAGE_BACKEND=memory"""
+    global _sqlite_database
+
+    if _sqlite_database is None:
+        path = ':memory:' if Config.STORAGE_BACKEND == 'memory' else Config.STORAGE_SQLITE_PATH
+        _sqlite_database = SqliteDatabase(path)
+        print(f"✅ Armazenamento local ({Config.STORAGE_BACKEND}): {path}")
+
+    return _sqlite_database
+
+def _local() -> bool:
+    """True para os backends SQLite (sem conexão com o Firestore)"""
+    if Config.STORAGE_BACKEND not in STORAGE_BACKENDS:
+        raise ValueError(f"STORAGE_BACKEND deve ser um de {', '.join(STORAGE_BACKENDS)}")
+    return Config.STORAGE_BACKEND != 'firestore'
+
+def get_email_repository() -> EmailStore:
+    """Repositório de emails do STORAGE_BACKEND configurado"""
+    if _local():
+        return SqliteEmailRepository(get_sqlite_database())
+
+    return EmailRepository(get_firestore_client())
+
+def get_funcionario_repository() -> FuncionarioStore:
+    """Repositório de funcionários do STORAGE_BACKEND configurado"""
+    if _local():
+        return SqliteFuncionarioRepository(get_sqlite_database())
+
+    return FuncionarioRepository(get_firestore_client())
+
+def get_sync_state_repository() -> SyncStateStore:
+    """Checkpoints do sync no STORAGE_BACKEND configurado"""
+    if _local():
+        return SqliteSyncStateRepository(get_sqlite_database())
+
+    return SyncStateRepository(get_firestore_client())
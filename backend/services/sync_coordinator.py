@@ -0,0 +1,165 @@
+# services/sync_coordinator.py
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Deque, List, Optional
+
+
+@dataclass
+class SyncRun:
+    """Uma execução do sync"""
+    iniciado_em: datetime
+    duracao: float = 0.0  # segundos
+    novos: int = 0
+    erro: Optional[str] = None
+    origem: str = 'agendado'  # 'agendado', 'idle' ou 'manual'
+
+    def to_dict(self) -> dict:
+        return {
+            'iniciado_em': self.iniciado_em.isoformat(),
+            'duracao': round(self.duracao, 3),
+            'novos': self.novos,
+            'erro': self.erro,
+            'origem': self.origem,
+        }
+
+
+@dataclass
+class SyncMetrics:
+    """Contadores do sync de uma caixa neste processo"""
+    execucoes: int = 0
+    erros: int = 0
+    erros_seguidos: int = 0
+    # Execuções puladas porque outro processo/thread já sincronizava
+    ignoradas: int = 0
+    emails: int = 0
+    intervalo: float = 0.0  # próximo intervalo do polling (sem jitter)
+    ultimo_sucesso: Optional[datetime] = None
+    ultimas: Deque[SyncRun] = field(default_factory=lambda: deque(maxlen=20))
+
+    @property
+    def atraso(self) -> Optional[float]:
+        """Segundos desde o último sync concluído sem erro (None se nunca houve)"""
+        if self.ultimo_sucesso is None:
+            return None
+        return (datetime.now(timezone.utc) - self.ultimo_sucesso).total_seconds()
+
+    def to_dict(self) -> dict:
+        ultima = self.ultimas[-1] if self.ultimas else None
+        atraso = self.atraso
+        return {
+            'execucoes': self.execucoes,
+            'erros': self.erros,
+            'erros_seguidos': self.erros_seguidos,
+            'ignoradas': self.ignoradas,
+            'emails': self.emails,
+            'intervalo': round(self.intervalo, 1),
+            'ultimo_sucesso': self.ultimo_sucesso.isoformat() if self.ultimo_sucesso else None,
+            'atraso': round(atraso, 1) if atraso is not None else None,
+            'ultima': ultima.to_dict() if ultima else None,
+            'ultimas': [run.to_dict() for run in self.ultimas],
+        }
+
+
+class SyncCoordinator:
+    """
+    Garante um único sync por vez de uma caixa: um lock entre as threads do
+    processo (polling, IDLE, trigger manual) e um lease entre processos
+    (FileLease/FirestoreLease). Quem não consegue o lease pula a execução.
+
+    Mantém também o intervalo adaptativo do polling: volta ao mínimo quando
+    chegam emails, cresce 1,5x a cada execução sem novidades e 2x após
+    erro, até o máximo; next_wait() aplica jitter para processos diferentes
+    não acordarem juntos.
+    """
+
+    def __init__(self, lease, min_interval: float = 5, max_interval: float = 300, jitter: float = 0.2,
+                 renew_every: Optional[float] = None):
+        self.lease = lease
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        # Renovação do lease durante execuções longas (FirestoreLease expira)
+        self.renew_every = renew_every
+        self.metrics = SyncMetrics(intervalo=min_interval)
+        self._running = threading.Lock()
+
+    def next_wait(self) -> float:
+        """Espera até o próximo sync agendado: intervalo atual com jitter"""
+        return self.metrics.intervalo * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def run_once(self, sync: Callable[[], List], origem: str = 'agendado') -> Optional[List]:
+        """
+        Executa `sync` se nenhum outro sync estiver em andamento (neste ou em
+        outro processo). Retorna os emails gravados, ou None se foi pulado.
+        Erros do sync são registrados nas métricas e propagados.
+        """
+        if not self._running.acquire(blocking=False):
+            self.metrics.ignoradas += 1
+            return None
+        try:
+            if not self.lease.acquire():
+                self.metrics.ignoradas += 1
+                return None
+            try:
+                return self._run(sync, origem)
+            finally:
+                self.lease.release()
+        finally:
+            self._running.release()
+
+    def _run(self, sync: Callable[[], List], origem: str) -> List:
+        run = SyncRun(iniciado_em=datetime.now(timezone.utc), origem=origem)
+        inicio = time.monotonic()
+        parar_renovacao = self._start_renewal()
+        try:
+            salvos = sync()
+            run.novos = len(salvos)
+            return salvos
+        except Exception as e:
+            run.erro = str(e)
+            raise
+        finally:
+            parar_renovacao.set()
+            run.duracao = time.monotonic() - inicio
+            self._record(run)
+
+    def _record(self, run: SyncRun):
+        metrics = self.metrics
+        metrics.execucoes += 1
+        metrics.emails += run.novos
+        metrics.ultimas.append(run)
+
+        if run.erro:
+            metrics.erros += 1
+            metrics.erros_seguidos += 1
+            metrics.intervalo = min(self.max_interval, metrics.intervalo * 2)
+            return
+
+        metrics.erros_seguidos = 0
+        metrics.ultimo_sucesso = datetime.now(timezone.utc)
+        if run.novos:
+            # Rajada: volta ao mínimo enquanto houver emails chegando
+            metrics.intervalo = self.min_interval
+        else:
+            metrics.intervalo = min(self.max_interval, metrics.intervalo * 1.5)
+
+    def _start_renewal(self) -> threading.Event:
+        """Renova o lease a cada `renew_every` segundos até o evento retornado ser setado"""
+        parar = threading.Event()
+        if not self.renew_every:
+            return parar
+
+        def renovar():
+            while not parar.wait(self.renew_every):
+                try:
+                    if not self.lease.renew():
+                        print("⚠️ Lease do sync perdido durante a execução")
+                except Exception as e:
+                    print(f"⚠️ Falha ao renovar o lease do sync: {e}")
+
+        threading.Thread(target=renovar, name='sync-lease-renewal', daemon=True).start()
+        return parar
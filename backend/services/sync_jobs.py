@@ -0,0 +1,140 @@
+# services/sync_jobs.py
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+
+@dataclass
+class SyncJob:
+    """Sync manual em segundo plano (POST /api/sync/trigger)"""
+    id: str
+    status: str = 'na_fila'  # 'na_fila', 'executando', 'concluido' ou 'falhou'
+    criado_em: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    iniciado_em: Optional[datetime] = None
+    concluido_em: Optional[datetime] = None
+    # Triggers atendidos por este job (repetições são mescladas)
+    gatilhos: int = 1
+    # Passadas por todas as caixas (trigger durante a execução pede mais uma)
+    passadas: int = 0
+    emails: int = 0
+    # Por caixa: {'status': 'na_fila'|'ok'|'em_andamento'|'erro', 'novos', 'erro'}
+    caixas: Dict[str, dict] = field(default_factory=dict)
+    erro: Optional[str] = None
+    repetir: bool = False
+
+    def to_dict(self) -> dict:
+        """Dados do job para a API (use SyncJobManager.snapshot com o job em execução)"""
+        concluidas = [c for c in self.caixas.values() if c['status'] != 'na_fila']
+        return {
+            'id': self.id,
+            'status': self.status,
+            'criado_em': self.criado_em.isoformat(),
+            'iniciado_em': self.iniciado_em.isoformat() if self.iniciado_em else None,
+            'concluido_em': self.concluido_em.isoformat() if self.concluido_em else None,
+            'gatilhos': self.gatilhos,
+            'passadas': self.passadas,
+            'emails': self.emails,
+            'total_caixas': len(self.caixas),
+            'caixas_concluidas': len(concluidas),
+            'erros': sum(1 for c in self.caixas.values() if c['status'] == 'erro'),
+            'caixas': {caixa: dict(resultado) for caixa, resultado in self.caixas.items()},
+            'erro': self.erro,
+        }
+
+
+class SyncJobManager:
+    """
+    Fila de syncs manuais num executor de uma thread: trigger() devolve o
+    job na hora e a sincronização roda em segundo plano. Enquanto houver um
+    job na fila ou executando, novos triggers são mesclados nele; se chegam
+    durante a execução, o job faz mais uma passada ao fim (emails recebidos
+    depois do início não ficam para o próximo sync agendado).
+    Jobs ficam na memória do processo (os últimos `history`).
+    """
+
+    def __init__(self, runner, history: int = 50):
+        self.runner = runner  # MailboxSyncRunner
+        self.history = history
+        self._jobs: 'OrderedDict[str, SyncJob]' = OrderedDict()
+        self._atual: Optional[SyncJob] = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sync-job')
+
+    def trigger(self) -> Tuple[SyncJob, bool]:
+        """Enfileira um sync de todas as caixas; retorna (job, criado)"""
+        with self._lock:
+            atual = self._atual
+            if atual is not None:
+                atual.gatilhos += 1
+                if atual.status == 'executando':
+                    atual.repetir = True
+                return atual, False
+
+            job = SyncJob(id=uuid.uuid4().hex)
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.history:
+                self._jobs.popitem(last=False)
+            self._atual = job
+
+        self._executor.submit(self._executar, job)
+        return job, True
+
+    def get(self, job_id: str) -> Optional[SyncJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def snapshot(self, job_id: str) -> Optional[dict]:
+        """to_dict do job montado com o lock (o worker altera `caixas` durante o sync)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job is not None else None
+
+    def _executar(self, job: SyncJob):
+        with self._lock:
+            job.status = 'executando'
+            job.iniciado_em = datetime.now(timezone.utc)
+        try:
+            while True:
+                self._passada(job)
+                with self._lock:
+                    # Conclui e libera na mesma seção crítica: um trigger
+                    # depois disso abre outro job, não fica num job encerrado
+                    if not job.repetir:
+                        self._encerrar(job, 'concluido')
+                        return
+        except Exception as e:
+            print(f"❌ Erro no job de sync {job.id}: {e}")
+            with self._lock:
+                job.erro = str(e)
+                self._encerrar(job, 'falhou')
+
+    def _encerrar(self, job: SyncJob, status: str):
+        """Marca o job como encerrado e libera a vaga (com o lock)"""
+        job.status = status
+        job.concluido_em = datetime.now(timezone.utc)
+        self._atual = None
+
+    def _passada(self, job: SyncJob):
+        mailboxes = self.runner.reload()
+        with self._lock:
+            job.repetir = False
+            job.passadas += 1
+            for mailbox in mailboxes:
+                anterior = job.caixas.get(mailbox.key, {})
+                job.caixas[mailbox.key] = {'status': 'na_fila', 'novos': anterior.get('novos', 0), 'erro': None}
+
+        def progresso(caixa: str, resultado: dict):
+            novos = len(resultado.get('emails', []))
+            with self._lock:
+                job.emails += novos
+                job.caixas[caixa] = {
+                    'status': resultado['status'],
+                    'novos': job.caixas.get(caixa, {}).get('novos', 0) + novos,
+                    'erro': resultado.get('erro'),
+                }
+
+        self.runner.sync_all(origem='manual', on_result=progresso, reload=False)
@@ -0,0 +1,116 @@
+# services/sync_lease.py
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from google.cloud import firestore
+from config import Config
+from services.firestore_client import get_firestore_client
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem flock, só o lease do Firestore coordena
+    fcntl = None
+
+
+def _owner_id() -> str:
+    """Identifica o processo dono do lease (host:pid:aleatório)"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class FileLease:
+    """
+    Lease entre processos da mesma máquina (vários workers WSGI) por flock
+    num arquivo. O sistema operacional solta o lock se o processo morrer.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.owner = _owner_id()
+        self._fd = None
+
+    def acquire(self) -> bool:
+        """Tenta tomar o lease sem bloquear; True se conseguiu"""
+        if self._fd is not None:
+            return True
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+        # Dono atual no arquivo, para diagnóstico
+        os.ftruncate(fd, 0)
+        os.write(fd, self.owner.encode())
+        self._fd = fd
+        return True
+
+    def renew(self) -> bool:
+        """flock não expira: renovar só confirma que ainda é o dono"""
+        return self._fd is not None
+
+    def release(self):
+        fd, self._fd = self._fd, None
+        if fd is not None:
+            os.close(fd)  # Fechar o descritor solta o flock
+
+
+class FirestoreLease:
+    """
+    Lease entre máquinas num documento do Firestore (leases/<name>: {dono, expira_em}),
+    tomado em transação. Expira após `ttl` segundos sem renovação, para
+    um processo que morreu não travar o sync; quem o detém renova durante
+    execuções longas. Supõe relógios sincronizados (NTP) entre as máquinas.
+    """
+
+    def __init__(self, db: firestore.Client, name: str, ttl: float = 120):
+        self.db = db
+        self.ref = db.collection('leases').document(name)
+        self.ttl = ttl
+        self.owner = _owner_id()
+
+    def acquire(self) -> bool:
+        """Toma o lease se estiver livre, expirado ou já for deste processo"""
+        @firestore.transactional
+        def tomar(transaction) -> bool:
+            snapshot = self.ref.get(transaction=transaction)
+            agora = datetime.now(timezone.utc)
+            if snapshot.exists:
+                atual = snapshot.to_dict()
+                expira_em = atual.get('expira_em')
+                if atual.get('dono') != self.owner and expira_em and expira_em > agora:
+                    return False
+            transaction.set(self.ref, {
+                'dono': self.owner,
+                'expira_em': agora + timedelta(seconds=self.ttl),
+            })
+            return True
+
+        return tomar(self.db.transaction())
+
+    def renew(self) -> bool:
+        """Estende o prazo; False se o lease expirou e outro processo o tomou"""
+        return self.acquire()
+
+    def release(self):
+        """Libera o lease, se ainda for o dono"""
+        @firestore.transactional
+        def soltar(transaction):
+            snapshot = self.ref.get(transaction=transaction)
+            if snapshot.exists and snapshot.to_dict().get('dono') == self.owner:
+                transaction.delete(self.ref)
+
+        soltar(self.db.transaction())
+
+
+def new_sync_lease(nome: str):
+    """
+    Lease do sync da caixa `nome` conforme SYNC_LEASE: 'file' (um arquivo
+    por caixa em SYNC_LEASE_DIR) ou 'firestore' (documento leases/<nome>)
+    """
+    nome = nome.lower().replace('/', '_')
+    if Config.SYNC_LEASE == 'firestore':
+        return FirestoreLease(get_firestore_client(), name=nome, ttl=Config.SYNC_LEASE_TTL)
+    return FileLease(os.path.join(Config.SYNC_LEASE_DIR, f'{nome}.lock'))
@@ -0,0 +1,101 @@
+# services/sync_service.py
+from services.imap_service import ImapService
+from services.email_service import EmailService
+from repositories.interfaces import SyncStateStore
+from models.email import Email
+from models.sync_checkpoint import SyncCheckpoint
+from services.ingest_pipeline import IngestPipeline, get_parse_executor
+from concurrent.futures import Executor
+from functools import partial
+from config import Config
+from typing import List, Optional, Tuple
+
+class SyncService:
+    """Sincronização incremental IMAP -> Firestore com checkpoint por UID"""
+    
+    def __init__(self, imap: ImapService, email_service: EmailService, sync_state: SyncStateStore,
+                 batch_size: int = 200, executor: Optional[Executor] = None, queue_size: Optional[int] = None):
+        self.imap = imap
+        self.email_service = email_service
+        self.sync_state = sync_state
+        self.batch_size = batch_size
+        # Pool do parse (padrão: get_parse_executor) e mensagens em andamento no pipeline
+        self.executor = executor
+        self.queue_size = queue_size or Config.SYNC_QUEUE_SIZE
+        self._pipeline: Optional[IngestPipeline] = None
+    
+    def sync(self) -> List[Email]:
+        """
+        Busca as mensagens novas e as grava em lotes de `batch_size` por um
+        IngestPipeline: o download (IMAP), a conversão MIME (pool de parse) e
+        a gravação (Firestore) correm ao mesmo tempo. Avança o checkpoint até
+        a última mensagem gravada. Se um lote falhar, o checkpoint para antes
+        dele e a próxima execução tenta de novo; reenvios já gravados são
+        ignorados.
+        """
+        checkpoint = self.sync_state.get(self.imap.mailbox)
+        mensagens, novo_checkpoint = self.imap.fetch_raw_emails(checkpoint)
+        
+        salvos = []
+        duplicados = 0
+        falha_em = None
+        
+        def persist(lote: List[Tuple[int, Email]]):
+            nonlocal duplicados, falha_em
+            try:
+                criados, repetidos = self.email_service.create_emails([email for _, email in lote])
+            except Exception as e:
+                falha_em = lote[0][0]
+                print(f"❌ Erro ao gravar lote a partir do UID {falha_em}: {e}")
+                raise
+            salvos.extend(criados)
+            duplicados += len(repetidos)
+        
+        pipeline = IngestPipeline(
+            parse=partial(self.imap.parse_message, novo_checkpoint.uidvalidity),
+            persist=persist,
+            executor=self.executor or get_parse_executor(),
+            batch_size=self.batch_size,
+            queue_size=self.queue_size
+        )
+        self._pipeline = pipeline
+        erro_fetch = None
+        try:
+            pipeline.run(mensagens)
+        except Exception as e:
+            if falha_em is None:
+                # Falha no IMAP: grava o checkpoint do que chegou e propaga
+                erro_fetch = e
+        finally:
+            self._pipeline = None
+        
+        if falha_em is not None:
+            last_uid = falha_em - 1
+        elif erro_fetch is not None or pipeline.stopped:
+            last_uid = pipeline.last_uid
+        else:
+            last_uid = novo_checkpoint.last_uid
+        
+        if last_uid is not None:
+            novo_checkpoint = SyncCheckpoint(
+                mailbox=novo_checkpoint.mailbox,
+                uidvalidity=novo_checkpoint.uidvalidity,
+                last_uid=last_uid
+            )
+            if checkpoint is None or novo_checkpoint != checkpoint:
+                self.sync_state.save(novo_checkpoint)
+        
+        if duplicados:
+            print(f"↩️ {duplicados} emails já sincronizados foram ignorados")
+        
+        if erro_fetch is not None:
+            raise erro_fetch
+        
+        return salvos
+    
+    def stop(self):
+        """Encerramento: para de baixar e grava o que já foi baixado (sync() retorna em seguida)"""
+        pipeline = self._pipeline
+        if pipeline is not None:
+            pipeline.stop()
+    
@@ -0,0 +1,44 @@
+# test_body_store.py
+import os
+import pytest
+from datetime import datetime
+from config import Config
+from services.body_store import LocalBodyStore, BodyNotFoundError
+from services.email_service import EmailService
+from services.search_index import SearchIndex
+
+
+class FakeEmailRepository:
+    def create(self, email):
+        email.id = 'novo'
+        return email
+
+
+def test_put_deduplica_e_devolve_conteudo(tmp_path):
+    store = LocalBodyStore(str(tmp_path))
+    ref = store.put(b'conteudo ' * 1000)
+
+    assert store.put(b'conteudo ' * 1000) == ref
+    assert store.get(ref) == b'conteudo ' * 1000
+    arquivos = [f for _, _, files in os.walk(tmp_path) for f in files]
+    assert len(arquivos) == 1
+    assert os.path.getsize(os.path.join(tmp_path, ref[7:9], arquivos[0])) < 100
+
+
+def test_referencia_invalida_ou_ausente(tmp_path):
+    store = LocalBodyStore(str(tmp_path))
+    with pytest.raises(ValueError):
+        store.get('sha256:../../etc/passwd')
+    with pytest.raises(BodyNotFoundError):
+        store.get('sha256:' + '0' * 64)
+
+
+def test_corpo_grande_sai_do_documento(tmp_path):
+    service = EmailService(FakeEmailRepository(), None, LocalBodyStore(str(tmp_path)), SearchIndex(':memory:'))
+    corpo = 'linha  de\n texto ' * Config.BODY_INLINE_MAX_BYTES
+
+    email = service.create_email('a@b.com', 'c@d.com', 'Assunto', corpo, datetime.now())
+
+    assert email.corpo is None and email.corpo_ref
+    assert email.preview.startswith('linha de')
+    assert service.load_body(email).corpo == corpo
@@ -0,0 +1,51 @@
+from flask import Flask
+from api import emails
+from repositories.email_repository import ConflictError
+from services.duplicate_index import DuplicateIndex
+from services.email_service import EmailService
+from services.search_index import SearchIndex
+
+
+class FakeEmailRepository:
+    def __init__(self, existentes):
+        self.existentes = existentes
+        self.chamadas = []
+
+    def classify_many(self, classificacoes):
+        self.chamadas.append(classificacoes)
+        return {email_id: email_id in self.existentes for email_id in classificacoes}
+
+
+def test_resultado_por_id_com_uma_chamada_ao_repositorio():
+    repo = FakeEmailRepository({'a', 'b'})
+    service = EmailService(repo, None, search_index=SearchIndex(':memory:'), duplicate_index=DuplicateIndex(':memory:'))
+    classificacao = {'estado': 'PI', 'municipio': 'Teresina', 'categoria': 'Ofício'}
+
+    resultados = service.classify_emails([
+        {'id': 'a', **classificacao},
+        {'id': 'b', **classificacao},
+        {'id': 'a', **classificacao},
+        {'id': 'c', **classificacao},
+        {'id': 'd', 'estado': 'PI', 'municipio': ''},
+        {'estado': 'PI'},
+    ])
+
+    assert [(r['id'], r['status']) for r in resultados] == [
+        ('a', 'classificado'), ('b', 'classificado'), ('a', 'invalido'),
+        ('c', 'nao_encontrado'), ('d', 'invalido'), (None, 'invalido'),
+    ]
+    assert 'municipio, categoria' in resultados[4]['error']
+    assert repo.chamadas == [{email_id: classificacao for email_id in ('a', 'b', 'c')}]
+
+
+def test_conflito_no_lote_responde_409(monkeypatch):
+    class Conflito:
+        def classify_emails(self, itens):
+            raise ConflictError('Emails alterados durante a classificação em lote')
+
+    app = Flask(__name__)
+    app.register_blueprint(emails.emails_bp)
+    monkeypatch.setattr(emails, 'get_service', Conflito)
+
+    resposta = app.test_client().put('/api/emails/classify-batch', json={'ids': ['a'], 'estado': 'PI'})
+    assert resposta.status_code == 409 and not resposta.get_json()['success']
@@ -0,0 +1,46 @@
+# test_email_export.py
+import csv
+import io
+import json
+from dataclasses import replace
+from datetime import datetime
+from flask import Flask
+from api import emails as emails_api
+from models.email import Email
+from utils.email_export import ndjson_lines, csv_lines
+
+
+def emails():
+    yield Email(id='1', remetente='a@b.com', destinatario='c@d.com', assunto='Olá, "mundo"',
+                corpo='', data=datetime(2025, 3, 1, 12, 0), anexos=[{'nome': 'x.pdf'}])
+
+
+def test_ndjson_uma_linha_por_email():
+    linhas = list(ndjson_lines(emails(), ['assunto', 'data']))
+    assert json.loads(linhas[0]) == {'id': '1', 'assunto': 'Olá, "mundo"', 'data': '2025-03-01T12:00:00'}
+
+
+def test_csv_com_cabecalho_e_escape():
+    texto = ''.join(csv_lines(emails(), ['assunto', 'data', 'anexos']))
+    linhas = list(csv.reader(io.StringIO(texto)))
+    assert linhas[0] == ['id', 'assunto', 'data', 'anexos']
+    assert linhas[1] == ['1', 'Olá, "mundo"', '2025-03-01T12:00:00', '[{"nome": "x.pdf"}]']
+
+
+def test_exportacao_padrao_inclui_o_corpo(monkeypatch):
+    class Service:
+        def iter_emails(self, filters, fields):
+            assert 'corpo' in fields and 'corpo_ref' not in fields
+            return (replace(email, corpo='Corpo completo do ofício') for email in emails())
+
+    app = Flask(__name__)
+    app.register_blueprint(emails_api.emails_bp)
+    monkeypatch.setattr(emails_api, 'get_service', Service)
+    client = app.test_client()
+
+    ndjson = client.get('/api/emails/export').get_data(as_text=True)
+    texto = client.get('/api/emails/export?format=csv').get_data(as_text=True)
+
+    assert json.loads(ndjson.splitlines()[0])['corpo'] == 'Corpo completo do ofício'
+    linhas = list(csv.reader(io.StringIO(texto)))
+    assert linhas[1][linhas[0].index('corpo')] == 'Corpo completo do ofício'
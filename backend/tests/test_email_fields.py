@@ -0,0 +1,23 @@
+# test_email_fields.py
+import pytest
+from datetime import datetime
+from models.email import Email
+from utils.email_fields import parse_fields, EMAIL_FIELDS
+
+
+def test_padrao_sem_corpo():
+    fields = parse_fields(None)
+    assert 'corpo' not in fields
+    assert 'assunto' in fields
+
+
+def test_lista_explicita_inclui_data_e_rejeita_desconhecido():
+    assert parse_fields('assunto, id,assunto') == ['assunto', 'data']
+    assert parse_fields('all') == list(EMAIL_FIELDS)
+    with pytest.raises(ValueError):
+        parse_fields('assunto,senha')
+
+
+def test_to_dict_respeita_projecao():
+    email = Email.from_dict({'id': 'x', 'assunto': 'Oi', 'data': datetime(2025, 1, 1)})
+    assert email.to_dict(['assunto', 'data']) == {'id': 'x', 'assunto': 'Oi', 'data': datetime(2025, 1, 1)}
@@ -0,0 +1,26 @@
+# test_email_filters.py
+from datetime import datetime, timezone
+import pytest
+from utils.email_filters import parse_email_filters
+
+
+def test_filtros_basicos():
+    filters = parse_email_filters({
+        'estado': 'PI',
+        'categoria': 'all',
+        'status': 'classified',
+        'remetente': 'joao@empresa.com',
+    })
+    assert filters == {'estado': 'PI', 'remetente': 'joao@empresa.com', 'classificado': True}
+
+
+def test_intervalo_de_datas():
+    filters = parse_email_filters({'data_inicio': '2025-01-01', 'data_fim': '2025-01-31'})
+    assert filters['data_inicio'] == datetime(2025, 1, 1, tzinfo=timezone.utc)
+    # data_fim sem hora inclui o dia inteiro
+    assert filters['data_fim'] == datetime(2025, 2, 1, tzinfo=timezone.utc)
+
+
+def test_status_invalido():
+    with pytest.raises(ValueError):
+        parse_email_filters({'status': 'archived'})
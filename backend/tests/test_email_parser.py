@@ -0,0 +1,23 @@
+# test_email_parser.py
+from utils.email_parser import EmailParser, decode_header_value
+
+
+def test_formatos_simples_mantem_comportamento():
+    assert EmailParser.extract_email_and_name('FELIPE SILVA <fs0987145@gmail.com>') == ('fs0987145@gmail.com', 'FELIPE SILVA')
+    assert EmailParser.extract_email_and_name('<fs0987145@gmail.com>') == ('fs0987145@gmail.com', None)
+    assert EmailParser.extract_email_and_name('fs0987145@gmail.com') == ('fs0987145@gmail.com', 'FS')
+    assert EmailParser.extract_email_and_name('sem endereco') == ('sem endereco', None)
+
+
+def test_varios_destinatarios_com_nomes_codificados():
+    raw = '"Silva, Ana" <ana@x.com>, =?utf-8?q?Jo=C3=A3o_Pereira?= <joao@x.com>, bob@y.org'
+
+    assert EmailParser.parse_addresses(raw) == [
+        ('ana@x.com', 'Silva, Ana'), ('joao@x.com', 'João Pereira'), ('bob@y.org', None),
+    ]
+    assert EmailParser.extract_many([raw, 'carla@d.com']) == [('ana@x.com', 'Silva, Ana'), ('carla@d.com', 'CA')]
+
+
+def test_decodifica_assunto_e_tolera_charset_invalido():
+    assert decode_header_value('=?utf-8?b?T2bDrWNpbyBuwrogMTI=?= urgente') == 'Ofício nº 12 urgente'
+    assert EmailParser.parse_addresses('=?bogus?q?Ana?= <a@b.co>') == [('a@b.co', 'Ana')]
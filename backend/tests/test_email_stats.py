@@ -0,0 +1,76 @@
+# test_email_stats.py
+from datetime import datetime, timedelta, timezone
+from google.cloud import firestore
+from models.email import Email
+from repositories.email_repository import EmailRepository
+from utils.email_stats import EXPIRED_DAYS, stats_delta, build_stats, count_last_days, stale_days
+
+
+def make_email(**kwargs):
+    dados = dict(
+        remetente='joao@empresa.com',
+        destinatario='cliente@example.com',
+        assunto='Assunto',
+        corpo='Corpo',
+        data=datetime(2025, 3, 10, 15, 0, tzinfo=timezone.utc),
+    )
+    dados.update(kwargs)
+    return Email(**dados)
+
+
+def test_delta_criacao():
+    delta = stats_delta(None, make_email())
+    assert delta == {
+        'total': 1,
+        'pendentes': 1,
+        'destinatarios': {'cliente@example.com': 1},
+        'emails_por_dia': {'2025-03-10': 1},
+    }
+
+
+def test_delta_classificacao():
+    pendente = make_email(id='1')
+    classificado = make_email(id='1', estado='PI', municipio='Teresina', classificado=True)
+    delta = stats_delta(pendente, classificado)
+    assert delta == {'classificados': 1, 'pendentes': -1, 'emails_por_estado': {'PI': 1}}
+
+
+def test_delta_exclusao_desfaz_criacao():
+    email = make_email(estado='CE', classificado=True)
+    criacao = stats_delta(None, email)
+    exclusao = stats_delta(email, None)
+    for field, value in criacao.items():
+        if isinstance(value, dict):
+            assert {k: -v for k, v in value.items()} == exclusao[field]
+        else:
+            assert exclusao[field] == -value
+
+
+def test_build_stats_e_ultimos_dias():
+    stats = build_stats([
+        make_email(estado='PI', classificado=True),
+        make_email(data=datetime(2025, 3, 1, tzinfo=timezone.utc)),
+    ])
+    assert stats['total'] == 2
+    assert stats['classificados'] == 1
+    assert stats['emails_por_estado'] == {'PI': 1}
+    agora = datetime(2025, 3, 12, tzinfo=timezone.utc)
+    assert count_last_days(stats['emails_por_dia'], days=7, now=agora) == 1
+    assert stale_days(stats['emails_por_dia'], days=7, now=agora) == ['2025-03-01']
+
+
+def test_incremento_no_firestore_apaga_dias_antigos_sem_ler():
+    class Writer:
+        def set(self, ref, data, merge=False):
+            self.data = data
+
+    repo = EmailRepository.__new__(EmailRepository)
+    repo.stats_ref = 'stats/dashboard'
+    hoje = datetime.now(timezone.utc)
+    antigo = (hoje - timedelta(days=10)).date().isoformat()
+    writer = Writer()
+    repo._increment_stats(writer, {'total': -2, 'emails_por_dia': {hoje.date().isoformat(): 1, antigo: -1}})
+
+    dias = writer.data['emails_por_dia']
+    assert isinstance(dias[hoje.date().isoformat()], firestore.Increment)
+    assert dias[antigo] is firestore.DELETE_FIELD and len(dias) == 1 + EXPIRED_DAYS
@@ -0,0 +1,46 @@
+# test_email_update.py
+import pytest
+from config import Config
+from repositories.email_repository import ConflictError
+from services.body_store import LocalBodyStore
+from services.duplicate_index import DuplicateIndex
+from services.email_service import EmailService
+from services.search_index import SearchIndex
+
+
+class FakeEmailRepository:
+    def __init__(self, versao='v1'):
+        self.versao = versao
+        self.escritas = []
+
+    def update_fields(self, email_id, campos, versao=None):
+        if versao and versao != self.versao:
+            raise ConflictError(email_id)
+        self.escritas.append((email_id, campos))
+        self.versao = 'v2'
+        return self.versao
+
+
+def _service(repo, tmp_path):
+    return EmailService(repo, None, body_store=LocalBodyStore(str(tmp_path)),
+                        search_index=SearchIndex(':memory:'), duplicate_index=DuplicateIndex(':memory:'))
+
+
+def test_grava_so_os_campos_enviados(tmp_path):
+    repo = FakeEmailRepository()
+    service = _service(repo, tmp_path)
+
+    assert service.update_email('a', {'categoria': 'Ofício', 'remetente': 'x@y', 'data': None}) == 'v2'
+    service.update_email('a', {'corpo': 'x' * (Config.BODY_INLINE_MAX_BYTES + 1)})
+
+    assert repo.escritas[0] == ('a', {'categoria': 'Ofício'})
+    campos = repo.escritas[1][1]
+    assert campos['corpo'] is None and campos['corpo_ref'].startswith('sha256:') and campos['preview']
+
+
+def test_versao_desatualizada_gera_conflito(tmp_path):
+    service = _service(FakeEmailRepository(), tmp_path)
+
+    assert service.classify_email('a', 'PI', 'Teresina', 'Ofício', versao='v1')['versao'] == 'v2'
+    with pytest.raises(ConflictError):
+        service.classify_email('a', 'CE', 'Fortaleza', 'Ofício', versao='v1')
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta, timezone
+
+from config import Config
+from models.email import Email
+from repositories.email_repository import EmailRepository
+from services.duplicate_index import DuplicateIndex
+from services.email_service import EmailService
+from services.search_index import SearchIndex
+from utils.fingerprint import fingerprint, hamming
+
+
+CORPO = (
+    "Prezados, segue em anexo o relatório mensal de atendimento da regional "
+    "com os números consolidados de março, incluindo os chamados abertos, "
+    "fechados e pendentes por município. Peço que confiram os dados da sua "
+    "unidade até sexta-feira e respondam caso haja alguma divergência."
+)
+AGORA = datetime(2024, 3, 20, 12, tzinfo=timezone.utc)
+
+
+def test_encaminhamento_com_pequena_edicao_e_copia():
+    original = fingerprint('Relatório mensal', CORPO)
+    copia = fingerprint('FW: RE: Relatorio mensal', CORPO.replace('sexta-feira', 'quinta-feira') + '\n> citado')
+
+    assert original.exact != copia.exact
+    assert hamming(original.simhash, copia.simhash) <= 7
+
+    index = DuplicateIndex(':memory:')
+    index.add_many([('a1', original, 'ana@empresa.com', AGORA, None)])
+
+    assert index.find(copia, 'bruno@empresa.com', AGORA + timedelta(days=1)).email_id == 'a1'
+    # Fora da janela de DUPLICATE_WINDOW_DAYS
+    assert index.find(copia, 'bruno@empresa.com', AGORA + timedelta(days=30)) is None
+    # Texto diferente
+    assert index.find(fingerprint('Escala de plantão', 'Plantão de abril: equipe B nos fins de semana, '
+                                  'equipe A nos feriados e equipe C no restante dos dias úteis do mês.'),
+                      'ana@empresa.com', AGORA) is None
+
+
+def test_entradas_fora_da_janela_sao_removidas():
+    index = DuplicateIndex(':memory:')
+    index.add_many([('a1', fingerprint('Relatório', CORPO), 'ana@empresa.com', AGORA, None)])
+    index.add_many([('a2', fingerprint('Escala', 'Plantão de abril'), 'ana@empresa.com', AGORA + timedelta(days=30), None)])
+
+    assert len(index) == 1
+    assert index.conn.execute('SELECT count(*) FROM bands WHERE email_id = ?', ('a1',)).fetchone()[0] == 0
+
+
+def test_texto_curto_so_e_copia_do_mesmo_remetente():
+    curto = fingerprint('Ok', 'Recebido, obrigado.')
+    index = DuplicateIndex(':memory:')
+    index.add_many([('a1', curto, 'ana@empresa.com', AGORA, None)])
+
+    assert index.find(curto, 'bruno@empresa.com', AGORA) is None
+    assert index.find(curto, 'ana@empresa.com', AGORA).email_id == 'a1'
+
+
+class FakeEmailRepository:
+    document_id_for = staticmethod(EmailRepository.document_id_for)
+
+    def __init__(self):
+        self.emails = {}
+        self.copias = {}
+
+    def create_many(self, emails):
+        for email in emails:
+            email.id = self.document_id_for(email.message_id)
+            self.emails[email.id] = email
+        return emails, []
+
+    def increment_copies(self, copias):
+        for email_id, n in copias.items():
+            self.copias[email_id] = self.copias.get(email_id, 0) + n
+
+
+def test_merge_descarta_copia_do_lote_e_conta_no_original(monkeypatch):
+    monkeypatch.setattr(Config, 'DUPLICATE_POLICY', 'merge')
+    repo = FakeEmailRepository()
+    service = EmailService(repo, None, body_store=None, search_index=SearchIndex(':memory:'),
+                           duplicate_index=DuplicateIndex(':memory:'))
+
+    def email(message_id, assunto, corpo=CORPO):
+        return Email(remetente='ana@empresa.com', destinatario='sup@empresa.com', assunto=assunto,
+                     corpo=corpo, data=AGORA, message_id=message_id)
+
+    criados, duplicados = service.create_emails([email('<1@a>', 'Relatório'), email('<2@a>', 'ENC: Relatório')])
+    assert [e.message_id for e in criados] == ['<1@a>']
+    assert [e.message_id for e in duplicados] == ['<2@a>']
+    assert repo.copias == {criados[0].id: 1}
+
+    # Mesma mensagem sincronizada de novo não conta como cópia dela mesma
+    service.create_emails([email('<1@a>', 'Relatório')])
+    assert repo.copias == {criados[0].id: 1}
+
+
+def test_merge_so_com_mesmo_remetente_e_anexos(monkeypatch):
+    monkeypatch.setattr(Config, 'DUPLICATE_POLICY', 'merge')
+    repo = FakeEmailRepository()
+    service = EmailService(repo, None, body_store=None, search_index=SearchIndex(':memory:'),
+                           duplicate_index=DuplicateIndex(':memory:'))
+    pdf = {'nome': 'a.pdf', 'tipo': 'application/pdf', 'tamanho': 10, 'ref': 'sha256:aa'}
+
+    def email(message_id, remetente, anexos=None):
+        return Email(remetente=remetente, destinatario='sup@empresa.com', assunto='Aviso',
+                     corpo=CORPO, data=AGORA, message_id=message_id, anexos=anexos)
+
+    service.create_emails([email('<1@a>', 'ana@pi.gov.br', [pdf])])
+    # Já gravado (índice): outro município, outro anexo e só então a cópia de fato
+    criados, duplicados = service.create_emails([
+        email('<2@a>', 'bia@ce.gov.br', [pdf]),
+        email('<3@a>', 'ana@pi.gov.br', [{**pdf, 'ref': 'sha256:bb'}]),
+        email('<4@a>', 'ANA@pi.gov.br', [pdf]),
+    ])
+
+    original = repo.document_id_for('<1@a>')
+    assert [(e.message_id, e.duplicado_de) for e in criados] == [('<2@a>', original), ('<3@a>', original)]
+    assert [e.message_id for e in duplicados] == ['<4@a>']
+    assert repo.copias == {original: 1}
@@ -0,0 +1,66 @@
+# test_funcionario_service.py
+from models.funcionario import Funcionario
+from repositories.funcionario_repository import FuncionarioRepository
+from services.funcionario_service import FuncionarioService
+from utils.ttl_cache import TTLCache
+
+
+class FakeFuncionarioRepository:
+    normalize_email = staticmethod(FuncionarioRepository.normalize_email)
+    document_id_for = staticmethod(FuncionarioRepository.document_id_for)
+
+    def __init__(self, funcionarios=()):
+        self.funcionarios = {f.email: f for f in funcionarios}
+        self.upserts = []
+        self.nomes = []
+
+    def upsert(self, email, nome=None, ativo=True):
+        self.upserts.append((email, nome))
+        return Funcionario(id=self.document_id_for(email), email=email, nome=nome)
+
+    def find_by_email(self, email):
+        raise AssertionError('get_or_create não deve ler o repositório')
+
+    def find_all(self):
+        return list(self.funcionarios.values())
+
+    def update_nome(self, funcionario_id, nome):
+        self.nomes.append((funcionario_id, nome))
+
+
+def test_upsert_apenas_na_falta_ou_troca_de_nome():
+    repo = FakeFuncionarioRepository()
+    service = FuncionarioService(repo, cache=TTLCache(maxsize=10, ttl=60))
+
+    primeiro = service.get_or_create_funcionario('Ana@Empresa.com', 'Ana')
+    service.get_or_create_funcionario('ana@empresa.com ', 'Ana')
+    service.get_or_create_funcionario('ana@empresa.com')
+    service.get_or_create_funcionario('ana@empresa.com', 'Ana Souza')
+
+    assert primeiro.id == FuncionarioRepository.document_id_for('ana@empresa.com')
+    assert repo.upserts == [('Ana@Empresa.com', 'Ana'), ('ana@empresa.com', 'Ana Souza')]
+
+
+def test_documento_antigo_do_warm_cache_mantem_id():
+    repo = FakeFuncionarioRepository([Funcionario(id='auto123', email='Bia@Empresa.com', nome='Bia')])
+    service = FuncionarioService(repo, cache=TTLCache(maxsize=10, ttl=60))
+    service.warm_cache()
+
+    assert service.get_or_create_funcionario('Bia@Empresa.com', 'Bia').id == 'auto123'
+    assert service.get_or_create_funcionario('bia@empresa.com', 'Beatriz').id == 'auto123'
+    assert repo.upserts == [] and repo.nomes == [('auto123', 'Beatriz')]
+
+
+def test_ttl_cache_expira_e_descarta_menos_usado():
+    agora = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, clock=lambda: agora[0])
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+
+    agora[0] = 11
+    assert cache.get('a') is None
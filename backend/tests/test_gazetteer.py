@@ -0,0 +1,26 @@
+from utils.gazetteer import get_gazetteer, suggest_location
+from utils.text_normalize import tokenize
+
+
+def test_assinatura_com_uf_define_estado_e_municipio():
+    sugestao = suggest_location(
+        'Ofício da Secretaria de Saúde',
+        'Bom dia,\nsegue o ofício para análise.\n\n--\nMaria Souza\nSecretaria de Saúde\nParnaíba - PI'
+    )
+    assert (sugestao.estado, sugestao.municipio) == ('PI', 'Parnaíba')
+    assert sugestao.confianca == 1.0
+
+
+def test_mencao_mais_longa_prevalece():
+    mencoes = get_gazetteer().scan(tokenize('Unidade de Juazeiro do Norte, Mato Grosso do Sul'))
+    assert [(m.uf, m.municipio) for _, _, m in mencoes] == [('CE', 'Juazeiro do Norte'), ('MS', None)]
+
+
+def test_nomes_ambiguos_exigem_uf():
+    assert suggest_location('Feliz Natal', 'Boas festas para toda a equipe da serra') is None
+    assert suggest_location('Reunião em Natal/RN', '').estado == 'RN'
+
+
+def test_pouca_evidencia_reduz_confianca():
+    sugestao = suggest_location('Relatório', 'Dados de Teresina e de Fortaleza no anexo.\n\n\n\n\n\n\nAtt')
+    assert sugestao.confianca <= 0.25
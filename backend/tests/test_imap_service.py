@@ -0,0 +1,250 @@
+# test_imap_service.py
+import imaplib
+import io
+import socketserver
+import threading
+from models.sync_checkpoint import SyncCheckpoint
+from services import imap_service
+from services.imap_idle_worker import ImapIdleWorker
+from services.imap_service import ImapService
+from services.mailbox_sync_runner import MailboxRemovedError
+
+RAW = (b"From: Joao <joao@empresa.com>\r\nTo: cliente@example.com\r\n"
+       b"Subject: Teste\r\nMessage-ID: <%d@empresa.com>\r\n\r\ncorpo %d\r\n")
+
+
+class FakeImap:
+    """IMAP em memória: responde SEARCH pelo imaplib e UID FETCH pelo socket (send/readline/read)"""
+
+    def __init__(self, uids, resposta=None):
+        self.uids = uids
+        self.fetches = []
+        self.logged_out = False
+        self.resposta = resposta  # bytes crus do FETCH (sem a linha tagged), em vez de RAW
+        self.buffer = io.BytesIO()
+        self.untagged = {}
+
+    def login(self, *args):
+        pass
+
+    def select(self, folder, readonly=False):
+        return 'OK', [str(len(self.uids)).encode()]
+
+    def response(self, name):
+        return name, [b'42']
+
+    def uid(self, command, *args):
+        return 'OK', [' '.join(map(str, self.uids)).encode()]
+
+    def _new_tag(self):
+        return b'A%d' % (len(self.fetches) + 1)
+
+    def send(self, comando):
+        tag, _, _, uid_set = comando.split()[:4]
+        self.fetches.append(uid_set.decode())
+        pedidos = set()
+        for faixa in uid_set.decode().split(','):
+            inicio, _, fim = faixa.partition(':')
+            pedidos.update(range(int(inicio), int(fim or inicio) + 1))
+        resposta = self.resposta
+        if resposta is None:
+            resposta = b''.join(
+                b'* %d FETCH (UID %d BODY[] {%d}\r\n' % (seq, uid, len(RAW % (uid, uid))) + RAW % (uid, uid) + b')\r\n'
+                for seq, uid in enumerate(self.uids, 1) if uid in pedidos
+            )
+        self.buffer = io.BytesIO(resposta + tag + b' OK FETCH completo\r\n')
+
+    def readline(self):
+        return self.buffer.readline()
+
+    def read(self, tamanho):
+        return self.buffer.read(tamanho)
+
+    def _append_untagged(self, nome, dado):
+        self.untagged.setdefault(nome, []).append(dado)
+
+    def logout(self):
+        self.logged_out = True
+
+
+def test_uid_set_compacta_faixas():
+    assert ImapService._uid_set([1, 2, 3, 7, 9, 10]) == '1:3,7,9:10'
+
+
+def test_fetch_header_e_text_com_uid_no_fim():
+    fake = FakeImap([15, 16], resposta=(
+        b'* 1 FETCH (BODY[HEADER] {14}\r\nSubject: a\r\n\r\n BODY[TEXT]<0> {5}\r\ncorpo UID 15)\r\n'
+        b'* 3 EXISTS\r\n'
+        b'* 2 FETCH (UID 16 BODY[HEADER] {14}\r\nSubject: b\r\n\r\n BODY[TEXT]<0> {2}\r\nxy)\r\n'
+        b'* 2 FETCH (FLAGS (\\Seen))\r\n'
+    ))
+    stream = ImapService('caixa@empresa.com', 'senha')._fetch_stream(fake, '15:16', '(UID BODY.PEEK[])')
+    primeira = next(stream)
+    # A primeira mensagem sai antes de o restante da resposta ser lido
+    assert primeira[0] == 15 and fake.buffer.read(11) == b'* 3 EXISTS\r'
+    fake.buffer.seek(-11, io.SEEK_CUR)
+    partes = [primeira, *stream]
+
+    assert [uid for uid, _ in partes] == [15, 16]
+    assert b''.join(partes[0][1]) == b'Subject: a\r\n\r\ncorpo'
+    assert fake.untagged == {'EXISTS': [b'3']}
+
+
+def test_mensagem_maior_que_o_limite_nao_fica_inteira_em_memoria():
+    grande = b'x' * (1024 * 1024)
+    fake = FakeImap([1, 2], resposta=(
+        b'* 1 FETCH (UID 1 BODY[] {%d}\r\n' % len(grande) + grande + b')\r\n'
+        b'* 2 FETCH (UID 2 BODY[] {5}\r\ncurto)\r\n'
+    ))
+    leituras = []
+    ler = fake.read
+    fake.read = lambda tamanho: leituras.append(tamanho) or ler(tamanho)
+    service = ImapService('caixa@empresa.com', 'senha')
+    service.max_body_bytes = 100 * 1024
+
+    partes = list(service._fetch_stream(fake, '1:2', service._fetch_items()))
+
+    assert [(uid, len(p[0])) for uid, p in partes] == [(1, 100 * 1024), (2, 5)]
+    # Literal lido em blocos e descartado além do limite, nunca de uma vez
+    assert max(leituras) == imap_service._READ_CHUNK and sum(leituras) == len(grande) + 5
+
+
+def test_fetch_em_lotes(monkeypatch):
+    fake = FakeImap([11, 12, 13])
+    monkeypatch.setattr(imap_service.imaplib, 'IMAP4_SSL', lambda *args: fake)
+    service = ImapService('caixa@empresa.com', 'senha')
+    service.chunk_size = 2
+
+    mensagens, checkpoint = service.fetch_new_emails(SyncCheckpoint(service.mailbox, 42, 10))
+    mensagens = list(mensagens)
+
+    assert fake.fetches == ['11:12', '13']
+    assert checkpoint.last_uid == 13
+    assert fake.logged_out
+    assert [uid for uid, _ in mensagens] == [11, 12, 13]
+    assert mensagens[0][1].message_id == '<11@empresa.com>'
+
+
+class IdleServer(socketserver.StreamRequestHandler):
+    """Servidor IMAP mínimo que avisa EXISTS durante o IDLE"""
+
+    def handle(self):
+        self.wfile.write(b'* OK pronto\r\n')
+        for raw in self.rfile:
+            partes = raw.decode().split()
+            if partes[0] == 'DONE':
+                self.wfile.write(self.server.idle_tag + b' OK IDLE terminado\r\n')
+                continue
+            tag, comando = partes[0].encode(), partes[1].upper()
+            if comando == 'CAPABILITY':
+                self.wfile.write(b'* CAPABILITY IMAP4rev1 IDLE\r\n')
+            elif comando == 'EXAMINE':
+                self.wfile.write(b'* 1 EXISTS\r\n* OK [UIDVALIDITY 7] ok\r\n')
+            elif comando == 'IDLE':
+                self.server.idle_tag = tag
+                self.wfile.write(b'+ idling\r\n')
+                if self.server.avisar:
+                    self.wfile.write(b'* 2 EXISTS\r\n')
+                continue
+            elif comando == 'LOGOUT':
+                self.wfile.write(b'* BYE\r\n' + tag + b' OK\r\n')
+                return
+            self.wfile.write(tag + b' OK ' + comando.encode() + b'\r\n')
+
+
+def _idle_service(monkeypatch, avisar):
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), IdleServer)
+    server.daemon_threads = True
+    server.avisar = avisar
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(imap_service.imaplib, 'IMAP4_SSL', imaplib.IMAP4)
+    service = ImapService('caixa@empresa.com', 'senha')
+    service.server, service.port = server.server_address
+    service.connect()
+    return server, service
+
+
+def test_idle_detecta_mensagem_nova(monkeypatch):
+    server, service = _idle_service(monkeypatch, avisar=True)
+    assert service.supports_idle
+    service._mail.response('EXISTS')  # descarta o EXISTS do EXAMINE
+    assert service.wait_for_changes(timeout=2) is True
+    service.close()
+    server.shutdown()
+
+
+def test_idle_expira_sem_aviso(monkeypatch):
+    server, service = _idle_service(monkeypatch, avisar=False)
+    service._mail.response('EXISTS')
+    assert service.wait_for_changes(timeout=0.2) is False
+    service.close()
+    server.shutdown()
+
+
+def test_noop_sem_idle_interrompido_pelo_stop():
+    class SemIdle:
+        def response(self, name):
+            return name, [None]
+
+        def noop(self):
+            raise AssertionError('NOOP depois do stop')
+
+    service = ImapService('caixa@empresa.com', 'senha')
+    service._mail = SemIdle()
+    stop = threading.Event()
+    threading.Timer(0.05, stop.set).start()
+
+    assert service.wait_for_changes(timeout=30, stop=stop) is False
+
+
+def test_worker_refaz_sync_pulado():
+    class SemAviso:
+        mailbox = 'caixa@empresa.com/INBOX'
+        supports_idle = True
+
+        def connect(self):
+            pass
+
+        def close(self):
+            pass
+
+        def wait_for_changes(self, timeout, stop=None):
+            return False
+
+    chamadas = []
+
+    def sync(imap):
+        chamadas.append(len(chamadas))
+        if len(chamadas) == 2:
+            worker.stop()
+            return []
+        return None
+
+    worker = ImapIdleWorker(SemAviso(), sync, idle_timeout=300, noop_interval=0.01)
+    worker.run()
+
+    # O primeiro sync foi pulado (lock/lease com outro): refeito sem aviso do servidor
+    assert chamadas == [0, 1]
+
+
+def test_worker_para_quando_a_caixa_sai_do_registro():
+    conexoes = []
+
+    class Caixa:
+        mailbox = 'caixa@empresa.com/INBOX'
+        supports_idle = True
+
+        def connect(self):
+            conexoes.append(1)
+
+        def close(self):
+            pass
+
+    def sync(imap):
+        raise MailboxRemovedError('Caixa caixa@empresa.com/INBOX não está no registro')
+
+    worker = ImapIdleWorker(Caixa(), sync)
+    worker.run()
+
+    # Sem reconexão com backoff para uma caixa que não existe mais
+    assert conexoes == [1]
@@ -0,0 +1,82 @@
+# test_ingest_pipeline.py
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from services.ingest_pipeline import IngestPipeline
+
+
+def _parse(uid, partes):
+    # Tempos diferentes por mensagem: os resultados terminam fora de ordem
+    time.sleep(random.uniform(0, 0.003))
+    if partes == b'quebrada':
+        raise ValueError('MIME inválido')
+    return f'email {uid}'
+
+
+def _mensagens(n, baixadas=None):
+    for uid in range(1, n + 1):
+        if baixadas is not None:
+            baixadas.append(uid)
+        yield uid, b'quebrada' if uid % 10 == 0 else b'raw'
+
+
+def test_lotes_em_ordem_de_uid_com_parse_paralelo():
+    lotes = []
+    with ThreadPoolExecutor(4) as executor:
+        pipeline = IngestPipeline(_parse, lotes.append, executor, batch_size=8, queue_size=16)
+        pipeline.run(_mensagens(50))
+
+    uids = [uid for lote in lotes for uid, _ in lote]
+    assert uids == [uid for uid in range(1, 51) if uid % 10]
+    assert all(len(lote) <= 8 for lote in lotes)
+    assert pipeline.last_uid == 50
+
+
+def test_fetch_espera_o_persist_lento():
+    baixadas = []
+    emfila = []
+
+    def persist(lote):
+        # Sem back-pressure o fetch baixaria as 200 mensagens enquanto o primeiro lote grava
+        emfila.append(len(baixadas) - lote[-1][0])
+        time.sleep(0.01)
+
+    with ThreadPoolExecutor(2) as executor:
+        IngestPipeline(_parse, persist, executor, batch_size=5, queue_size=10).run(_mensagens(200, baixadas))
+
+    # Fila (10) + a mensagem que aguarda vaga
+    assert max(emfila) <= 11
+
+
+def test_stop_grava_o_que_ja_foi_baixado():
+    baixadas = []
+    gravadas = []
+
+    def persist(lote):
+        gravadas.extend(uid for uid, _ in lote)
+        if len(gravadas) >= 10:
+            pipeline.stop()
+
+    with ThreadPoolExecutor(2) as executor:
+        pipeline = IngestPipeline(_parse, persist, executor, batch_size=5, queue_size=10)
+        pipeline.run(_mensagens(1000, baixadas))
+
+    assert pipeline.stopped and len(baixadas) < 1000
+    # Tudo que foi aceito na fila foi gravado, sem buracos até last_uid
+    assert gravadas == [uid for uid in range(1, pipeline.last_uid + 1) if uid % 10]
+
+
+def test_erro_no_persist_para_o_fetch():
+    def persist(lote):
+        if lote[0][0] > 20:
+            raise RuntimeError('Firestore indisponível')
+
+    with ThreadPoolExecutor(2) as executor:
+        pipeline = IngestPipeline(_parse, persist, executor, batch_size=5, queue_size=4)
+        with pytest.raises(RuntimeError):
+            pipeline.run(_mensagens(10000))
+
+    assert pipeline.last_uid <= 22
+    assert not [t for t in threading.enumerate() if t.name == 'ingest-fetch']
@@ -0,0 +1,133 @@
+# test_mailbox_sync_runner.py
+import json
+import pytest
+import threading
+import time
+from config import Config
+from models.mailbox import Mailbox
+from services.mailbox_registry import load_mailboxes
+from services.imap_idle_worker import ImapIdleSupervisor
+from services.mailbox_sync_runner import MailboxRemovedError, MailboxSyncRunner
+from services.sync_coordinator import SyncCoordinator
+from services.sync_lease import FileLease
+
+
+class FakeImap:
+    def __init__(self, mailbox):
+        self.mailbox = mailbox.key
+        self.connected = False
+        self.conexoes = 0
+
+    def connect(self):
+        if self.mailbox.startswith('quebrada'):
+            raise ConnectionError('LOGIN falhou')
+        self.connected = True
+        self.conexoes += 1
+
+    def close(self):
+        self.connected = False
+
+
+def _runner(tmp_path, caixas, sync, workers=3):
+    return MailboxSyncRunner(
+        load=lambda: [Mailbox(endereco=c) for c in caixas],
+        new_imap=FakeImap,
+        sync=sync,
+        new_coordinator=lambda m: SyncCoordinator(FileLease(str(tmp_path / f'{m.endereco}.lock')),
+                                                  min_interval=0.01, max_interval=0.05, jitter=0),
+        workers=workers
+    )
+
+
+def test_caixas_em_paralelo_e_falha_isolada(tmp_path):
+    em_andamento = set()
+    simultaneas = []
+    syncs = {}
+    lock = threading.Lock()
+
+    def sync(imap):
+        with lock:
+            em_andamento.add(imap.mailbox)
+            simultaneas.append(len(em_andamento))
+            syncs[imap.mailbox] = syncs.get(imap.mailbox, 0) + 1
+        time.sleep(0.02)
+        with lock:
+            em_andamento.discard(imap.mailbox)
+        return ['email']
+
+    runner = _runner(tmp_path, ['a@x.com', 'b@x.com', 'quebrada@x.com'], sync)
+    runner.start()
+    time.sleep(0.4)
+    runner.stop()
+
+    assert max(simultaneas) == 2  # As duas caixas boas ao mesmo tempo
+    assert syncs['a@x.com/INBOX'] >= 3 and syncs['b@x.com/INBOX'] >= 3
+    assert 'quebrada@x.com/INBOX' not in syncs
+
+    relatorio = {r['caixa']: r for r in runner.report()}
+    assert relatorio['quebrada@x.com/INBOX']['erros_seguidos'] >= 1
+    assert relatorio['quebrada@x.com/INBOX']['atraso'] is None
+    assert relatorio['a@x.com/INBOX']['atraso'] is not None and relatorio['a@x.com/INBOX']['erros'] == 0
+    # Conexão persistente por caixa: reaproveitada entre os syncs
+    assert runner._caixas['a@x.com/inbox'].imap.conexoes == 1
+
+
+def test_sync_all_por_caixa(tmp_path):
+    def sync(imap):
+        if imap.mailbox.startswith('b'):
+            raise RuntimeError('Firestore indisponível')
+        return ['e1', 'e2']
+
+    resultados = _runner(tmp_path, ['a@x.com', 'b@x.com'], sync).sync_all()
+
+    assert resultados['a@x.com/INBOX'] == {'status': 'ok', 'emails': ['e1', 'e2']}
+    assert resultados['b@x.com/INBOX'] == {'status': 'erro', 'erro': 'Firestore indisponível'}
+
+
+def test_registro_em_arquivo(tmp_path, monkeypatch):
+    path = tmp_path / 'mailboxes.json'
+    path.write_text(json.dumps([
+        {'endereco': 'suporte@x.com', 'senha_env': 'SENHA_SUPORTE'},
+        {'endereco': 'SUPORTE@x.com', 'senha': 'repetida'},
+        {'endereco': 'vendas@x.com', 'pasta': 'Pedidos', 'senha': 's3', 'porta': '143'},
+        {'endereco': 'antiga@x.com', 'ativo': False},
+    ]))
+    monkeypatch.setattr(Config, 'MAILBOX_SOURCE', 'file')
+    monkeypatch.setattr(Config, 'MAILBOXES_PATH', str(path))
+    monkeypatch.setenv('SENHA_SUPORTE', 'segredo')
+
+    caixas = load_mailboxes()
+
+    assert [c.key for c in caixas] == ['suporte@x.com/INBOX', 'vendas@x.com/Pedidos']
+    assert caixas[0].password() == 'segredo'
+    assert caixas[1].porta == 143 and 'senha' not in caixas[1].to_dict()
+
+
+def test_caixa_removida_para_o_worker_idle(tmp_path):
+    caixas = ['a@x.com', 'b@x.com']
+    runner = _runner(tmp_path, caixas, sync=lambda imap: [])
+    iniciados = []
+
+    class Worker(threading.Thread):
+        def __init__(self, mailbox):
+            super().__init__(daemon=True)
+            self.mailbox = mailbox
+            self.parado = threading.Event()
+
+        def run(self):
+            iniciados.append(self.mailbox.key)
+            self.parado.wait(5)
+
+        def stop(self):
+            self.parado.set()
+
+    supervisor = ImapIdleSupervisor(runner.reload, Worker)
+    assert supervisor.refresh() == 2
+    _, worker_b = supervisor.workers['b@x.com/inbox']
+
+    caixas.remove('b@x.com')
+    assert supervisor.refresh() == 1
+    assert worker_b.parado.is_set() and sorted(iniciados) == ['a@x.com/INBOX', 'b@x.com/INBOX']
+    with pytest.raises(MailboxRemovedError):
+        runner.run_once('b@x.com/INBOX', lambda: [])
+    supervisor.stop()
@@ -0,0 +1,82 @@
+# test_mime_extract.py
+import base64
+from services.body_store import LocalBodyStore
+from utils.mime_extract import MimeExtractor, html_to_text
+
+
+def _mensagem(*partes: bytes) -> bytes:
+    corpo = b''.join(b'--XYZ\r\n' + parte + b'\r\n' for parte in partes)
+    return (b'From: Ana <ana@empresa.com>\r\nSubject: Teste\r\n'
+            b'Content-Type: multipart/mixed; boundary="XYZ"\r\n\r\n'
+            b'preambulo\r\n' + corpo + b'--XYZ--\r\nepilogo\r\n')
+
+
+def _pedacos(dados: bytes, tamanho: int = 7):
+    return [dados[i:i + tamanho] for i in range(0, len(dados), tamanho)]
+
+
+def test_texto_quoted_printable_latin1_e_anexo_no_store(tmp_path):
+    pdf = bytes(range(256)) * 40
+    raw = _mensagem(
+        b'Content-Type: text/plain; charset=iso-8859-1\r\n'
+        b'Content-Transfer-Encoding: quoted-printable\r\n\r\n'
+        b'Relat=F3rio de S=E3o Paulo com uma linha bem longa que foi quebrada=\r\n'
+        b' pelo cliente.\r\n',
+        b'Content-Type: application/pdf\r\nContent-Transfer-Encoding: base64\r\n'
+        b'Content-Disposition: attachment; filename="=?utf-8?q?relat=C3=B3rio.pdf?="\r\n\r\n'
+        + base64.encodebytes(pdf).replace(b'\n', b'\r\n'),
+    )
+    store = LocalBodyStore(str(tmp_path))
+
+    # Pedaços pequenos: linhas e blocos base64 atravessam os limites dos chunks
+    extraida = MimeExtractor(store).extract(_pedacos(raw))
+
+    assert extraida.headers['Subject'] == 'Teste'
+    assert extraida.corpo.rstrip() == 'Relatório de São Paulo com uma linha bem longa que foi quebrada pelo cliente.'
+    [anexo] = extraida.anexos
+    assert anexo['nome'] == 'relatório.pdf'
+    assert anexo['tamanho'] == len(pdf) and not anexo['descartado']
+    assert store.get(anexo['ref']) == pdf
+
+
+def test_anexo_acima_do_limite_fica_so_com_metadados(tmp_path):
+    raw = _mensagem(
+        b'Content-Type: text/plain\r\n\r\nsegue',
+        b'Content-Type: application/zip\r\nContent-Disposition: attachment; filename="a.zip"\r\n\r\n'
+        + b'x' * 5000,
+    )
+    store = LocalBodyStore(str(tmp_path))
+
+    extraida = MimeExtractor(store, max_attachment_bytes=1000).extract([raw])
+
+    assert extraida.corpo == 'segue'
+    assert extraida.anexos == [{'nome': 'a.zip', 'tipo': 'application/zip', 'tamanho': 5000,
+                                'ref': None, 'descartado': True}]
+    # Nem o arquivo temporário sobra no store
+    assert not list(tmp_path.rglob('*.*'))
+
+
+def test_so_html_vira_texto_e_sem_charset_tenta_cp1252():
+    raw = (b'Subject: Aviso\r\nContent-Type: multipart/alternative; boundary=b1\r\n\r\n'
+           b'--b1\r\nContent-Type: text/plain\r\n\r\n\r\n'
+           b'--b1\r\nContent-Type: text/html\r\n\r\n'
+           b'<html><head><style>p {color: red}</style></head><body>'
+           b'<p>Reuni\xe3o amanh&atilde;</p><p>Sala&nbsp;3<br>10h</p><script>x()</script></body></html>\r\n'
+           b'--b1--\r\n')
+
+    extraida = MimeExtractor().extract([raw])
+
+    assert extraida.corpo == 'Reunião amanhã\n\nSala 3\n10h'
+    assert extraida.anexos == []
+
+
+def test_texto_truncado_no_limite():
+    raw = b'Subject: Longo\r\n\r\n' + b'abcdefghij\r\n' * 1000
+    extraida = MimeExtractor(max_text_bytes=100).extract(_pedacos(raw, 4096))
+
+    assert extraida.truncado
+    assert len(extraida.corpo) == 100
+
+
+def test_html_to_text_remove_comentarios_e_entidades():
+    assert html_to_text('<!-- x --><div>A &amp; B</div><div>C</div>') == 'A & B\n\nC'
@@ -0,0 +1,25 @@
+# test_pagination.py
+from datetime import datetime, timezone
+import pytest
+from utils.pagination import encode_cursor, decode_cursor, parse_limit
+
+
+def test_cursor_roundtrip():
+    data = datetime(2025, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    cursor = encode_cursor(data, 'abc123')
+    assert decode_cursor(cursor) == (data, 'abc123')
+
+
+def test_cursor_invalido():
+    with pytest.raises(ValueError):
+        decode_cursor('nao-e-um-cursor')
+
+
+def test_parse_limit():
+    assert parse_limit(None, 50, 500) == 50
+    assert parse_limit('10', 50, 500) == 10
+    assert parse_limit('9999', 50, 500) == 500
+    with pytest.raises(ValueError):
+        parse_limit('0', 50, 500)
+    with pytest.raises(ValueError):
+        parse_limit('abc', 50, 500)
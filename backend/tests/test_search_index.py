@@ -0,0 +1,55 @@
+# test_search_index.py
+from config import Config
+from services.search_index import SearchIndex
+from utils.text_normalize import tokenize
+
+
+def test_tokenize_remove_acentos():
+    assert tokenize('Licitação em São João do PIAUÍ!') == ['licitacao', 'em', 'sao', 'joao', 'do', 'piaui']
+
+
+def test_busca_ignora_acentos_e_prioriza_assunto():
+    index = SearchIndex(':memory:')
+    index.add_many([
+        ('1', 'Reunião semanal', 'pauta da licitação de Teresina'),
+        ('2', 'Licitação Teresina', 'segue o edital'),
+        ('3', 'Férias', 'nada a ver'),
+    ])
+
+    hits, next_cursor = index.search('licitacao teresina', limit=1)
+
+    assert [email_id for email_id, _ in hits] == ['2']
+    assert [email_id for email_id, _ in index.search('licitacao teresina', 1, next_cursor)[0]] == ['1']
+
+
+def test_prefixo_reindexacao_e_remocao():
+    index = SearchIndex(':memory:')
+    index.add('1', 'Ofício', 'texto')
+    index.add('1', 'Memorando', 'texto')
+
+    assert index.search('ofic', limit=10)[0] == []
+    assert [h[0] for h in index.search('memo', limit=10)[0]] == ['1']
+
+    index.remove('1')
+    assert len(index) == 0
+    assert index.search('"; DROP', limit=10)[0] == []
+
+
+def test_termo_comum_ranqueia_so_os_mais_recentes(monkeypatch):
+    monkeypatch.setattr(Config, 'SEARCH_RANK_WINDOW', 2)
+    index = SearchIndex(':memory:')
+    index.add_many([('antigo', 'licitação licitação licitação', ''), ('a', 'licitação', 'x'), ('b', 'licitação', 'y')])
+
+    hits, next_cursor = index.search('licitacao', limit=5)
+
+    assert sorted(email_id for email_id, _ in hits) == ['a', 'b']
+    assert next_cursor is None
+
+
+def test_update_parcial_mantem_o_outro_campo():
+    index = SearchIndex(':memory:')
+    index.add('1', 'Ofício', 'pauta da licitação')
+    index.update('1', assunto='Memorando')
+
+    assert index.search('memorando licitacao', limit=10)[0][0][0] == '1'
+    assert index.search('oficio', limit=10)[0] == []
@@ -0,0 +1,123 @@
+# test_sqlite_storage.py
+import pytest
+from datetime import datetime, timedelta, timezone
+from models.email import Email
+from models.sync_checkpoint import SyncCheckpoint
+from repositories.email_repository import ConflictError, DuplicateEmailError, EmailNotFoundError
+from repositories.sqlite_database import SqliteDatabase
+from repositories.sqlite_email_repository import SqliteEmailRepository
+from repositories.sqlite_funcionario_repository import SqliteFuncionarioRepository
+from repositories.sqlite_sync_state_repository import SqliteSyncStateRepository
+from services.body_store import LocalBodyStore
+from services.duplicate_index import DuplicateIndex
+from services.email_service import EmailService
+from services.funcionario_service import FuncionarioService
+from services.search_index import SearchIndex
+from utils.ttl_cache import TTLCache
+
+
+def _email(n, **campos):
+    return Email(remetente=f'r{n % 2}@x.com', destinatario='d@x.com', assunto=f'Assunto {n}',
+                 corpo='corpo', data=None, message_id=f'<{n}@x.com>', **campos)
+
+
+def test_create_many_duplicados_e_estatisticas():
+    repo = SqliteEmailRepository(SqliteDatabase(':memory:'))
+
+    criados, duplicados = repo.create_many([_email(1, estado='PI'), _email(2), _email(1)])
+    with pytest.raises(DuplicateEmailError):
+        repo.create(_email(2))
+
+    assert len(criados) == 2 and len(duplicados) == 1
+    assert repo.find_by_id(criados[0].id).estado == 'PI'
+    stats = repo.get_stats()
+    assert stats['total'] == 2 and stats['pendentes'] == 2 and stats['emails_por_estado'] == {'PI': 1}
+    assert repo.rebuild_stats() == {k: v for k, v in repo.get_stats().items() if k != 'atualizado_em'}
+    assert 'destinatarios' not in stats and repo.get_top_destinatarios() == [('d@x.com', 2)]
+
+
+def test_estatisticas_descartam_dias_antigos():
+    repo = SqliteEmailRepository(SqliteDatabase(':memory:'))
+    email = repo.create(_email(1))
+    antigo = (datetime.now(timezone.utc) - timedelta(days=30)).date().isoformat()
+    with repo.db.transaction() as conn:
+        repo._increment_stats(conn, {'emails_por_dia': {antigo: 3}})
+
+    assert antigo not in repo.get_stats()['emails_por_dia']
+    repo.delete(email.id)
+    assert repo.get_top_destinatarios() == [('d@x.com', 0)]
+
+
+def test_paginacao_por_cursor_com_filtros():
+    repo = SqliteEmailRepository(SqliteDatabase(':memory:'))
+    repo.create_many([_email(n) for n in range(7)])
+
+    vistos, cursor = [], None
+    while True:
+        pagina, cursor = repo.find_page(3, cursor, {'remetente': 'r0@x.com'}, fields=['assunto'])
+        vistos.extend(pagina)
+        if not cursor:
+            break
+
+    assert len(vistos) == 4 == repo.count({'remetente': 'r0@x.com'})
+    assert all(email.corpo is None and email.assunto for email in vistos)
+    assert [e.id for e in vistos] == [e.id for e in repo.iter_emails({'remetente': 'r0@x.com'}, page_size=2)]
+    assert repo.count({'data_inicio': datetime.now(timezone.utc) + timedelta(days=1)}) == 0
+    assert repo.count_recent(7) == 7
+
+
+def test_versao_e_classificacao():
+    repo = SqliteEmailRepository(SqliteDatabase(':memory:'))
+    email = repo.create(_email(1))
+    versao = repo.find_by_id(email.id).versao
+
+    nova = repo.update_fields(email.id, {'estado': 'CE'}, versao)
+    with pytest.raises(ConflictError):
+        repo.update_fields(email.id, {'estado': 'PI'}, versao)
+    with pytest.raises(EmailNotFoundError):
+        repo.delete('inexistente')
+
+    assert repo.classify_many({email.id: {'estado': 'PI', 'municipio': 'Teresina', 'categoria': 'Ofício'},
+                               'inexistente': {'estado': 'PI'}}) == {email.id: True, 'inexistente': False}
+    assert repo.find_by_id(email.id).versao != nova
+    assert [e.id for e in repo.find_page(10, filters={'classificado': True, 'estado': 'PI'})[0]] == [email.id]
+    assert repo.count_by_estado() == {'PI': 1}
+
+    repo.delete(email.id)
+    assert repo.get_stats()['total'] == 0 and repo.count_by_estado() == {}
+
+
+def test_funcionarios_e_checkpoints():
+    db = SqliteDatabase(':memory:')
+    funcionarios = SqliteFuncionarioRepository(db)
+    a = funcionarios.upsert('a@x.com', 'Ana')
+    b = funcionarios.upsert('b@x.com', ativo=False)
+    funcionarios.upsert('a@x.com')
+    funcionarios.upsert('b@x.com', 'Bia')
+    funcionarios.increment_email_counts({a.id: 2, b.id: 5})
+
+    top = funcionarios.get_top_senders(2)
+    assert [(f.email, f.nome, f.total_emails, f.ativo) for f in top] == [
+        ('b@x.com', 'Bia', 5, False), ('a@x.com', 'Ana', 2, True)]
+    assert funcionarios.find_by_email('A@x.com').id == funcionarios.document_id_for(' A@x.com')
+    assert funcionarios.upsert(' C@X.com').email == 'c@x.com'
+
+    checkpoints = SqliteSyncStateRepository(db)
+    checkpoints.save(SyncCheckpoint(mailbox='a@x.com/INBOX', uidvalidity=7, last_uid=42))
+    assert checkpoints.get('A@x.com/INBOX').last_uid == 42 and checkpoints.get('b@x.com/INBOX') is None
+
+
+def test_remetente_gravado_em_minusculas(tmp_path):
+    db = SqliteDatabase(':memory:')
+    repo = SqliteEmailRepository(db)
+    service = EmailService(repo, FuncionarioService(SqliteFuncionarioRepository(db), TTLCache(10, 60)),
+                           body_store=LocalBodyStore(str(tmp_path)), search_index=SearchIndex(':memory:'),
+                           duplicate_index=DuplicateIndex(':memory:'))
+    criados, _ = service.create_emails([Email(remetente='João <Joao.Silva@Pref.GOV.br>', destinatario='d@x.com',
+                                              assunto='Ofício', corpo='corpo', data=None, message_id='<1@x>')])
+    antigo = repo.create(Email(remetente='Ana@X.com', destinatario='d@x.com', assunto='Antigo',
+                               corpo='corpo', data=None, message_id='<2@x>'))
+
+    assert criados[0].remetente == 'joao.silva@pref.gov.br'
+    assert service.normalize_remetentes() == 1
+    assert repo.count({'remetente': 'ana@x.com'}) == 1 and repo.find_by_id(antigo.id).remetente == 'ana@x.com'
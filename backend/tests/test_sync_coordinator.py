@@ -0,0 +1,69 @@
+# test_sync_coordinator.py
+import pytest
+from services.sync_coordinator import SyncCoordinator
+from services.sync_lease import FileLease
+
+
+def test_file_lease_exclusivo_entre_donos(tmp_path):
+    path = str(tmp_path / 'sync.lock')
+    primeiro, segundo = FileLease(path), FileLease(path)
+
+    assert primeiro.acquire()
+    assert not segundo.acquire()
+    primeiro.release()
+    assert segundo.acquire()
+    segundo.release()
+
+
+def test_pula_quando_outro_processo_tem_o_lease(tmp_path):
+    path = str(tmp_path / 'sync.lock')
+    outro = FileLease(path)
+    outro.acquire()
+    coordinator = SyncCoordinator(FileLease(path))
+    chamadas = []
+
+    assert coordinator.run_once(lambda: chamadas.append(1) or []) is None
+    assert chamadas == [] and coordinator.metrics.ignoradas == 1
+
+    outro.release()
+    assert coordinator.run_once(lambda: ['email']) == ['email']
+    assert coordinator.metrics.execucoes == 1 and coordinator.metrics.emails == 1
+
+
+def test_pula_sync_concorrente_no_mesmo_processo(tmp_path):
+    coordinator = SyncCoordinator(FileLease(str(tmp_path / 'sync.lock')))
+    internos = []
+
+    # Trigger manual chega enquanto o sync agendado ainda roda
+    def sync():
+        internos.append(coordinator.run_once(lambda: ['x'], origem='manual'))
+        return []
+
+    coordinator.run_once(sync)
+    assert internos == [None]
+    assert coordinator.metrics.ignoradas == 1
+
+
+def test_intervalo_adaptativo(tmp_path):
+    coordinator = SyncCoordinator(FileLease(str(tmp_path / 'sync.lock')), min_interval=5, max_interval=20)
+
+    coordinator.run_once(lambda: [])
+    assert coordinator.metrics.intervalo == 7.5
+    for _ in range(5):
+        coordinator.run_once(lambda: [])
+    assert coordinator.metrics.intervalo == 20
+
+    # Emails chegando: volta ao mínimo
+    coordinator.run_once(lambda: ['a', 'b'])
+    assert coordinator.metrics.intervalo == 5
+
+    def falha():
+        raise RuntimeError('IMAP fora do ar')
+
+    with pytest.raises(RuntimeError):
+        coordinator.run_once(falha)
+    metrics = coordinator.metrics.to_dict()
+    assert metrics['intervalo'] == 10 and metrics['erros'] == 1
+    assert metrics['ultima']['erro'] == 'IMAP fora do ar'
+    # O lease foi solto mesmo com erro
+    assert coordinator.run_once(lambda: []) == []
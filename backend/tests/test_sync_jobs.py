@@ -0,0 +1,68 @@
+# test_sync_jobs.py
+import threading
+from models.mailbox import Mailbox
+from services.sync_jobs import SyncJobManager
+
+
+class FakeRunner:
+    def __init__(self, caixas, falhar=False):
+        self.caixas = caixas
+        self.falhar = falhar
+        self.liberar = threading.Event()
+        self.iniciou = threading.Event()
+        self.passadas = 0
+
+    def reload(self):
+        return [Mailbox(endereco=c) for c in self.caixas]
+
+    def sync_all(self, origem='manual', on_result=None, reload=True):
+        self.passadas += 1
+        self.iniciou.set()
+        self.liberar.wait(5)
+        if self.falhar:
+            raise RuntimeError('Firestore indisponível')
+        on_result('a@x.com/INBOX', {'status': 'ok', 'emails': ['e1', 'e2']})
+        on_result('b@x.com/INBOX', {'status': 'erro', 'erro': 'LOGIN falhou'})
+
+
+def _esperar(jobs, job):
+    jobs._executor.submit(lambda: None).result(5)
+    return jobs.get(job.id)
+
+
+def test_trigger_durante_execucao_mescla_e_repete():
+    runner = FakeRunner(['a@x.com', 'b@x.com'])
+    jobs = SyncJobManager(runner)
+
+    job, criado = jobs.trigger()
+    assert criado and job.status in ('na_fila', 'executando')
+    runner.iniciou.wait(5)
+    durante = jobs.snapshot(job.id)
+    mesmo, criado = jobs.trigger()
+    assert mesmo is job and not criado
+    runner.liberar.set()
+
+    job = _esperar(jobs, job)
+    dados = jobs.snapshot(job.id)
+    # Cópia: o que já foi lido não muda com o andamento do job
+    assert durante['status'] == 'executando' and durante['caixas']['a@x.com/INBOX']['status'] == 'na_fila'
+    assert dados['status'] == 'concluido' and dados['gatilhos'] == 2 and dados['passadas'] == 2
+    assert runner.passadas == 2
+    assert dados['total_caixas'] == 2 and dados['caixas_concluidas'] == 2 and dados['erros'] == 1
+    assert dados['emails'] == 4 and dados['caixas']['a@x.com/INBOX']['novos'] == 4
+    # Job concluído: o próximo trigger abre outro
+    novo, criado = jobs.trigger()
+    assert criado and novo.id != job.id
+
+
+def test_falha_do_job():
+    runner = FakeRunner(['a@x.com'], falhar=True)
+    runner.liberar.set()
+    jobs = SyncJobManager(runner)
+
+    job, _ = jobs.trigger()
+    job = _esperar(jobs, job)
+
+    assert job.status == 'falhou' and job.erro == 'Firestore indisponível'
+    assert job.concluido_em is not None
+    assert jobs.get('inexistente') is None and jobs.snapshot('inexistente') is None
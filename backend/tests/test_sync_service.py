@@ -0,0 +1,77 @@
+# test_sync_service.py
+from datetime import datetime
+from models.email import Email
+from models.sync_checkpoint import SyncCheckpoint
+from services.sync_service import SyncService
+
+
+class FakeImap:
+    mailbox = 'caixa@empresa.com/INBOX'
+
+    def __init__(self, mensagens, checkpoint):
+        self.mensagens = mensagens
+        self.checkpoint = checkpoint
+        self.recebido = None
+
+    def fetch_raw_emails(self, checkpoint=None):
+        self.recebido = checkpoint
+        return self.mensagens, self.checkpoint
+
+    def parse_message(self, uidvalidity, uid, partes):
+        # Mensagens do fake já vêm convertidas
+        return partes
+
+
+class FakeEmailService:
+    def __init__(self, duplicados=(), falhas=()):
+        self.duplicados = set(duplicados)
+        self.falhas = set(falhas)
+        self.criados = []
+
+    def create_emails(self, emails):
+        if any(e.message_id in self.falhas for e in emails):
+            raise RuntimeError('falha de rede')
+        criados = [e for e in emails if e.message_id not in self.duplicados]
+        self.criados.extend(e.message_id for e in criados)
+        return criados, [e for e in emails if e.message_id in self.duplicados]
+
+
+class FakeSyncState:
+    def __init__(self, checkpoint=None):
+        self.checkpoint = checkpoint
+
+    def get(self, mailbox):
+        return self.checkpoint
+
+    def save(self, checkpoint):
+        self.checkpoint = checkpoint
+
+
+def mensagem(uid):
+    return uid, Email(remetente='a@b.com', destinatario='c@d.com', assunto=f'{uid}',
+                      corpo='', data=datetime.now(), message_id=f'<{uid}@b.com>')
+
+
+def test_avanca_checkpoint_e_ignora_duplicados():
+    anterior = SyncCheckpoint('caixa@empresa.com/INBOX', 7, 10)
+    imap = FakeImap([mensagem(11), mensagem(12)], SyncCheckpoint('caixa@empresa.com/INBOX', 7, 12))
+    state = FakeSyncState(anterior)
+    emails = FakeEmailService(duplicados={'<11@b.com>'})
+
+    salvos = SyncService(imap, emails, state).sync()
+
+    assert imap.recebido == anterior
+    assert [e.message_id for e in salvos] == ['<12@b.com>']
+    assert state.checkpoint.last_uid == 12
+
+
+def test_falha_para_checkpoint_antes_do_lote():
+    imap = FakeImap([mensagem(5), mensagem(6), mensagem(7), mensagem(8)],
+                    SyncCheckpoint('caixa@empresa.com/INBOX', 7, 8))
+    state = FakeSyncState()
+    emails = FakeEmailService(falhas={'<7@b.com>'})
+
+    SyncService(imap, emails, state, batch_size=2).sync()
+
+    assert emails.criados == ['<5@b.com>', '<6@b.com>']
+    assert state.checkpoint.last_uid == 6
@@ -0,0 +1,52 @@
+# utils/email_export.py
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterable, Iterator, List
+from models.email import Email
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def ndjson_lines(emails: Iterable[Email], fields: List[str]) -> Iterator[str]:
+    """Um objeto JSON por linha, na ordem em que os emails chegam"""
+    for email in emails:
+        yield json.dumps(email.to_dict(fields), ensure_ascii=False, default=_json_default) + '\n'
+
+
+def csv_lines(emails: Iterable[Email], fields: List[str]) -> Iterator[str]:
+    """Cabeçalho (id + fields) e uma linha CSV por email; listas/dicts viram JSON"""
+    colunas = ['id'] + [field for field in fields if field != 'id']
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def linha(valores) -> str:
+        writer.writerow(valores)
+        texto = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return texto
+
+    yield linha(colunas)
+
+    for email in emails:
+        data = email.to_dict(fields)
+        valores = []
+        for coluna in colunas:
+            valor = data.get(coluna)
+            if isinstance(valor, datetime):
+                valor = valor.isoformat()
+            elif isinstance(valor, (list, dict)):
+                valor = json.dumps(valor, ensure_ascii=False, default=_json_default)
+            valores.append('' if valor is None else valor)
+        yield linha(valores)
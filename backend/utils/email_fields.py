@@ -0,0 +1,50 @@
+# utils/email_fields.py
+from typing import List, Optional
+
+# Campos do documento de email que podem ser pedidos em ?fields=
+EMAIL_FIELDS = (
+    'remetente', 'destinatario', 'destinatarios', 'assunto', 'corpo', 'data',
+    'estado', 'municipio', 'categoria', 'classificado', 'message_id',
+    'corpo_ref', 'preview', 'anexos', 'conteudo_hash', 'simhash', 'duplicado_de', 'copias',
+    'estado_sugerido', 'municipio_sugerido', 'confianca_sugestao',
+)
+
+# Padrão das listagens: tudo que as telas de lista mostram, sem o corpo
+# nem campos internos
+LIST_FIELDS = tuple(
+    field for field in EMAIL_FIELDS
+    if field not in ('corpo', 'corpo_ref', 'conteudo_hash', 'simhash')
+)
+
+# Padrão da exportação: a caixa completa, com o corpo, sem campos internos
+EXPORT_FIELDS = tuple(
+    field for field in EMAIL_FIELDS
+    if field not in ('corpo_ref', 'conteudo_hash', 'simhash')
+)
+
+
+def parse_fields(raw: Optional[str], default=LIST_FIELDS) -> List[str]:
+    """
+    Lê o parâmetro `fields` (lista separada por vírgulas ou 'all').
+    `data` é sempre incluído porque o cursor de paginação depende dele;
+    o id do documento sempre acompanha a resposta.
+    Levanta ValueError para campos desconhecidos.
+    """
+    if raw is None or raw.strip() == '':
+        fields = list(default)
+    elif raw.strip() == 'all':
+        fields = list(EMAIL_FIELDS)
+    else:
+        fields = []
+        for field in raw.split(','):
+            field = field.strip()
+            if not field or field == 'id' or field in fields:
+                continue
+            if field not in EMAIL_FIELDS:
+                raise ValueError(f"Campo '{field}' inválido em 'fields'")
+            fields.append(field)
+
+    if 'data' not in fields:
+        fields.append('data')
+
+    return fields
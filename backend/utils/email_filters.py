@@ -0,0 +1,62 @@
+# utils/email_filters.py
+from datetime import datetime, timedelta, timezone
+
+# Campos de igualdade aceitos na query string (mesmo nome do campo no Firestore)
+EQUALITY_FIELDS = ('estado', 'municipio', 'categoria', 'remetente')
+
+# status do frontend -> valor de `classificado`
+STATUS_VALUES = {
+    'pending': False,
+    'classified': True,
+}
+
+
+def _parse_date(raw: str, name: str, end_of_day: bool = False) -> datetime:
+    """
+    Converte data ISO-8601 (YYYY-MM-DD ou data/hora completa) em datetime UTC.
+    Para o fim do intervalo, uma data sem hora cobre o dia inteiro.
+    """
+    try:
+        value = datetime.fromisoformat(raw)
+    except ValueError:
+        raise ValueError(f"Parâmetro '{name}' deve estar no formato ISO-8601")
+
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+
+    if end_of_day and len(raw) == 10:
+        value += timedelta(days=1)
+
+    return value
+
+
+def parse_email_filters(args) -> dict:
+    """
+    Lê os filtros de listagem da query string:
+    estado, municipio, categoria, remetente, status (pending|classified),
+    data_inicio e data_fim. Levanta ValueError para valores inválidos.
+    """
+    filters = {}
+
+    for field in EQUALITY_FIELDS:
+        value = args.get(field)
+        if value and value != 'all':
+            filters[field] = value
+
+    status = args.get('status')
+    if status and status != 'all':
+        if status not in STATUS_VALUES:
+            raise ValueError("Parâmetro 'status' deve ser 'pending' ou 'classified'")
+        filters['classificado'] = STATUS_VALUES[status]
+
+    data_inicio = args.get('data_inicio')
+    if data_inicio:
+        filters['data_inicio'] = _parse_date(data_inicio, 'data_inicio')
+
+    data_fim = args.get('data_fim')
+    if data_fim:
+        # data_fim é exclusivo quando vem com hora; com apenas a data inclui o dia
+        filters['data_fim'] = _parse_date(data_fim, 'data_fim', end_of_day=True)
+
+    return filters
+
@@ -1,44 +1,101 @@
 # utils/email_parser.py
 import re
-from typing import Tuple, Optional
+from email.header import decode_header, make_header
+from email.utils import getaddresses
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+# Endereço solto no texto (cabeçalhos fora do padrão, sem '<>' nem vírgulas corretas)
+_EMAIL_ONLY = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+# Palavra codificada RFC 2047: =?charset?B|Q?texto?=
+_ENCODED_WORD = re.compile(r'=\?[^?]+\?[bBqQ]\?[^?]*\?=')
+
+# Cabeçalhos distintos memorizados (remetentes se repetem muito no sync)
+CACHE_SIZE = 4096
+
+
+def decode_header_value(raw) -> str:
+    """
+    Decodifica um cabeçalho com palavras RFC 2047
+    ('=?utf-8?q?Jo=C3=A3o?=' -> 'João'); charsets inválidos viram '?'
+    """
+    if raw is None:
+        return ''
+    texto = str(raw)
+    if not _ENCODED_WORD.search(texto):
+        return texto
+    try:
+        return str(make_header(decode_header(texto)))
+    except (LookupError, UnicodeError, ValueError):
+        partes = []
+        for valor, charset in decode_header(texto):
+            if isinstance(valor, bytes):
+                try:
+                    valor = valor.decode(charset or 'ascii', errors='replace')
+                except LookupError:
+                    valor = valor.decode('latin-1')
+            partes.append(valor)
+        return ''.join(partes)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse(raw: str) -> Tuple[Tuple[str, Optional[str]], ...]:
+    enderecos = []
+    # Divide antes de decodificar: nomes decodificados podem conter vírgulas
+    for nome, email in getaddresses([raw]):
+        email = email.strip()
+        if '@' not in email:
+            continue
+        nome = ' '.join(decode_header_value(nome).split()).strip('"\' ')
+        enderecos.append((email, nome or None))
+
+    if not enderecos:
+        enderecos = [(email, None) for email in _EMAIL_ONLY.findall(decode_header_value(raw))]
+    return tuple(enderecos)
+
 
 class EmailParser:
-    """Utilitário para parsear emails"""
-    
+    """Utilitário para parsear cabeçalhos de endereço (From, To, Cc)"""
+
     @staticmethod
-    def extract_email_and_name(raw_email: str) -> Tuple[str, Optional[str]]:
+    def parse_addresses(raw) -> List[Tuple[str, Optional[str]]]:
+        """
+        Todos os endereços de um cabeçalho, com os nomes decodificados:
+        '"Silva, Ana" <ana@x.com>, =?utf-8?q?Jo=C3=A3o?= <joao@x.com>'
+        -> [('ana@x.com', 'Silva, Ana'), ('joao@x.com', 'João')]
         """
-        Extrai email e nome de strings como:
+        if not raw:
+            return []
+        return list(_parse(str(raw)))
+
+    @staticmethod
+    def extract_email_and_name(raw_email) -> Tuple[str, Optional[str]]:
+        """
+        Primeiro endereço do cabeçalho e seu nome, de strings como:
         - "FELIPE SILVA <fs0987145@gmail.com>"
         - "fs0987145@gmail.com"
         - "<fs0987145@gmail.com>"
-        
-        Agora, se vier apenas um email, gera automaticamente um nome:
-        fs0987145@gmail.com → FS
-        """
-
-        # 1) Padrão: Nome <email@exemplo.com>
-        pattern_with_name = r'([^<]*?)\s*<([^>]+)>'
-        match = re.search(pattern_with_name, raw_email)
 
-        if match:
-            nome = match.group(1).strip().strip('"')
-            email = match.group(2).strip()
-            print("1",email, nome )
-            return (email, nome if nome else None)
-
-        # 2) Padrão: apenas email
-        pattern_email_only = r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
-        match = re.search(pattern_email_only, raw_email)
+        Endereço sem nome e sem <>, gera um a partir das duas primeiras letras:
+        fs0987145@gmail.com → FS ("<fs0987145@gmail.com>" fica sem nome)
+        """
+        enderecos = EmailParser.parse_addresses(raw_email)
+        if not enderecos:
+            # Se não encontrar nada, retorna o raw mesmo
+            return (str(raw_email or '').strip(), None)
 
-        if match:
-            email = match.group(1).strip()
+        email, nome = enderecos[0]
+        if nome or f'<{email}>' in str(raw_email):
+            return (email, nome)
+        prefix = email.split('@')[0][:2]
+        return (email, prefix.upper() if prefix else None)
 
-            # Geração automática do nome a partir das duas primeiras letras
-            prefix = email.split("@")[0][:2]  # primeiras duas letras antes do @
-            nome_auto = prefix.upper() if prefix else None
-            print("2",email, nome_auto )
-            return (email, nome_auto)
+    @staticmethod
+    def extract_many(raws: Iterable) -> List[Tuple[str, Optional[str]]]:
+        """extract_email_and_name para vários cabeçalhos (ex.: remetentes de um lote do sync)"""
+        return [EmailParser.extract_email_and_name(raw) for raw in raws]
 
-        # 3) Se não encontrar nada, retorna o raw mesmo
-        return (raw_email.strip(), None)
\ No newline at end of file
+    @staticmethod
+    def cache_info():
+        """Acertos/erros do cache de cabeçalhos (functools.lru_cache)"""
+        return _parse.cache_info()
@@ -0,0 +1,121 @@
+# utils/email_stats.py
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+from models.email import Email
+
+# Contadores mapeados por chave. `destinatarios` não fica no documento de
+# estatísticas (cresce com cada endereço novo): vai para coleção/tabela própria
+MAP_FIELDS = ('emails_por_estado', 'destinatarios', 'emails_por_dia')
+
+# Janela do dashboard (emails dos últimos dias); baldes diários mais antigos são descartados
+RECENT_DAYS = 7
+# Dias antes da janela apagados a cada incremento (Firestore grava sem ler o documento);
+# pausas mais longas na ingestão deixam baldes para o rebuild-stats
+EXPIRED_DAYS = 30
+
+
+def day_key(data: datetime) -> str:
+    """Chave do balde diário (YYYY-MM-DD em UTC)"""
+    if data.tzinfo is None:
+        data = data.replace(tzinfo=timezone.utc)
+    return data.astimezone(timezone.utc).date().isoformat()
+
+
+def email_contribution(email: Email) -> dict:
+    """Quanto um email soma em cada contador do documento de estatísticas"""
+    classificado = bool(email.classificado)
+    contribution = {
+        'total': 1,
+        'classificados': 1 if classificado else 0,
+        'pendentes': 0 if classificado else 1,
+        'emails_por_estado': {},
+        'destinatarios': {},
+        'emails_por_dia': {},
+    }
+    
+    # Cópias marcadas (DUPLICATE_POLICY=flag) não contam
+    if email.duplicado_de:
+        return {field: ({} if isinstance(value, dict) else 0) for field, value in contribution.items()}
+
+    if email.estado:
+        contribution['emails_por_estado'][email.estado] = 1
+    if email.destinatario:
+        contribution['destinatarios'][email.destinatario] = 1
+    if email.data:
+        contribution['emails_por_dia'][day_key(email.data)] = 1
+
+    return contribution
+
+
+def stats_delta(old: Optional[Email], new: Optional[Email]) -> dict:
+    """
+    Diferença nos contadores ao trocar `old` por `new`
+    (old=None para criação, new=None para exclusão). Chaves com delta 0 são omitidas.
+    """
+    delta = {}
+    before = email_contribution(old) if old else {}
+    after = email_contribution(new) if new else {}
+
+    for field in ('total', 'classificados', 'pendentes'):
+        value = after.get(field, 0) - before.get(field, 0)
+        if value:
+            delta[field] = value
+
+    for field in MAP_FIELDS:
+        keys = set(before.get(field, {})) | set(after.get(field, {}))
+        values = {}
+        for key in keys:
+            value = after.get(field, {}).get(key, 0) - before.get(field, {}).get(key, 0)
+            if value:
+                values[key] = value
+        if values:
+            delta[field] = values
+
+    return delta
+
+
+def merge_delta(total: dict, delta: dict) -> dict:
+    """Acumula `delta` em `total` (in-place) e retorna `total`"""
+    for field, value in delta.items():
+        if isinstance(value, dict):
+            bucket = total.setdefault(field, {})
+            for key, count in value.items():
+                bucket[key] = bucket.get(key, 0) + count
+        else:
+            total[field] = total.get(field, 0) + value
+    return total
+
+
+def build_stats(emails: Iterable[Email]) -> dict:
+    """Recalcula o documento de estatísticas do zero"""
+    stats = {
+        'total': 0,
+        'classificados': 0,
+        'pendentes': 0,
+        'emails_por_estado': {},
+        'destinatarios': {},
+        'emails_por_dia': {},
+    }
+    for email in emails:
+        merge_delta(stats, stats_delta(None, email))
+    return stats
+
+
+def count_last_days(emails_por_dia: dict, days: int = RECENT_DAYS, now: Optional[datetime] = None) -> int:
+    """Soma os baldes diários dos últimos `days` dias (incluindo hoje)"""
+    now = now or datetime.now(timezone.utc)
+    inicio = day_key(now - timedelta(days=days - 1))
+    return sum(count for key, count in emails_por_dia.items() if key >= inicio)
+
+
+def expired_days(days: int = RECENT_DAYS, span: int = EXPIRED_DAYS, now: Optional[datetime] = None) -> List[str]:
+    """Chaves dos `span` dias imediatamente antes da janela de `days` dias"""
+    now = now or datetime.now(timezone.utc)
+    return [day_key(now - timedelta(days=days + n)) for n in range(span)]
+
+
+def stale_days(emails_por_dia: dict, days: int = RECENT_DAYS, now: Optional[datetime] = None) -> List[str]:
+    """Chaves dos baldes diários fora da janela de `days` dias (a descartar)"""
+    now = now or datetime.now(timezone.utc)
+    inicio = day_key(now - timedelta(days=days - 1))
+    return sorted(key for key in emails_por_dia if key < inicio)
@@ -0,0 +1,100 @@
+# utils/fingerprint.py
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+from utils.text_normalize import tokenize
+
+# Prefixos de resposta/encaminhamento ignorados no assunto (RE:, FW:, ENC:, RES:...)
+_PREFIXO_ASSUNTO = re.compile(r'^\s*((re|res|fw|fwd|enc|tr)\s*:\s*)+', re.IGNORECASE)
+
+# Texto considerado no fingerprint (limita o custo de corpos enormes)
+MAX_CHARS = 20000
+SIMHASH_BITS = 64
+# 64 bits em 8 faixas de 8: dois SimHash a distância <= 7 coincidem em ao menos uma faixa
+BANDS = 8
+BAND_BITS = SIMHASH_BITS // BANDS
+
+
+@dataclass
+class Fingerprint:
+    """Hash exato do conteúdo normalizado + SimHash para quase-duplicados"""
+    exact: str
+    simhash: int
+    tokens: int
+
+    def bands(self) -> List[int]:
+        """Chaves LSH: (número da faixa << BAND_BITS) | valor da faixa"""
+        mask = (1 << BAND_BITS) - 1
+        return [(band << BAND_BITS) | ((self.simhash >> (band * BAND_BITS)) & mask) for band in range(BANDS)]
+
+
+def normalize_subject(assunto: str) -> str:
+    return _PREFIXO_ASSUNTO.sub('', assunto or '')
+
+
+def _shingle_hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(tokens: List[str]) -> int:
+    """
+    SimHash de 64 bits sobre o conjunto de palavras. Em textos do tamanho
+    de um email, trigramas mudam demais com uma palavra editada (~9 bits
+    em 45 palavras); palavras isoladas ficam em 3-8 bits, e textos
+    distintos seguem a 20+ bits.
+    """
+    shingles = set(tokens)
+    if not shingles:
+        return 0
+
+    hashes = [_shingle_hash(shingle) for shingle in shingles]
+    metade = len(hashes) / 2
+    valor = 0
+    for bit in range(SIMHASH_BITS):
+        # Bit de saída = maioria das palavras com esse bit ligado
+        if sum((h >> bit) & 1 for h in hashes) > metade:
+            valor |= 1 << bit
+    return valor
+
+
+def fingerprint(assunto: str, corpo: str) -> Fingerprint:
+    """
+    Fingerprint de assunto + corpo normalizados (sem acentos, caixa,
+    pontuação, prefixos RE:/FW: e linhas citadas com '>')
+    """
+    corpo = '\n'.join(
+        linha for linha in (corpo or '')[:MAX_CHARS].splitlines()
+        if not linha.lstrip().startswith('>')
+    )
+    tokens = tokenize(normalize_subject(assunto)) + tokenize(corpo)
+    exact = hashlib.sha1(' '.join(tokens).encode('utf-8')).hexdigest()
+    return Fingerprint(exact=exact, simhash=simhash(tokens), tokens=len(tokens))
+
+
+def attachments_hash(anexos: Optional[List[dict]]) -> str:
+    """
+    Hash dos anexos de um email: refs do BodyStore (sha256 do conteúdo),
+    ou nome e tamanho dos descartados/sem conteúdo, em qualquer ordem
+    """
+    chaves = sorted(
+        anexo.get('ref') or f"{anexo.get('nome')}:{anexo.get('tamanho')}"
+        for anexo in anexos or []
+    )
+    return hashlib.sha1('\n'.join(chaves).encode('utf-8')).hexdigest()
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def is_copy(fp: Fingerprint, remetente: Optional[str], outro: Fingerprint, outro_remetente: Optional[str],
+            min_tokens: int, max_distance: int) -> bool:
+    """
+    `fp` é cópia de `outro`? Textos curtos (< min_tokens) só pelo hash
+    exato e do mesmo remetente (assuntos curtos se repetem entre pessoas);
+    os demais pelo hash exato ou SimHash a distância <= max_distance.
+    """
+    if fp.tokens < min_tokens or outro.tokens < min_tokens:
+        return fp.exact == outro.exact and remetente == outro_remetente
+    return fp.exact == outro.exact or hamming(fp.simhash, outro.simhash) <= max_distance
@@ -0,0 +1,180 @@
+# utils/gazetteer.py
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from utils.localidades import ESTADOS, MUNICIPIOS_POR_ESTADO
+from utils.text_normalize import tokenize
+
+# Nomes que também são palavras comuns ('natal', 'serra', 'para'...): só
+# contam acompanhados da UF ('Natal/RN') ou, para estados, de 'estado do'
+AMBIGUOS = {
+    'natal', 'serra', 'patos', 'lagarto', 'vitoria', 'santana', 'picos', 'timon',
+    'estancia', 'caxias', 'sao jose', 'santa rita', 'santa maria', 'cascavel', 'para',
+}
+
+# Peso de uma menção conforme onde aparece
+PESO_ASSUNTO = 3
+PESO_ASSINATURA = 2
+PESO_CORPO = 1
+# Peso de evidência a partir do qual a confiança não é mais reduzida
+SATURACAO = 4
+# Texto do corpo considerado (limita o custo de corpos enormes)
+MAX_CHARS = 20000
+LINHAS_ASSINATURA = 6
+
+
+@dataclass
+class Localidade:
+    """Um padrão do gazetteer: estado (municipio=None) ou município"""
+    uf: str
+    municipio: Optional[str] = None
+    com_uf: bool = False  # Padrão inclui a sigla ('Teresina PI')
+
+
+@dataclass
+class Sugestao:
+    """Estado/município sugeridos para um email, com confiança entre 0 e 1"""
+    estado: str
+    municipio: Optional[str]
+    confianca: float
+
+
+class Gazetteer:
+    """
+    Autômato de Aho-Corasick sobre tokens (palavras normalizadas) com os
+    nomes de estados e municípios: uma passada pelo texto encontra todas as
+    menções, respeitando limites de palavra.
+    """
+
+    def __init__(self, padroes: Iterable[Tuple[List[str], Localidade]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Localidade]]] = [[]]
+
+        for tokens, localidade in padroes:
+            estado = 0
+            for token in tokens:
+                proximo = self._goto[estado].get(token)
+                if proximo is None:
+                    proximo = len(self._goto)
+                    self._goto[estado][token] = proximo
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                estado = proximo
+            self._out[estado].append((len(tokens), localidade))
+
+        # Links de falha em largura; cada estado herda as saídas do seu link
+        fila = deque(self._goto[0].values())
+        while fila:
+            estado = fila.popleft()
+            for token, proximo in self._goto[estado].items():
+                fila.append(proximo)
+                falha = self._fail[estado]
+                while falha and token not in self._goto[falha]:
+                    falha = self._fail[falha]
+                self._fail[proximo] = self._goto[falha].get(token, 0)
+                self._out[proximo] = self._out[proximo] + self._out[self._fail[proximo]]
+
+    def scan(self, tokens: List[str]) -> List[Tuple[int, int, Localidade]]:
+        """
+        Menções em `tokens` como (início, fim, localidade). Entre menções
+        sobrepostas vale a mais à esquerda e mais longa ('Mato Grosso do
+        Sul' não conta 'Mato Grosso'); nomes iguais de estado e município
+        ('São Paulo') rendem as duas.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        encontrados = []
+        estado = 0
+        for fim, token in enumerate(tokens, 1):
+            while estado and token not in goto[estado]:
+                estado = fail[estado]
+            estado = goto[estado].get(token, 0)
+            for tamanho, localidade in out[estado]:
+                encontrados.append((fim - tamanho, fim, localidade))
+
+        encontrados.sort(key=lambda m: (m[0], m[0] - m[1]))
+        mencoes = []
+        limite = 0
+        for inicio, fim, localidade in encontrados:
+            if inicio >= limite:
+                mencoes.append((inicio, fim, localidade))
+                limite = fim
+            elif mencoes and (inicio, fim) == mencoes[-1][:2]:
+                mencoes.append((inicio, fim, localidade))
+        return mencoes
+
+    def suggest(self, assunto: str, corpo: str) -> Optional[Sugestao]:
+        """Estado/município mais citados em assunto, corpo e assinatura (None sem menções)"""
+        corpo, assinatura = _split_signature(corpo)
+        estados: Dict[str, float] = {}
+        municipios: Dict[Tuple[str, str], float] = {}
+
+        for texto, peso in ((assunto, PESO_ASSUNTO), (corpo, PESO_CORPO), (assinatura, PESO_ASSINATURA)):
+            for _, _, localidade in self.scan(tokenize(texto)):
+                # Menção com a UF é evidência mais forte
+                valor = peso * 2 if localidade.com_uf else peso
+                estados[localidade.uf] = estados.get(localidade.uf, 0) + valor
+                if localidade.municipio:
+                    chave = (localidade.uf, localidade.municipio)
+                    municipios[chave] = municipios.get(chave, 0) + valor
+
+        if not estados:
+            return None
+
+        uf = max(estados, key=estados.get)
+        candidatos = {nome: valor for (estado, nome), valor in municipios.items() if estado == uf}
+        municipio = max(candidatos, key=candidatos.get) if candidatos else None
+
+        # Fatia do estado vencedor na evidência total, reduzida quando há pouca evidência
+        confianca = estados[uf] / sum(estados.values()) * min(1.0, estados[uf] / SATURACAO)
+        return Sugestao(estado=uf, municipio=municipio, confianca=round(confianca, 2))
+
+
+def _split_signature(corpo: str) -> Tuple[str, str]:
+    """(corpo, assinatura): a assinatura vem após '--' ou são as últimas linhas"""
+    linhas = [
+        linha for linha in (corpo or '')[:MAX_CHARS].splitlines()
+        if not linha.lstrip().startswith('>')
+    ]
+    for i in range(len(linhas) - 1, -1, -1):
+        if linhas[i].strip() in ('--', '-- '):
+            return '\n'.join(linhas[:i]), '\n'.join(linhas[i + 1:])
+    corte = max(0, len(linhas) - LINHAS_ASSINATURA)
+    return '\n'.join(linhas[:corte]), '\n'.join(linhas[corte:])
+
+
+def _padroes() -> List[Tuple[List[str], Localidade]]:
+    padroes = []
+    for uf, nome in ESTADOS.items():
+        tokens = tokenize(nome)
+        if ' '.join(tokens) not in AMBIGUOS:
+            padroes.append((tokens, Localidade(uf)))
+        padroes.append((['estado', 'do'] + tokens, Localidade(uf, com_uf=True)))
+        padroes.append((['estado', 'de'] + tokens, Localidade(uf, com_uf=True)))
+
+    for uf, municipios in MUNICIPIOS_POR_ESTADO.items():
+        for municipio in municipios:
+            tokens = tokenize(municipio)
+            if ' '.join(tokens) not in AMBIGUOS:
+                padroes.append((tokens, Localidade(uf, municipio)))
+            # 'Teresina/PI', 'Teresina - PI', 'Teresina (PI)'
+            padroes.append((tokens + [uf.lower()], Localidade(uf, municipio, com_uf=True)))
+    return padroes
+
+
+# Construído uma vez por processo, no primeiro uso
+_gazetteer = None
+
+def get_gazetteer() -> Gazetteer:
+    """Gazetteer com ESTADOS e MUNICIPIOS_POR_ESTADO"""
+    global _gazetteer
+
+    if _gazetteer is None:
+        _gazetteer = Gazetteer(_padroes())
+
+    return _gazetteer
+
+
+def suggest_location(assunto: str, corpo: str) -> Optional[Sugestao]:
+    return get_gazetteer().suggest(assunto, corpo)
@@ -0,0 +1,340 @@
+# utils/mime_extract.py
+import binascii
+import codecs
+import html
+import re
+from dataclasses import dataclass, field
+from email.message import Message
+from email.parser import BytesFeedParser
+from typing import Iterable, Iterator, List, Optional, Tuple
+from config import Config
+from utils.email_parser import decode_header_value
+
+# Linhas sem quebra acima disso são entregues em pedaços (binário sem \n)
+MAX_LINE_BYTES = 64 * 1024
+
+_NAO_BASE64 = re.compile(rb'[^A-Za-z0-9+/=]')
+
+# HTML -> texto: remove blocos invisíveis, quebra linha nos blocos, tira as tags
+_HTML_INVISIVEL = re.compile(r'<(script|style|head|title)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_HTML_COMENTARIO = re.compile(r'<!--.*?-->', re.DOTALL)
+_HTML_QUEBRA = re.compile(r'<\s*(br|/p|/div|/tr|/h[1-6]|/li|/table|p|div|tr|li|h[1-6])\b[^>]*>', re.IGNORECASE)
+_HTML_TAG = re.compile(r'<[^>]+>')
+_ESPACOS = re.compile(r'[ \t\r\f\v\xa0]+')
+_LINHAS_VAZIAS = re.compile(r'\n\s*\n+')
+
+
+def html_to_text(texto_html: str) -> str:
+    """Conversão rápida de HTML para texto (sem montar DOM)"""
+    texto = _HTML_COMENTARIO.sub('', texto_html)
+    texto = _HTML_INVISIVEL.sub('', texto)
+    texto = _HTML_QUEBRA.sub('\n', texto)
+    texto = html.unescape(_HTML_TAG.sub('', texto))
+    texto = '\n'.join(_ESPACOS.sub(' ', linha).strip() for linha in texto.split('\n'))
+    return _LINHAS_VAZIAS.sub('\n\n', texto).strip()
+
+
+def decode_text(dados: bytes, charset: Optional[str]) -> str:
+    """
+    Bytes de uma parte de texto -> str. Usa o charset declarado; sem ele
+    (ou desconhecido), tenta UTF-8 e cai para cp1252, comum em clientes antigos.
+    """
+    if charset:
+        try:
+            codecs.lookup(charset)
+            return dados.decode(charset, errors='replace')
+        except LookupError:
+            pass
+    try:
+        return dados.decode('utf-8')
+    except UnicodeDecodeError:
+        return dados.decode('cp1252', errors='replace')
+
+
+@dataclass
+class ExtractedMessage:
+    """Resultado da extração: cabeçalhos do topo, corpo em texto e anexos"""
+    headers: Message
+    corpo: str = ''
+    anexos: List[dict] = field(default_factory=list)
+    truncado: bool = False  # Algum texto passou de MIME_MAX_TEXT_BYTES
+
+
+class MimeExtractor:
+    """
+    Extração incremental de mensagens MIME: lê a mensagem linha a linha
+    (a partir dos pedaços que o IMAP entrega), decodifica base64/quoted-
+    printable aos poucos e nunca monta a árvore inteira em memória.
+    - Cabeçalhos de cada parte: BytesFeedParser, alimentado linha a linha
+      (até MIME_MAX_HEADER_BYTES).
+    - Texto (text/plain, text/html): até MIME_MAX_TEXT_BYTES por parte.
+    - Anexos: direto para o BodyStore (BlobWriter); acima de
+      MIME_MAX_ATTACHMENT_BYTES são descartados e ficam só os metadados.
+    """
+
+    def __init__(self, store=None, max_text_bytes: Optional[int] = None,
+                 max_attachment_bytes: Optional[int] = None, max_header_bytes: Optional[int] = None,
+                 max_depth: Optional[int] = None):
+        self.store = store
+        self.max_text_bytes = max_text_bytes or Config.MIME_MAX_TEXT_BYTES
+        self.max_attachment_bytes = max_attachment_bytes or Config.MIME_MAX_ATTACHMENT_BYTES
+        self.max_header_bytes = max_header_bytes or Config.MIME_MAX_HEADER_BYTES
+        self.max_depth = max_depth or Config.MIME_MAX_DEPTH
+
+    def extract(self, chunks: Iterable[bytes]) -> ExtractedMessage:
+        """Extrai a mensagem a partir dos pedaços de bytes (ex.: HEADER + TEXT do FETCH)"""
+        leitor = _Leitor(chunks)
+        partes = _Partes()
+        headers = self._parse_part(leitor, (), 0, partes)
+
+        # Corpo: primeiro text/plain com conteúdo; senão o HTML convertido
+        corpo = partes.plain.strip() and partes.plain
+        if not corpo and partes.html:
+            corpo = html_to_text(partes.html)
+        return ExtractedMessage(headers=headers, corpo=corpo or '', anexos=partes.anexos, truncado=partes.truncado)
+
+    def _parse_part(self, leitor: '_Leitor', fronteiras: Tuple[bytes, ...], profundidade: int,
+                    partes: '_Partes') -> Message:
+        """
+        Lê uma parte (cabeçalhos + corpo) até a próxima fronteira de um
+        multipart ancestral; a fronteira encontrada fica em leitor.fronteira
+        """
+        headers = self._read_headers(leitor)
+
+        boundary = headers.get_boundary() if headers.get_content_maintype() == 'multipart' else None
+        if boundary and profundidade < self.max_depth:
+            propria = boundary.encode('ascii', errors='replace')
+            internas = fronteiras + (propria,)
+            # Preâmbulo, depois uma parte por fronteira até o fechamento (--boundary--)
+            leitor.read_until_boundary(internas, _Descarte())
+            while leitor.fronteira == propria and not leitor.fechamento:
+                self._parse_part(leitor, internas, profundidade + 1, partes)
+            if leitor.fronteira == propria:
+                # Epílogo até a fronteira de um multipart ancestral
+                leitor.read_until_boundary(fronteiras, _Descarte())
+            return headers
+
+        destino = self._sink(headers, partes)
+        leitor.read_until_boundary(fronteiras, destino)
+        destino.close()
+        return headers
+
+    def _read_headers(self, leitor: '_Leitor') -> Message:
+        parser = BytesFeedParser()
+        total = 0
+        for linha in leitor:
+            if linha in (b'\r\n', b'\n'):
+                break
+            total += len(linha)
+            if total <= self.max_header_bytes:
+                parser.feed(linha)
+        parser.feed(b'\r\n')
+        return parser.close()
+
+    def _sink(self, headers: Message, partes: '_Partes') -> '_Sink':
+        decoder = _transfer_decoder(headers.get('Content-Transfer-Encoding'))
+        nome = headers.get_filename()
+        tipo = headers.get_content_type()
+        anexo = bool(nome) or headers.get_content_disposition() == 'attachment'
+
+        if not anexo and tipo in ('text/plain', 'text/html'):
+            return _Texto(decoder, self.max_text_bytes, headers.get_content_charset(), tipo, partes)
+        if self.store is None:
+            return _Descarte()
+        return _Anexo(decoder, self.store, self.max_attachment_bytes, {
+            'nome': decode_header_value(nome) if nome else None,
+            'tipo': tipo,
+        }, partes)
+
+
+class _Leitor:
+    """Linhas (com a quebra) a partir de pedaços de bytes, com detecção de fronteiras"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._linhas = self._split(chunks)
+        self.fronteira: Optional[bytes] = None
+        self.fechamento = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self._linhas
+
+    @staticmethod
+    def _split(chunks: Iterable[bytes]) -> Iterator[bytes]:
+        resto = b''
+        for chunk in chunks:
+            if resto:
+                chunk = resto + chunk
+            inicio = 0
+            while True:
+                fim = chunk.find(b'\n', inicio)
+                if fim < 0:
+                    break
+                yield chunk[inicio:fim + 1]
+                inicio = fim + 1
+            resto = chunk[inicio:]
+            if len(resto) > MAX_LINE_BYTES:
+                yield resto
+                resto = b''
+        if resto:
+            yield resto
+
+    def read_until_boundary(self, fronteiras: Tuple[bytes, ...], destino: '_Sink'):
+        """
+        Entrega as linhas a `destino` até uma fronteira de `fronteiras` (ou
+        o fim). A quebra de linha antes da fronteira pertence a ela (RFC 2046).
+        """
+        self.fronteira, self.fechamento = None, False
+        anterior = None
+        for linha in self._linhas:
+            if fronteiras and linha.startswith(b'--'):
+                marca = linha.rstrip()
+                for fronteira in fronteiras:
+                    if marca == b'--' + fronteira or marca == b'--' + fronteira + b'--':
+                        self.fronteira = fronteira
+                        self.fechamento = marca.endswith(b'--') and marca != b'--' + fronteira
+                        if anterior is not None:
+                            destino.write(_sem_quebra(anterior))
+                        return
+            if anterior is not None:
+                destino.write(anterior)
+            anterior = linha
+        if anterior is not None:
+            destino.write(anterior)
+
+
+def _sem_quebra(linha: bytes) -> bytes:
+    if linha.endswith(b'\r\n'):
+        return linha[:-2]
+    if linha.endswith(b'\n'):
+        return linha[:-1]
+    return linha
+
+
+class _Partes:
+    """Acumula os textos e anexos encontrados"""
+
+    def __init__(self):
+        self.plain = ''
+        self.html = ''
+        self.anexos: List[dict] = []
+        self.truncado = False
+
+
+class _Sink:
+    def write(self, linha: bytes):
+        pass
+
+    def close(self):
+        pass
+
+
+class _Descarte(_Sink):
+    pass
+
+
+class _Texto(_Sink):
+    """Decodifica e guarda até `limite` bytes de uma parte de texto"""
+
+    def __init__(self, decoder, limite: int, charset: Optional[str], tipo: str, partes: _Partes):
+        self.decoder = decoder
+        self.limite = limite
+        self.charset = charset
+        self.tipo = tipo
+        self.partes = partes
+        self.dados = bytearray()
+
+    def write(self, linha: bytes):
+        if len(self.dados) >= self.limite:
+            self.partes.truncado = True
+            return
+        self.dados += self.decoder.feed(linha)
+
+    def close(self):
+        self.dados += self.decoder.flush()
+        if len(self.dados) > self.limite:
+            self.partes.truncado = True
+            del self.dados[self.limite:]
+        texto = decode_text(bytes(self.dados), self.charset)
+        # Primeira parte de cada tipo com conteúdo (multipart/alternative repete o texto)
+        if self.tipo == 'text/plain' and not self.partes.plain.strip():
+            self.partes.plain = texto
+        elif self.tipo == 'text/html' and not self.partes.html.strip():
+            self.partes.html = texto
+
+
+class _Anexo(_Sink):
+    """Decodifica o anexo direto para o BodyStore, descartando acima de `limite`"""
+
+    def __init__(self, decoder, store, limite: int, meta: dict, partes: _Partes):
+        self.decoder = decoder
+        self.limite = limite
+        self.meta = meta
+        self.partes = partes
+        self.tamanho = 0
+        self.writer = store.writer()
+
+    def write(self, linha: bytes):
+        self._grava(self.decoder.feed(linha))
+
+    def _grava(self, dados: bytes):
+        self.tamanho += len(dados)
+        if self.writer is None:
+            return
+        if self.tamanho > self.limite:
+            self.writer.abort()
+            self.writer = None
+            return
+        self.writer.write(dados)
+
+    def close(self):
+        self._grava(self.decoder.flush())
+        ref = self.writer.commit() if self.writer else None
+        self.partes.anexos.append({**self.meta, 'tamanho': self.tamanho, 'ref': ref, 'descartado': ref is None})
+
+
+class _Base64:
+    def __init__(self):
+        self._resto = b''
+
+    def feed(self, linha: bytes) -> bytes:
+        dados = self._resto + _NAO_BASE64.sub(b'', linha)
+        corte = len(dados) // 4 * 4
+        self._resto = dados[corte:]
+        try:
+            return binascii.a2b_base64(dados[:corte])
+        except binascii.Error:
+            return b''
+
+    def flush(self) -> bytes:
+        resto, self._resto = self._resto, b''
+        if not resto:
+            return b''
+        try:
+            return binascii.a2b_base64(resto + b'=' * (-len(resto) % 4))
+        except binascii.Error:
+            return b''
+
+
+class _QuotedPrintable:
+    def feed(self, linha: bytes) -> bytes:
+        return binascii.a2b_qp(linha)
+
+    def flush(self) -> bytes:
+        return b''
+
+
+class _Identidade:
+    def feed(self, linha: bytes) -> bytes:
+        return linha
+
+    def flush(self) -> bytes:
+        return b''
+
+
+def _transfer_decoder(encoding: Optional[str]):
+    encoding = (encoding or '').strip().lower()
+    if encoding == 'base64':
+        return _Base64()
+    if encoding == 'quoted-printable':
+        return _QuotedPrintable()
+    return _Identidade()
@@ -0,0 +1,40 @@
+# utils/pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+def encode_cursor(data: datetime, doc_id: str) -> str:
+    """
+    Gera um cursor opaco a partir da posição (data, id do documento)
+    do último item de uma página
+    """
+    payload = json.dumps([data.isoformat(), doc_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Desfaz encode_cursor; levanta ValueError se o cursor for inválido"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data_iso, doc_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(data_iso), str(doc_id)
+    except Exception:
+        raise ValueError("Cursor inválido")
+
+
+def parse_limit(raw: Optional[str], default: int, maximum: int) -> int:
+    """Converte o parâmetro `limit` da query string, limitado a [1, maximum]"""
+    if raw is None or raw == '':
+        return default
+
+    try:
+        limit = int(raw)
+    except (TypeError, ValueError):
+        raise ValueError("Parâmetro 'limit' deve ser um número inteiro")
+
+    if limit < 1:
+        raise ValueError("Parâmetro 'limit' deve ser maior que zero")
+
+    return min(limit, maximum)
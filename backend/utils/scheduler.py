@@ -1,50 +1,123 @@
 # utils/scheduler.py
-from apscheduler.schedulers.background import BackgroundScheduler
 from services.imap_service import ImapService
 from services.email_service import EmailService
 from services.funcionario_service import FuncionarioService
-from repositories.email_repository import EmailRepository
-from repositories.funcionario_repository import FuncionarioRepository
-from services.firestore_client import get_firestore_client
-import os
+from services.sync_service import SyncService
+from services.sync_coordinator import SyncCoordinator
+from services.sync_lease import new_sync_lease
+from services.mailbox_registry import load_mailboxes
+from services.mailbox_sync_runner import MailboxSyncRunner
+from services.sync_jobs import SyncJobManager
+from models.mailbox import Mailbox
+from services.imap_idle_worker import ImapIdleSupervisor, ImapIdleWorker
+from services.ingest_pipeline import drain_pipelines
+from config import Config
+from services.storage import get_email_repository, get_funcionario_repository, get_sync_state_repository
+from services.body_store import get_body_store
+import atexit
 
-def sync_emails_job():
-    """Job que roda a cada 1 minuto"""
-    try:
-        # IMAP
-        imap = ImapService(
-            email_addr=os.getenv('EMAIL_ADDRESS'),
-            password=os.getenv('EMAIL_PASSWORD')
+def build_sync_service(imap: ImapService) -> SyncService:
+    """Monta o SyncService com os repositórios do STORAGE_BACKEND"""
+    email_repo = get_email_repository()
+    func_repo = get_funcionario_repository()
+    
+    func_service = FuncionarioService(func_repo)
+    email_service = EmailService(email_repo, func_service)  # Passa funcionario_service
+    
+    return SyncService(imap, email_service, get_sync_state_repository(), batch_size=Config.SYNC_BATCH_SIZE)
+
+def new_imap_service(mailbox: Mailbox) -> ImapService:
+    """ImapService de uma caixa do registro"""
+    return ImapService(
+        email_addr=mailbox.endereco,
+        password=mailbox.password(),
+        folder=mailbox.pasta,
+        body_store=get_body_store(),
+        server=mailbox.host,
+        port=mailbox.porta
+    )
+
+def new_sync_coordinator(mailbox: Mailbox) -> SyncCoordinator:
+    """Coordenador do sync de uma caixa, com o lease de SYNC_LEASE"""
+    return SyncCoordinator(
+        lease=new_sync_lease(mailbox.key),
+        min_interval=Config.SYNC_INTERVAL_MIN,
+        max_interval=Config.SYNC_INTERVAL_MAX,
+        jitter=Config.SYNC_INTERVAL_JITTER,
+        renew_every=Config.SYNC_LEASE_TTL / 3 if Config.SYNC_LEASE == 'firestore' else None
+    )
+
+# Singleton - um runner por processo
+_sync_runner = None
+
+def get_sync_runner() -> MailboxSyncRunner:
+    """Runner das caixas do registro (MAILBOX_SOURCE)"""
+    global _sync_runner
+    
+    if _sync_runner is None:
+        _sync_runner = MailboxSyncRunner(
+            load=load_mailboxes,
+            new_imap=new_imap_service,
+            # Salva emails novos, registra funcionários e avança o checkpoint da caixa
+            sync=lambda imap: build_sync_service(imap).sync(),
+            new_coordinator=new_sync_coordinator,
+            workers=Config.SYNC_WORKERS,
+            reload_every=Config.MAILBOX_RELOAD_SECONDS
         )
-        
-        novos = imap.fetch_new_emails()
-        
-        # Setup services
-        db = get_firestore_client()
-        email_repo = EmailRepository(db)
-        func_repo = FuncionarioRepository(db)
-        
-        func_service = FuncionarioService(func_repo)
-        email_service = EmailService(email_repo, func_service)  # Passa funcionario_service
-        
-        # Salva emails e registra funcionários
-        for email_obj in novos:
-            email_service.create_email(
-                remetente=email_obj.remetente,
-                destinatario=email_obj.destinatario,
-                assunto=email_obj.assunto,
-                corpo=email_obj.corpo,
-                data=email_obj.data
-            )
-        
-        print(f"✅ {len(novos)} emails sincronizados")
-        
-    except Exception as e:
-        print(f"❌ Erro no sync: {e}")
+    
+    return _sync_runner
+
+# Singleton - fila de syncs manuais do processo
+_sync_jobs = None
+
+def get_sync_jobs() -> SyncJobManager:
+    """Jobs de sync manual (POST /api/sync/trigger) sobre o runner das caixas"""
+    global _sync_jobs
+    
+    if _sync_jobs is None:
+        _sync_jobs = SyncJobManager(get_sync_runner())
+    
+    return _sync_jobs
 
 def start_scheduler():
-    """Inicia scheduler"""
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(sync_emails_job, 'interval', seconds=6, max_instances=3)
-    scheduler.start()
-    print("🚀 Scheduler iniciado - sync a cada 6 segundos")
\ No newline at end of file
+    """
+    Inicia a sincronização em segundo plano das caixas do registro, um sync
+    por vez de cada caixa entre processos (lease de SYNC_LEASE; quem não
+    consegue o lease pula a vez).
+    SYNC_MODE=idle (padrão): um worker por caixa, com conexão persistente e
+    IMAP IDLE; o registro é relido a cada MAILBOX_RELOAD_SECONDS e os workers
+    acompanham caixas adicionadas, alteradas e removidas.
+    SYNC_MODE=poll: SYNC_WORKERS threads dividem as caixas, cada caixa com
+    intervalo adaptativo entre SYNC_INTERVAL_MIN e SYNC_INTERVAL_MAX.
+    """
+    # Tira a busca de remetentes do caminho da ingestão
+    try:
+        FuncionarioService(get_funcionario_repository()).warm_cache()
+    except Exception as e:
+        print(f"⚠️ Cache de remetentes não carregado: {e}")
+    
+    runner = get_sync_runner()
+    # No encerramento, o sync em andamento grava o que já baixou e avança o checkpoint
+    atexit.register(drain_pipelines)
+
+    if Config.SYNC_MODE == 'idle':
+        def new_worker(mailbox: Mailbox) -> ImapIdleWorker:
+            return ImapIdleWorker(
+                imap=new_imap_service(mailbox),
+                sync=lambda imap: runner.run_once(
+                    mailbox.key, lambda: build_sync_service(imap).sync(), origem='idle'
+                ),
+                idle_timeout=Config.IMAP_IDLE_TIMEOUT,
+                noop_interval=Config.IMAP_NOOP_INTERVAL
+            )
+
+        supervisor = ImapIdleSupervisor(runner.reload, new_worker, reload_every=Config.MAILBOX_RELOAD_SECONDS)
+        iniciados = supervisor.refresh()
+        supervisor.start()
+        print(f"🚀 {iniciados} workers IMAP iniciados - sync por IDLE")
+        return supervisor
+
+    runner.start()
+    print(f"🚀 Scheduler iniciado - {Config.SYNC_WORKERS} threads, "
+          f"sync a cada {Config.SYNC_INTERVAL_MIN:g}-{Config.SYNC_INTERVAL_MAX:g} segundos por caixa")
+    return runner
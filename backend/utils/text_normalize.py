@@ -0,0 +1,19 @@
+# utils/text_normalize.py
+import re
+import unicodedata
+from typing import List
+
+_TOKEN = re.compile(r'[0-9a-z]+')
+
+
+def normalize_text(text: str) -> str:
+    """Minúsculas e sem acentos: 'Teresina - PIAUÍ' -> 'teresina - piaui'"""
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text: str) -> List[str]:
+    """Tokens alfanuméricos do texto normalizado (ç -> c, ã -> a, ...)"""
+    return _TOKEN.findall(normalize_text(text))
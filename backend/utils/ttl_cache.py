@@ -0,0 +1,54 @@
+# utils/ttl_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Cache LRU limitado com expiração por tempo, seguro entre threads
+    (scheduler, worker IDLE e requisições Flask usam a mesma instância)
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 3600, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Valor da chave (e marca como usada) ou `default` se ausente/expirada"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+
+            expira_em, value = item
+            if expira_em <= self._clock():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Grava a chave, descartando as menos usadas acima de maxsize"""
+        with self._lock:
+            self._data[key] = (self._clock() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.pop(key, None)
+            return default if item is None else item[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -11,7 +11,7 @@ import {
   getStateName
 } from "@/lib/emailStorage";
 
-import { fetchEmails } from "@/services/api";     
+import { fetchEmails, searchEmails } from "@/services/api";
 
 import {
   Select,
@@ -33,64 +33,78 @@ export default function AllEmails() {
   const urlSender = query.get("sender") ?? "all";
   const [emails, setEmails] = useState<Email[]>([]);
   const [searchTerm, setSearchTerm] = useState("");
+  const [debouncedSearch, setDebouncedSearch] = useState("");
   const [senderFilter, setSenderFilter] = useState(urlSender);
   const [statusFilter, setStatusFilter] = useState("all");
   const [stateFilter, setStateFilter] = useState("all");
   const [showMobileFilters, setShowMobileFilters] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // Carrega uma página da API; sem cursor recomeça a lista
+  async function loadEmails(cursor: string | null = null) {
+    try {
+      // Com termo de busca, a API de busca textual substitui a listagem
+      const result = debouncedSearch
+        ? await searchEmails(debouncedSearch, { cursor })
+        : await fetchEmails({
+            cursor,
+            remetente: senderFilter !== "all" ? senderFilter : undefined,
+            status: statusFilter === "pending" || statusFilter === "classified" ? statusFilter : undefined,
+            estado: stateFilter !== "all" ? stateFilter : undefined,
+          });
+      const resultEmails: Email[] = (result.data || []).map((e: any) => ({
+        id: e.id,
+        subject: e.assunto,
+        sender: e.remetente,
+        recipient: e.destinatario, // ✅ Mudei de 'receiver' para 'recipient'
+        content: e.corpo ?? e.preview ?? "", // listagens recebem só a prévia
+        date: e.data,
+        status: e.classificado ? "classified" : "pending",
+        state: e.estado,
+        city: e.municipio,
+        priority: e.prioridade || "medium", // ✅ Adicionei prioridade
+        category: e.categoria || "",   // ainda não vem da API
+        tags: [],
+      })); 
+      setEmails((prev) => (cursor ? [...prev, ...resultEmails] : resultEmails));
+      setNextCursor(result.next_cursor ?? null);
+    } catch (err) {
+      console.error("Erro ao carregar emails:", err);
+    }
+  }
 
-  // Carregar emails do localStorage
   useEffect(() => {
-     async function loadEmails() {
-      try {
-        const result = await fetchEmails();
-        const resultEmails: Email[] = result.data.map((e: any) => ({
-          id: e.id,
-          subject: e.assunto,
-          sender: e.remetente,
-          recipient: e.destinatario, // ✅ Mudei de 'receiver' para 'recipient'
-          content: e.corpo,
-          date: e.data,
-          status: e.classificado ? "classified" : "pending",
-          state: e.estado,
-          city: e.municipio,
-          priority: e.prioridade || "medium", // ✅ Adicionei prioridade
-          category: e.categoria || "",   // ainda não vem da API
-          tags: [],
-        })); 
-        setEmails(resultEmails);
-      } catch (err) {
-        console.error("Erro ao carregar emails:", err);
-      }
-      setSenderFilter(urlSender);
-    }
-    loadEmails();
+    setSenderFilter(urlSender);
   }, [location.search]);
 
-  // Filtrar emails
+  // Espera o usuário parar de digitar antes de consultar a busca
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedSearch(searchTerm.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
+
+  // Filtros de remetente, status e estado são aplicados pela API
+  useEffect(() => {
+    loadEmails();
+  }, [senderFilter, statusFilter, stateFilter, debouncedSearch]);
+
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    await loadEmails(nextCursor);
+    setLoadingMore(false);
+  };
+
+  // Sem busca, remetente/status/estado já vêm filtrados da API;
+  // na busca textual os filtros são aplicados sobre os resultados
   const filteredEmails = emails.filter((email) => {
-    // Filtro por remetente
-    if (senderFilter !== "all" && email.sender !== senderFilter) return false;
-    
-    // Filtro por status
-    if (statusFilter !== "all" && email.status !== statusFilter) return false;
-    
-    // Filtro por estado
-    if (stateFilter !== "all" && email.state !== stateFilter) return false;
-    
-    // Filtro por busca
-    if (searchTerm) {
-      const searchLower = searchTerm.toLowerCase();
-      return (
-        email.sender.toLowerCase().includes(searchLower) ||
-        email.subject.toLowerCase().includes(searchLower) ||
-        email.content.toLowerCase().includes(searchLower) ||
-        (email.recipient && email.recipient.toLowerCase().includes(searchLower)) || // ✅ Mudei para recipient
-        (email.city && email.city.toLowerCase().includes(searchLower)) ||
-        false
-      );
-    }
-    
-    return true;
+    if (!debouncedSearch) return true;
+    return (
+      (senderFilter === "all" || email.sender === senderFilter) &&
+      (statusFilter === "all" || email.status === statusFilter) &&
+      (stateFilter === "all" || email.state === stateFilter)
+    );
   });
 
   // Agrupar por remetente
@@ -260,7 +274,6 @@ export default function AllEmails() {
                     <SelectItem value="all">Todos os status</SelectItem>
                     <SelectItem value="pending">Pendentes</SelectItem>
                     <SelectItem value="classified">Classificados</SelectItem>
-                    <SelectItem value="archived">Arquivados</SelectItem>
                   </SelectContent>
                 </Select>
               </div>
@@ -482,6 +495,15 @@ export default function AllEmails() {
         </div>
       )}
 
+      {/* PRÓXIMA PÁGINA */}
+      {nextCursor && (
+        <div className="flex justify-center">
+          <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? "Carregando..." : "Carregar mais"}
+          </Button>
+        </div>
+      )}
+
       {/* BOTÃO VOLTAR AO TOPO PARA MOBILE */}
       {senderKeys.length > 2 && (
         <Button
@@ -1,5 +1,5 @@
 import { useEffect, useState, useRef } from "react";
-import { fetchDashboardStats } from "@/services/api";
+import { fetchDashboardStats, fetchEmailsCount } from "@/services/api";
 import { useNavigate } from "react-router-dom";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
@@ -95,7 +95,6 @@ export default function Dashboard() {
   const [chartData, setChartData] = useState<any[]>([]);
   const [dailyTrend, setDailyTrend] = useState<any[]>([]);
   const [customCards, setCustomCards] = useState<any[]>([]);
-  const [emails, setEmails] = useState<any[]>([]);
   const [topStates, setTopStates] = useState<any[]>([]);
   const [topSenders, setTopSenders] = useState<any[]>([]);
   const [isDialogOpen, setIsDialogOpen] = useState(false);
@@ -182,38 +181,18 @@ export default function Dashboard() {
     }
   };
 
-  const calculateCardValue = (filters: Record<string, string>) => {
-    if (!emails || emails.length === 0) return 0;
-    
-    return emails.filter((email) => {
-      if (!email) return false;
-      
-      const emailCategory = email.category?.toString().trim().toLowerCase() || "";
-      const emailState = email.state || "";
-      const emailStatus = email.status || "";
-      const emailPriority = email.priority || "";
-
-      const matchesStatus =
-        !filters.status ||
-        filters.status === "all" ||
-        emailStatus === filters.status;
-      const matchesPriority =
-        !filters.priority ||
-        filters.priority === "all" ||
-        emailPriority === filters.priority;
-      const matchesCategory =
-        !filters.category ||
-        filters.category === "all" ||
-        emailCategory === filters.category.toLowerCase();
-      const matchesState =
-        !filters.state ||
-        filters.state === "all" ||
-        emailState === filters.state;
-
-      return (
-        matchesStatus && matchesPriority && matchesCategory && matchesState
-      );
-    }).length;
+  // Valor de um atalho: contagem feita no servidor com os filtros do card
+  const calculateCardValue = async (filters: Record<string, string>) => {
+    const status = filters.status && filters.status !== "all" ? filters.status : undefined;
+    // Status sem equivalente na API (ex.: arquivado) não tem e-mails
+    if (status && status !== "pending" && status !== "classified") return 0;
+
+    const result = await fetchEmailsCount({
+      status,
+      categoria: filters.category && filters.category !== "all" ? filters.category : undefined,
+      estado: filters.state && filters.state !== "all" ? filters.state : undefined,
+    });
+    return result?.data?.total ?? 0;
   };
 
   useEffect(() => {
@@ -262,16 +241,6 @@ export default function Dashboard() {
             { sender: "Ana Costa", sender_email: "ana@parceiro.com", count: 65 },
             { sender: "Pedro Souza", sender_email: "pedro@consultoria.com", count: 53 },
           ]);
-
-          // Criar emails dummy para os cards personalizados funcionarem
-          const dummyEmails = Array.from({ length: 1250 }, (_, i) => ({
-            id: i + 1,
-            state: estadosExemplo[i % estadosExemplo.length]?.state || "SP",
-            status: i % 4 === 0 ? "pending" : i % 4 === 1 ? "classified" : i % 4 === 2 ? "archived" : "urgent",
-            category: ["marketing", "financeiro", "suporte", "pessoal", "outros"][i % 5],
-            priority: ["low", "medium", "high", "urgent"][i % 4],
-          }));
-          setEmails(dummyEmails);
           
           return;
         }
@@ -317,24 +286,8 @@ export default function Dashboard() {
           }))
         );
 
-        if (data.emails) {
-          setEmails(data.emails);
-        } else {
-          // Fallback: criar emails dummy
-          const dummyEmails = Array.from({ length: data.total || 100 }, (_, i) => ({
-            id: i + 1,
-            state: estados[i % estados.length]?.state || "SP",
-            status: i % 4 === 0 ? "pending" : i % 4 === 1 ? "classified" : i % 4 === 2 ? "archived" : "urgent",
-            category: ["marketing", "financeiro", "suporte", "pessoal", "outros"][i % 5],
-            priority: ["low", "medium", "high", "urgent"][i % 4],
-          }));
-          setEmails(dummyEmails);
-        }
-
       } catch (error) {
         console.error("Erro ao carregar dados:", error);
-        // Fallback para evitar erros
-        setEmails([]);
       }
     };
 
@@ -343,19 +296,25 @@ export default function Dashboard() {
 
   useEffect(() => {
     const savedCards = localStorage.getItem("customDashboardCards");
-    if (savedCards && emails.length > 0) {
+    if (!savedCards) return;
+
+    const loadCards = async () => {
       try {
         const parsed = JSON.parse(savedCards);
-        const updated = parsed.map((c: any) => ({
-          ...c,
-          value: calculateCardValue(c.customFilters),
-        }));
+        const updated = await Promise.all(
+          parsed.map(async (c: any) => ({
+            ...c,
+            value: await calculateCardValue(c.customFilters),
+          }))
+        );
         setCustomCards(updated);
       } catch (error) {
         console.error("Erro ao carregar cards salvos:", error);
       }
-    }
-  }, [emails]);
+    };
+
+    loadCards();
+  }, []);
 
   const statCards = [
     {
@@ -416,7 +375,7 @@ export default function Dashboard() {
     navigate(`/history?status=${filterStatus}`);
   };
 
-  const addCustomCard = () => {
+  const addCustomCard = async () => {
     if (!newCardTitle.trim()) {
       alert("Por favor, insira um título para o atalho!");
       return;
@@ -427,7 +386,7 @@ export default function Dashboard() {
     if (statusFilter !== "all") filters.status = statusFilter;
     if (stateFilter !== "all") filters.state = stateFilter;
     
-    const value = calculateCardValue(filters);
+    const value = await calculateCardValue(filters);
     const newCard = {
       title: newCardTitle,
       value,
@@ -52,6 +52,8 @@ export default function EmailDetail() {
   const { toast } = useToast();
 
   const [email, setEmail] = useState<Email | null>(null);
+  // Versão lida do servidor: o PUT falha com 409 se outra pessoa alterou o e-mail
+  const [versao, setVersao] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
   const [isEditing, setIsEditing] = useState(false);
   const [isReclassifying, setIsReclassifying] = useState(false);
@@ -102,6 +104,7 @@ export default function EmailDetail() {
         };
 
         setEmail(normalized);
+        setVersao(e.versao ?? null);
 
         // Inicializar formulário de edição
         setEditForm({
@@ -156,19 +159,18 @@ export default function EmailDetail() {
     if (!email || !id) return;
 
     try {
-      // Preparar dados para atualização
-      const updatedData = {
-        assunto: editForm.subject,
-        categoria: editForm.category || null,
-        estado: editForm.state || null,
-        municipio: editForm.city || null,
-        corpo: editForm.content,
-        tags: editForm.tags.split(",").map(tag => tag.trim()).filter(tag => tag.length > 0),
-        classificado: email.status === "classified", // Manter o status atual
-      };
-
-      await editEmailAPI(id, updatedData);
-      
+      // Envia só os campos alterados (o servidor grava apenas esses)
+      const updatedData: Record<string, any> = {};
+      if (editForm.subject !== email.subject) updatedData.assunto = editForm.subject;
+      if (editForm.category !== (email.category || "")) updatedData.categoria = editForm.category || null;
+      if (editForm.state !== (email.state || "")) updatedData.estado = editForm.state || null;
+      if (editForm.city !== (email.city || "")) updatedData.municipio = editForm.city || null;
+      if (editForm.content !== email.content) updatedData.corpo = editForm.content;
+
+      if (Object.keys(updatedData).length > 0) {
+        const result = await editEmailAPI(id, { ...updatedData, versao });
+        setVersao(result.versao ?? null);
+      }
 
       // Atualizar email localmente
       setEmail({
@@ -188,10 +190,12 @@ export default function EmailDetail() {
       });
 
       setIsEditing(false);
-    } catch (err) {
+    } catch (err: any) {
       toast({
         title: "Erro ao atualizar",
-        description: "Não foi possível salvar as alterações.",
+        description: err?.response?.status === 409
+          ? "O e-mail foi alterado por outra pessoa. Recarregue a página antes de editar."
+          : "Não foi possível salvar as alterações.",
         variant: "destructive",
       });
     }
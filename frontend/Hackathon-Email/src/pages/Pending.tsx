@@ -8,7 +8,7 @@ import { getEmails, updateEmail, type Email } from "@/lib/emailStorage";
 import { Mail, Search, Filter, Eye, CheckCircle } from "lucide-react";
 import { useToast } from "@/hooks/use-toast";
 import { fetchEmailsPending } from "@/services/api";
-import { classifyEmail } from "@/services/api";
+import { classifyEmail, classifyEmailsBatch } from "@/services/api";
 
 // ✅ IMPORTANDO AS CONSTANTES CENTRALIZADAS
 import { BRAZILIAN_STATES, EMAIL_CATEGORIES, BRAZILIAN_CITIES_BY_STATE } from "@/lib/emailStorage";
@@ -28,6 +28,7 @@ export default function Pending() {
   const [searchTerm, setSearchTerm] = useState("");
   const [selections, setSelections] = useState<EmailSelections>({});
   const [availableCities, setAvailableCities] = useState<Record<string, string[]>>({});
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const navigate = useNavigate();
   const { toast } = useToast();
 
@@ -40,9 +41,9 @@ export default function Pending() {
   }, [emails, searchTerm]);
 
   // 🔥 Agora a função pega da API REAL, não mais dos fakes
-  const loadEmails = async () => {
+  const loadEmails = async (cursor: string | null = null) => {
     try {
-      const response = await fetchEmailsPending();
+      const response = await fetchEmailsPending({ cursor });
 
       // Agora usamos response.data que contém a lista real
       const apiEmails = response.data;
@@ -53,16 +54,19 @@ export default function Pending() {
         subject: e.assunto,
         sender: e.remetente,
         recipient: e.destinatario,
-        content: e.corpo,
+        content: e.corpo ?? e.preview ?? "", // listagens recebem só a prévia
         date: e.data,
         status: e.classificado ? "classified" : "pending",
-        state: e.estado || "",
+        // Pendentes vêm com a sugestão do gazetteer (estado_sugerido/municipio_sugerido)
+        state: e.estado || e.estado_sugerido || "",
+        city: e.municipio || e.municipio_sugerido || "",
         category: e.categoria || "",
         tags: [],
         priority: "medium",
       }));
 
-      setEmails(pendingEmails);
+      setEmails(prev => (cursor ? [...prev, ...pendingEmails] : pendingEmails));
+      setNextCursor(response.next_cursor ?? null);
 
       // Inicializar seleções para cada email
       const initialSelections: EmailSelections = {};
@@ -70,10 +74,19 @@ export default function Pending() {
         initialSelections[email.id] = {
           category: email.category || "",
           state: email.state || "",
-          city: "",
+          city: email.city || "",
         };
       });
-      setSelections(initialSelections);
+      setSelections(prev => (cursor ? { ...prev, ...initialSelections } : initialSelections));
+
+      // Cidades disponíveis para os estados já sugeridos
+      const initialCities: Record<string, string[]> = {};
+      pendingEmails.forEach(email => {
+        if (email.state) {
+          initialCities[email.id] = [...(BRAZILIAN_CITIES_BY_STATE[email.state] || []), "Outro"];
+        }
+      });
+      setAvailableCities(prev => (cursor ? { ...prev, ...initialCities } : initialCities));
 
     } catch (err) {
       console.error("Erro ao carregar e-mails pendentes", err);
@@ -184,6 +197,40 @@ export default function Pending() {
     }
   };
 
+  // Classifica de uma vez todos os visíveis com Categoria, Estado e Município preenchidos
+  const handleClassifyReady = async () => {
+    const prontos = filteredEmails
+      .filter(email => isEmailReadyToClassify(email.id))
+      .map(email => ({
+        id: email.id,
+        estado: selections[email.id].state,
+        municipio: selections[email.id].city,
+        categoria: selections[email.id].category,
+      }));
+    if (prontos.length === 0) return;
+
+    try {
+      const response = await classifyEmailsBatch(prontos);
+      const classificados = response.resumo?.classificado ?? 0;
+      const falhas = prontos.length - classificados;
+
+      toast({
+        title: `${classificados} e-mail(s) classificado(s)`,
+        description: falhas ? `${falhas} não puderam ser classificados.` : undefined,
+        variant: falhas ? "destructive" : undefined,
+      });
+
+      await loadEmails();
+    } catch (error) {
+      console.error(error);
+      toast({
+        title: "Erro ao classificar!",
+        description: "Não foi possível enviar os dados para o servidor.",
+        variant: "destructive",
+      });
+    }
+  };
+
   const isEmailReadyToClassify = (emailId: string) => {
     const selection = selections[emailId];
     return selection && selection.category && selection.state && selection.city;
@@ -202,6 +249,14 @@ export default function Pending() {
         <p className="text-sm sm:text-base text-muted-foreground">
           Classifique todos os campos: Categoria, Estado e Município
         </p>
+        <Button
+          className="mt-3"
+          onClick={handleClassifyReady}
+          disabled={!filteredEmails.some(email => isEmailReadyToClassify(email.id))}
+        >
+          <CheckCircle className="h-4 w-4 mr-2" />
+          Classificar todos preenchidos
+        </Button>
       </div>
 
       <Card>
@@ -247,9 +302,11 @@ export default function Pending() {
                   <div>
                     <h3 className="font-bold text-base sm:text-lg">{email.subject}</h3>
                     <p className="text-xs sm:text-sm text-muted-foreground">De: {email.sender}</p>
-                    <p className="text-xs sm:text-sm text-muted-foreground mt-1">
-                      {email.content.substring(0, 100)}...
-                    </p>
+                    {email.content && (
+                      <p className="text-xs sm:text-sm text-muted-foreground mt-1">
+                        {email.content.substring(0, 100)}...
+                      </p>
+                    )}
                   </div>
 
                   <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-3">
@@ -386,6 +443,15 @@ export default function Pending() {
         )}
       </div>
 
+      {/* Próxima página */}
+      {nextCursor && (
+        <div className="flex justify-center">
+          <Button variant="outline" onClick={() => loadEmails(nextCursor)}>
+            Carregar mais
+          </Button>
+        </div>
+      )}
+
       {/* Resumo no rodapé */}
       {filteredEmails.length > 0 && (
         <div className="bg-muted/30 rounded-lg p-4">
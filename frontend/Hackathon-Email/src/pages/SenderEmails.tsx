@@ -4,55 +4,62 @@ import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { Badge } from "@/components/ui/badge";
 import { Eye, ArrowLeft } from "lucide-react";
-import { fetchEmails } from "@/services/api"; // <--- AGORA É API!
+import { fetchSenderEmails } from "@/services/api";
 import { type Email } from "@/lib/emailStorage";
 
 function useQuery() {
   return new URLSearchParams(useLocation().search);
 }
 
+function mapEmail(e: any): Email {
+  return {
+    id: e.id,
+    subject: e.assunto,
+    sender: e.remetente,
+    recipient: e.destinatario,
+    content: e.corpo ?? e.preview ?? "", // listagens recebem só a prévia
+    date: e.data,
+    status: e.classificado ? "classified" : "pending",
+    priority: e.prioridade || "medium",
+    state: e.estado,
+    city: e.municipio,
+    category: e.categoria,
+    tags: [],
+  };
+}
+
 export default function SenderEmails() {
   const navigate = useNavigate();
   const query = useQuery();
   const sender = query.get("sender");
 
-  const [emails, setEmails] = useState<any[]>([]);
-  const [filtered, setFiltered] = useState<any[]>([]);
+  const [emails, setEmails] = useState<Email[]>([]);
+  const [total, setTotal] = useState(0);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loading, setLoading] = useState(false);
 
-  // 1) Carrega TODOS da API
-  useEffect(() => {
-    async function load() {
-      try {
-        const result = await fetchEmails(); // GET /api/emails
-        const resultEmails: Email[] = result.data.map((e: any) => ({
-                  id: e.id,
-                  subject: e.assunto,
-                  sender: e.remetente,
-                  receiver: e.destinatario,
-                  content: e.corpo,
-                  date: e.data,
-                  status: e.classificado ? "classified" : "pending",
-                  state: e.estado,
-                  city: e.municipio,
-                  category: e.categoria,   // ainda não vem da API
-                  tags: [],
-                })); 
-        //console.log("Emails da API:", result);
-        setEmails(resultEmails || []);
-      } catch (err) {
-        console.error("Erro ao carregar emails:", err);
-      }
+  // Carrega uma página de emails do remetente (cursor null = primeira página)
+  async function loadPage(cursor: string | null) {
+    if (!sender) return;
+    setLoading(true);
+    try {
+      const result = await fetchSenderEmails(sender, { cursor });
+      const page: Email[] = (result.data || []).map(mapEmail);
+      setEmails((prev) => (cursor ? [...prev, ...page] : page));
+      setNextCursor(result.next_cursor ?? null);
+      if (!cursor) setTotal(result.total ?? page.length);
+    } catch (err) {
+      console.error("Erro ao carregar emails:", err);
+    } finally {
+      setLoading(false);
     }
-    load();
-  }, []);
+  }
 
-  // 2) Filtra só os do remetente
   useEffect(() => {
-    if (!sender) return;
-    const list = emails.filter((e) => e.remetente === sender || e.sender === sender);
-    console.log("Filtrados:", list);
-    setFiltered(list);
-  }, [emails, sender]);
+    setEmails([]);
+    setNextCursor(null);
+    loadPage(null);
+  }, [sender]);
 
   const getStatusColor = (status: string) =>
     ({
@@ -78,7 +85,7 @@ export default function SenderEmails() {
         <div>
           <h1 className="text-3xl font-bold mb-1">{sender}</h1>
           <p className="text-muted-foreground">
-            Total de {filtered.length} e-mails
+            Total de {total} e-mails
           </p>
         </div>
 
@@ -88,18 +95,18 @@ export default function SenderEmails() {
       </div>
 
       {/* Lista */}
-      {filtered.length === 0 ? (
+      {emails.length === 0 ? (
         <Card>
           <CardContent className="py-10 text-center text-muted-foreground">
             Nenhum e-mail encontrado para este remetente.
           </CardContent>
         </Card>
       ) : (
-        filtered.map((email) => (
+        emails.map((email) => (
           <Card key={email.id} className="hover:shadow-md transition">
             <CardContent className="p-4 flex flex-col gap-2">
               <div className="flex items-center gap-2 flex-wrap">
-                <h3 className="font-semibold">{email.assunto || email.subject}</h3>
+                <h3 className="font-semibold">{email.subject}</h3>
                 <Badge className={getStatusColor(email.status)}>{email.status}</Badge>
                 {email.category && <Badge variant="outline">{email.category}</Badge>}
                 {email.city && <Badge variant="outline">{email.city}</Badge>}
@@ -107,7 +114,7 @@ export default function SenderEmails() {
 
               <p className="text-sm text-muted-foreground">
                 Recebido em{" "}
-                {new Date(email.data || email.date).toLocaleDateString("pt-BR", {
+                {new Date(email.date).toLocaleDateString("pt-BR", {
                   day: "2-digit",
                   month: "short",
                   year: "numeric",
@@ -125,6 +132,14 @@ export default function SenderEmails() {
           </Card>
         ))
       )}
+
+      {nextCursor && (
+        <div className="flex justify-center">
+          <Button variant="outline" disabled={loading} onClick={() => loadPage(nextCursor)}>
+            {loading ? "Carregando..." : "Carregar mais"}
+          </Button>
+        </div>
+      )}
     </div>
   );
 }
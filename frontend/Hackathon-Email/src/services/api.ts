@@ -45,10 +45,27 @@ export const fetchDashboardStats = async () => {
   }
 };
 
+// Paginação por cursor: a API devolve `next_cursor` (null na última página)
+export interface PageParams {
+  limit?: number;
+  cursor?: string | null;
+}
+
+// Filtros aplicados no servidor (mesmos nomes dos campos da API)
+export interface EmailFilters {
+  estado?: string;
+  municipio?: string;
+  categoria?: string;
+  remetente?: string;
+  status?: "pending" | "classified";
+  data_inicio?: string;
+  data_fim?: string;
+}
+
 // Emails
-export const fetchEmails = async () => {
+export const fetchEmails = async (params: PageParams & EmailFilters = {}) => {
   try {
-    const response = await api.get("/api/emails");
+    const response = await api.get("/api/emails", { params });
     return response.data;
     
   } catch (error) {
@@ -56,10 +73,30 @@ export const fetchEmails = async () => {
   }
 };
 
+// Busca textual em assunto/corpo (sem acentos), resultados por relevância
+export const searchEmails = async (q: string, params: PageParams = {}) => {
+  try {
+    const response = await api.get("/api/emails/search", { params: { q, ...params } });
+    return response.data;
+  } catch (error) {
+    return handleError(error, "buscar emails");
+  }
+};
+
+// Contagem com os mesmos filtros da listagem
+export const fetchEmailsCount = async (filters: EmailFilters = {}) => {
+  try {
+    const response = await api.get("/api/emails/count", { params: filters });
+    return response.data;
+  } catch (error) {
+    return handleError(error, "contar emails");
+  }
+};
+
 // Emails
-export const fetchEmailsPending = async () => {
+export const fetchEmailsPending = async (params: PageParams & EmailFilters = {}) => {
   try {
-    const response = await api.get("/api/emails/pending");
+    const response = await api.get("/api/emails/pending", { params });
     return response.data;
   } catch (error) {
     return handleError(error, "buscar emails pendentes");
@@ -86,6 +123,19 @@ export const classifyEmail = async (
   }
 };
 
+// Classifica vários emails em uma requisição (resultado por id)
+export const classifyEmailsBatch = async (
+  emails: { id: string; estado: string; municipio: string; categoria: string }[]
+) => {
+  try {
+    const response = await api.put(`/api/emails/classify-batch`, { emails });
+    return response.data;
+  } catch (error: any) {
+    console.error("Erro ao classificar emails em lote:", error);
+    throw error;
+  }
+};
+
 // =============================
 // 📌 Buscar um único e-mail
 // =============================
@@ -146,6 +196,20 @@ export async function getFuncionarios() {
 }
 
 
+// Emails de um remetente (ID do funcionário ou endereço), paginados;
+// `total` vem apenas na primeira página
+export async function fetchSenderEmails(sender: string, params: PageParams = {}) {
+  try {
+    const res = await api.get(
+      `/api/funcionarios/${encodeURIComponent(sender)}/emails`,
+      { params }
+    );
+    return res.data;
+  } catch (error) {
+    return handleError(error, "buscar emails do remetente");
+  }
+}
+
 // Não funciona, é apenas para visualização
 export async function createFuncionario() {
   try {